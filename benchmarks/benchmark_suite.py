@@ -0,0 +1,362 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Benchmark suite: color conversions, image extraction, palette save file round-trips, library search / deduplication
+# and palette rendering
+#
+# Every benchmark is a setup function registered with '@benchmark', it prepares its data and returns the function
+# that is timed. Each benchmark runs 'repeat' times, every repeat calls it enough times to take about 0.1 s.
+# Inputs are generated from fixed seeds, so results of different runs / releases are comparable.
+#
+# Usage:
+#   python benchmarks/benchmark_suite.py [--filter TEXT] [--quick] [--json results.json]
+#   python benchmarks/benchmark_suite.py --compare old.json [--threshold 1.25]
+# '--compare' prints the change against an earlier '--json' result and exits with 1 if anything got slower than
+# 'threshold' times or was skipped in only one of the runs, so it can fail a CI job.
+
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT_DIR, "color_palette"))
+import helper_functions
+import batch_functions
+
+
+BENCHMARKS = []     # (group, name, params, setup)
+SEED = 0
+TARGET_SECONDS = 0.1
+
+
+def benchmark(group: str, name: str, **params):
+    def decorator(setup):
+        BENCHMARKS.append((group, name, params, setup))
+        return setup
+    return decorator
+
+def random_rgb(count: int) -> np.ndarray:
+    return np.random.default_rng(SEED).integers(0, 256, (count, 3))
+
+def random_palettes(count: int, colors: int = 8) -> list:
+    rgb = random_rgb(count * colors).tolist()
+    hex_values = batch_functions.rgb_to_hex_batch(rgb).tolist()
+    return [(f'Palette {i}', [(tuple(rgb[j]), hex_values[j], "Name") for j in range(i * colors, (i + 1) * colors)])
+            for i in range(count)]
+
+
+# --- Conversions --- #
+
+SCALAR_COLORS = 1000
+BATCH_COLORS = 100000
+
+@benchmark("conversions", "rgb_to_hex", colors=SCALAR_COLORS)
+def setup_rgb_to_hex(colors):
+    rgb = [tuple(color) for color in random_rgb(colors).tolist()]
+    return lambda: [helper_functions.rgb_to_hex(color) for color in rgb]
+
+@benchmark("conversions", "hex_to_rgb", colors=SCALAR_COLORS)
+def setup_hex_to_rgb(colors):
+    hex_values = batch_functions.rgb_to_hex_batch(random_rgb(colors)).tolist()
+    return lambda: [helper_functions.hex_to_rgb(value) for value in hex_values]
+
+@benchmark("conversions", "get_shade", colors=SCALAR_COLORS)
+def setup_get_shade(colors):
+    rgb = [tuple(color) for color in random_rgb(colors).tolist()]
+    return lambda: [helper_functions.get_shade(color, 0.5) for color in rgb]
+
+@benchmark("conversions", "rgb_to_cmyk", colors=SCALAR_COLORS)
+def setup_rgb_to_cmyk(colors):
+    rgb = random_rgb(colors).tolist()
+    return lambda: [helper_functions.rgb_to_cmyk(r, g, b, 1.0) for r, g, b in rgb]
+
+@benchmark("conversions", "rgb_to_hex_batch", colors=BATCH_COLORS)
+def setup_rgb_to_hex_batch(colors):
+    rgb = random_rgb(colors)
+    return lambda: batch_functions.rgb_to_hex_batch(rgb)
+
+@benchmark("conversions", "hex_to_rgb_batch", colors=BATCH_COLORS)
+def setup_hex_to_rgb_batch(colors):
+    hex_values = batch_functions.rgb_to_hex_batch(random_rgb(colors))
+    return lambda: batch_functions.hex_to_rgb_batch(hex_values)
+
+@benchmark("conversions", "get_shade_batch", colors=BATCH_COLORS)
+def setup_get_shade_batch(colors):
+    rgb = random_rgb(colors)
+    return lambda: batch_functions.get_shade_batch(rgb, 0.5)
+
+
+@benchmark("conversions", "rgb_to_lab", colors=BATCH_COLORS)
+def setup_rgb_to_lab(colors):
+    from color_spaces import rgb_to_lab
+    rgb = random_rgb(colors)
+    return lambda: rgb_to_lab(rgb)
+
+@benchmark("conversions", "rgb_to_oklab", colors=BATCH_COLORS)
+def setup_rgb_to_oklab(colors):
+    from color_spaces import rgb_to_oklab
+    rgb = random_rgb(colors)
+    return lambda: rgb_to_oklab(rgb)
+
+for metric_name in ("de76", "de2000", "oklab"):
+    @benchmark("conversions", "nearest", metric=metric_name, colors=1000, targets=1000)
+    def setup_nearest(metric, colors, targets):
+        from color_spaces import to_metric_space, nearest
+        values = to_metric_space(random_rgb(colors + targets), metric)
+        return lambda: nearest(values[:colors], values[colors:], metric)
+
+# Naming the colors of an extracted palette / a large import, the index is built before timing
+for color_count in (24, 5000):
+    @benchmark("conversions", "color_names", colors=color_count)
+    def setup_color_names(colors):
+        from color_names import color_names, get_index
+        rgb = random_rgb(colors).tolist()
+        get_index()
+        return lambda: color_names(rgb)
+
+
+# Shades panel: the default ramp of a new color / of a recently picked one, and 16 step ramps of many colors at once
+@benchmark("conversions", "get_ramp", colors=SCALAR_COLORS, cached=False)
+def setup_get_ramp(colors, cached):
+    from shade_ramps import RampCache, DEFAULT_RAMP, parse_ramp, get_ramp
+    rgb = [tuple(color) for color in random_rgb(colors).tolist()]
+    steps = parse_ramp(DEFAULT_RAMP)
+
+    def ramps():
+        cache = RampCache(colors)
+        return [get_ramp(color, steps, cache) for color in rgb]
+    return ramps
+
+@benchmark("conversions", "get_ramp", colors=SCALAR_COLORS, cached=True)
+def setup_get_ramp_cached(colors, cached):
+    from shade_ramps import RampCache, DEFAULT_RAMP, parse_ramp, get_ramp
+    rgb = [tuple(color) for color in random_rgb(colors).tolist()]
+    steps = parse_ramp(DEFAULT_RAMP)
+    cache = RampCache(colors)
+    return lambda: [get_ramp(color, steps, cache) for color in rgb]
+
+@benchmark("conversions", "ramp_batch", colors=BATCH_COLORS, steps=16)
+def setup_ramp_batch(colors, steps):
+    from shade_ramps import parse_ramp, ramp_batch
+    rgb = random_rgb(colors)
+    ramp = parse_ramp("cmyk:1.5,tint*5,shade*5,tone*5")
+    return lambda: ramp_batch(rgb, ramp)
+
+# --- Extraction --- #
+
+def get_corpus() -> dict:
+    from quantizer_benchmark import synthetic_corpus
+    return synthetic_corpus(size=256, seed=SEED)
+
+for image_name in ("gradient", "blocks", "noise", "blobs"):
+    for backend_name in ("extcolors", "median_cut", "octree", "kmeans"):
+        @benchmark("extraction", "extract_colors", image=image_name, backend=backend_name)
+        def setup_extract_colors(image, backend):
+            from image_functions import extract_colors, TOLERANCE, LIMIT
+            if backend == "extcolors":
+                import extcolors    # optional here, the benchmark is skipped when it isn't installed
+            img = get_corpus()[image]
+            return lambda: extract_colors(img, TOLERANCE, LIMIT, backend)
+
+
+# --- Persistence --- #
+# What 'MainWindow.palette_to_text' and 'MainWindow.load_palettes_from_file' do, without the window:
+# rewrite the save file through the journal / index the save file and build lazily loaded Palette objects
+
+PALETTE_COUNTS = (10, 1000, 100000)
+
+def create_saved_palettes(count: int) -> list:
+    from palette import Palette
+    return [Palette(name, colors) for name, colors in random_palettes(count)]
+
+def create_save_file(directory: str, count: int) -> str:
+    from palette_journal import PaletteJournal
+    path = os.path.join(directory, f'palettes_{count}.txt')
+    PaletteJournal(path).compact(create_saved_palettes(count))
+    return path
+
+for palette_count in PALETTE_COUNTS:
+    @benchmark("persistence", "palette_to_text", palettes=palette_count)
+    def setup_palette_to_text(palettes):
+        from palette_journal import PaletteJournal
+        saved = create_saved_palettes(palettes)
+        journal = PaletteJournal(os.path.join(tempfile.mkdtemp(), "palettes.txt"))
+
+        def save():
+            journal.compact(saved)
+            journal.mark_saved(saved)
+        return save
+
+    @benchmark("persistence", "load_palettes_from_file", palettes=palette_count)
+    def setup_load_palettes(palettes):
+        from palette import Palette
+        from palette_journal import PaletteJournal
+        path = create_save_file(tempfile.mkdtemp(), palettes)
+
+        def load():
+            journal = PaletteJournal(path)
+            loaded = [Palette(name, None, loader) for name, loader in journal.load_lazy()]
+            journal.mark_saved(loaded)
+            return loaded
+        return load
+
+    @benchmark("persistence", "load_all_colors", palettes=palette_count)
+    def setup_load_all_colors(palettes):
+        from palette_journal import PaletteJournal
+        path = create_save_file(tempfile.mkdtemp(), palettes)
+        return lambda: PaletteJournal(path).load()
+
+
+# --- Library search --- #
+# Saved palettes with a color close to the picked one, 100 queries against 1k / 1M stored swatches
+# 'limit' is the amount of results the Find Similar Palettes window shows
+
+for palette_count in (125, 125000):
+    @benchmark("search", "search_palettes", palettes=palette_count, queries=100, limit=100)
+    def setup_search_palettes(palettes, queries, limit):
+        from palette_search import PaletteIndex
+        index = PaletteIndex(create_saved_palettes(palettes))
+        targets = np.random.default_rng(SEED + 1).integers(0, 256, (queries, 3)).tolist()
+        return lambda: [index.search_palettes(target, limit=limit) for target in targets]
+
+
+# Near-duplicate palettes and colors of the whole library, every 10th palette has a reordered copy
+for palette_count in (1000, 30000):
+    @benchmark("search", "find_duplicates", palettes=palette_count)
+    def setup_find_duplicates(palettes):
+        from palette_dedup import find_duplicates
+        library = [colors for name, colors in random_palettes(palettes)]
+        library += [colors[::-1] for colors in library[::10]]
+        return lambda: find_duplicates(library)
+
+# --- Rendering --- #
+
+for color_count in (6, 60, 600):
+    @benchmark("rendering", "render_color_palette", colors=color_count)
+    def setup_render_color_palette(colors):
+        from image_functions import render_color_palette
+        palette = [(tuple(rgb), 3000) for rgb in random_rgb(colors).tolist()]
+        file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+        file.close()
+        return lambda: render_color_palette(palette, file)
+
+# e.g. exporting a long color history, the sheet is only built in memory
+@benchmark("rendering", "render_color_palette_in_memory", colors=10000, swatch_size=20)
+def setup_render_in_memory(colors, swatch_size):
+    from image_functions import render_color_palette
+    palette = [(tuple(rgb), 3000) for rgb in random_rgb(colors).tolist()]
+    return lambda: render_color_palette(palette, None, swatch_size=swatch_size)
+
+
+# --- Runner --- #
+
+def run_benchmark(setup, params: dict, repeat: int) -> dict:
+    function = setup(**params)
+    start = time.perf_counter()
+    function()
+    first = time.perf_counter() - start
+    number = max(1, min(1000, int(TARGET_SECONDS / max(first, 1e-9))))
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return {"min_s": min(timings), "median_s": statistics.median(timings), "number": number, "repeat": repeat}
+
+def get_benchmark_id(result: dict) -> str:
+    params = ",".join(f'{key}={value}' for key, value in sorted(result["params"].items()))
+    return f'{result["group"]}.{result["name"]}({params})'
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def get_metadata() -> dict:
+    return {"date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": get_git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": platform.processor()}
+
+def run(name_filter: str = "", repeat: int = 5, quick: bool = False) -> list:
+    results = []
+    for group, name, params, setup in BENCHMARKS:
+        result = {"group": group, "name": name, "params": params}
+        if name_filter and name_filter not in get_benchmark_id(result):
+            continue
+        if quick and params.get("palettes", 0) > 1000:
+            continue
+        try:
+            result.update(run_benchmark(setup, params, repeat))
+        except ImportError as e:
+            result["skipped"] = f'{type(e).__name__}: {e}'
+        results.append(result)
+        print_result(result)
+    return results
+
+def print_result(result: dict):
+    if "skipped" in result:
+        print(f'{get_benchmark_id(result):<72}{"skipped":>12}  {result["skipped"]}')
+    else:
+        print(f'{get_benchmark_id(result):<72}{result["min_s"] * 1000:>12.4f} ms')
+
+# Ratio of every benchmark present in both results, > 1.0 = slower now
+# A benchmark skipped in only one of them (e.g. a missing dependency) fails the comparison too, it can't be checked
+def compare(old: dict, new: dict, threshold: float) -> bool:
+    old_results = {get_benchmark_id(result): result for result in old["results"]}
+    regressed = False
+    print(f'{"benchmark":<72}{"old ms":>12}{"new ms":>12}{"ratio":>8}')
+    for result in new["results"]:
+        benchmark_id = get_benchmark_id(result)
+        old_result = old_results.get(benchmark_id)
+        if old_result is None or ("min_s" not in result and "min_s" not in old_result):
+            continue
+        if "min_s" not in result or "min_s" not in old_result:
+            regressed = True
+            skipped = result.get("skipped") or old_result.get("skipped")
+            print(f'{benchmark_id:<72}{"-":>12}{"-":>12}{"-":>8}  SKIPPED in {"new" if "min_s" not in result else "old"}'
+                  f' results: {skipped}')
+            continue
+        ratio = result["min_s"] / old_result["min_s"]
+        regressed = regressed or ratio > threshold
+        print(f'{benchmark_id:<72}{old_result["min_s"] * 1000:>12.4f}{result["min_s"] * 1000:>12.4f}'
+              f'{ratio:>8.2f}{"  REGRESSION" if ratio > threshold else ""}')
+    return not regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Color Palette benchmark suite")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose id contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="skip the benchmarks with more than 1000 palettes")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier --json result to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    output = {"metadata": get_metadata(), "results": run(args.filter, args.repeat, args.quick)}
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(output, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            sys.exit(0 if compare(json.load(file), output, args.threshold) else 1)
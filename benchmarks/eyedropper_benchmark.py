@@ -0,0 +1,120 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Measures eyedropper sampling latency
+# By default captures come from an image in memory (ImageCapture), so it runs without a display, e.g. on CI.
+# '--backend mss' / '--backend pyautogui' measure the real screen capture instead.
+#
+# Usage: python benchmarks/eyedropper_benchmark.py [--backend image|mss|pyautogui] [--samples N] [--json results.json]
+
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "color_palette"))
+from eyedropper_sampler import EyedropperSampler, SampleQueue, sample_region, magnify
+from screen_capture import ImageCapture, create_capture_backend
+
+
+def create_backend(name: str, seed: int = 0):
+    if name == "image":
+        rng = np.random.default_rng(seed)
+        return ImageCapture(rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8))
+    return create_capture_backend(name)
+
+# Cursor path over the screen, every sample is at a different position so nothing is skipped
+def cursor_path(backend, samples: int) -> list:
+    left, top, width, height = backend.get_screen_rect()
+    t = np.linspace(0, 1, samples)
+    xs = left + (width - 1) * (0.5 + 0.45 * np.sin(t * 2 * np.pi * 3))
+    ys = top + (height - 1) * (0.5 + 0.45 * np.cos(t * 2 * np.pi * 2))
+    return list(zip(xs.astype(int).tolist(), ys.astype(int).tolist()))
+
+def percentiles(timings: list) -> dict:
+    timings = np.array(timings) * 1000
+    return {"mean_ms": float(timings.mean()),
+            "p50_ms": float(np.percentile(timings, 50)),
+            "p95_ms": float(np.percentile(timings, 95)),
+            "max_ms": float(timings.max())}
+
+
+# --- Benchmarks --- #
+
+# Single pixel, or like the eyedropper with the loupe on: one capture of the area, averaged and magnified
+def create_sample_function(backend, loupe: bool):
+    if not loupe:
+        return lambda pos: backend.pixel(*pos)
+
+    def sample(pos):
+        region = backend.grab_around(pos[0], pos[1], 11)
+        return sample_region(region, 5, "median"), magnify(region, 10)
+    return sample
+
+# Time of a single tick: cursor position, capture and publishing the sample
+def tick_latency(backend, samples: int, loupe: bool = False) -> dict:
+    path = cursor_path(backend, samples)
+    position = iter(path)
+    queue = SampleQueue()
+    sampler = EyedropperSampler(lambda: next(position), create_sample_function(backend, loupe),
+                                lambda pos, sample: queue.publish((pos, sample)))
+    timings = []
+    for _ in path:
+        start = time.perf_counter()
+        sampler.tick()
+        timings.append(time.perf_counter() - start)
+    return {"benchmark": "tick_loupe" if loupe else "tick", "samples": samples, **percentiles(timings)}
+
+# Sampler thread at its configured rate, how many ticks it managed and how much CPU time it used
+def sampler_run(backend, rate: float, seconds: float) -> dict:
+    path = cursor_path(backend, int(rate * seconds) * 2)
+    step = [0]
+
+    def get_position():
+        step[0] += 1
+        return path[step[0] % len(path)]
+
+    queue = SampleQueue()
+    sampler = EyedropperSampler(get_position, lambda pos: backend.pixel(*pos),
+                                lambda pos, color: queue.publish((pos, color)), rate=rate)
+    cpu_start, start = time.process_time(), time.perf_counter()
+    sampler.start()
+    time.sleep(seconds)
+    sampler.stop()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    return {"benchmark": "sampler", "rate": rate, "ticks_per_second": step[0] / elapsed, "cpu_percent": cpu / elapsed * 100}
+
+def print_results(backend_name: str, results: list):
+    print(f'backend: {backend_name}')
+    for result in results:
+        print("  " + ", ".join(f'{key}: {value:.3f}' if isinstance(value, float) else f'{key}: {value}'
+                               for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure eyedropper sampling latency")
+    parser.add_argument("--backend", default="image", help="image (default, no display needed), mss, pyautogui or auto")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=30)
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    backend = create_backend(args.backend)
+    try:
+        results = [tick_latency(backend, args.samples), tick_latency(backend, args.samples, loupe=True),
+                   sampler_run(backend, args.rate, args.seconds)]
+    finally:
+        backend.close()
+    print_results(args.backend, results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"backend": args.backend, "results": results}, file, indent=2)
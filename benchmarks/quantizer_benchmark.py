@@ -0,0 +1,107 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Compares speed and palette quality of the color extraction backends
+# Quality = mean ΔE76 (CIELAB) between the image pixels and their nearest palette color, lower is better
+#
+# Usage: python benchmarks/quantizer_benchmark.py [--json results.json] [image paths...]
+# Without image paths a fixed synthetic corpus is used, so results are comparable between runs
+
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "color_palette"))
+from image_functions import extract_colors, LIMIT, TOLERANCE
+from quantizers import QUANTIZERS
+from color_spaces import rgb_to_lab, nearest
+
+
+BACKENDS = ["extcolors"] + list(QUANTIZERS)
+SAMPLE_PIXELS = 20000
+
+
+# --- Corpus --- #
+
+def synthetic_corpus(size: int = 512, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / (size - 1)
+
+    gradient = np.stack((x, y, 1 - x), axis=2) * 255
+
+    blocks = rng.integers(0, 256, (8, 8, 3)).repeat(size // 8, axis=0).repeat(size // 8, axis=1)
+
+    noise = rng.integers(0, 256, (size, size, 3))
+
+    # Smooth blobs of a few base colors, roughly how a painting or a photo behaves
+    blobs = np.zeros((size, size, 3))
+    for _ in range(12):
+        cx, cy, radius = rng.random(3) * (1, 1, 0.4)
+        weight = np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * (radius + 0.05) ** 2))
+        blobs += weight[:, :, None] * rng.integers(0, 256, 3)
+    blobs = blobs / blobs.max() * 255
+
+    images = {"gradient": gradient, "blocks": blocks, "noise": noise, "blobs": blobs}
+    return {name: Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)) for name, img in images.items()}
+
+def load_corpus(paths: list) -> dict:
+    return {os.path.basename(path): Image.open(path).convert("RGB") for path in paths}
+
+
+# --- Quality --- #
+
+def mean_delta_e(img, palette: list, seed: int = 0) -> float:
+    pixels = np.asarray(img.convert("RGB")).reshape(-1, 3).astype(np.float64)
+    if len(pixels) > SAMPLE_PIXELS:
+        pixels = pixels[np.random.default_rng(seed).choice(len(pixels), SAMPLE_PIXELS, replace=False)]
+    palette_lab = rgb_to_lab(np.array([rgb for rgb, count in palette], dtype=np.float64))
+    return float(nearest(rgb_to_lab(pixels), palette_lab, "de76")[1].mean())
+
+
+# --- Benchmark --- #
+
+def run(corpus: dict, repeat: int = 3) -> list:
+    results = []
+    for name, img in corpus.items():
+        for backend in BACKENDS:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                palette = extract_colors(img, TOLERANCE, LIMIT, backend)
+                timings.append(time.perf_counter() - start)
+            results.append({"image": name,
+                            "backend": backend,
+                            "seconds": min(timings),
+                            "colors": len(palette),
+                            "mean_delta_e": mean_delta_e(img, palette)})
+    return results
+
+def print_results(results: list):
+    print(f'{"image":<12}{"backend":<12}{"seconds":>10}{"colors":>8}{"mean ΔE":>10}')
+    for result in results:
+        print(f'{result["image"]:<12}{result["backend"]:<12}{result["seconds"]:>10.4f}'
+              f'{result["colors"]:>8}{result["mean_delta_e"]:>10.2f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare color extraction backends")
+    parser.add_argument("images", nargs="*", help="images to use instead of the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run(load_corpus(args.images) if args.images else synthetic_corpus(), args.repeat)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
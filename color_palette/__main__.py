@@ -5,8 +5,20 @@
 # Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
 
 
+import os
+import sys
+
+# Modules import each other by name, this makes it work with 'python -m color_palette' as well
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import startup     # first, so startup timings include every import
 
-from classes import MainWindow
 
 if __name__ == "__main__":
-    mainWindow: MainWindow = MainWindow()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Headless commands, e.g. 'python -m color_palette extract <dir>'
+        from cli import main
+        sys.exit(main(sys.argv[1:]))
+
+    from classes import MainWindow
+    startup.mark("imports")
+    mainWindow: MainWindow = MainWindow()
@@ -0,0 +1,98 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Vectorized versions of the color conversions found in 'helper_functions.py'
+# Every function takes a whole array of colors - (N, 3) for RGB, (N, 4) for CMYK, (N,) for HEX strings
+# and converts all of them in a single NumPy pass
+# The scalar functions in 'helper_functions.py' are thin wrappers over these
+
+
+import numpy as np
+
+
+RGB_SCALE = 255
+CMYK_SCALE = 100
+
+# '0', '1', ... 'f' - used to build HEX strings without formatting every channel by hand
+_HEX_DIGITS = np.array(list('0123456789abcdef'), dtype='<U1')
+
+# ASCII code -> value of a single HEX digit, _INVALID_NIBBLE for characters that aren't HEX digits
+_INVALID_NIBBLE = 255
+_NIBBLE_LUT = np.full(257, _INVALID_NIBBLE, dtype=np.uint8)     # + 1 for every code point above ASCII
+for _i, _char in enumerate(b'0123456789abcdef'):
+    _NIBBLE_LUT[_char] = _i
+for _i, _char in enumerate(b'ABCDEF'):
+    _NIBBLE_LUT[_char] = _i + 10
+
+
+# Make sure the input is a 2D array with the given amount of channels
+def as_color_array(values, channels: int = 3) -> np.ndarray:
+    array = np.asarray(values)
+    if array.ndim == 1:
+        array = array.reshape(1, -1)
+    if array.ndim != 2 or array.shape[1] != channels:
+        raise ValueError(f'Expected an array of shape (N, {channels}), got {array.shape}')
+    return array
+
+def rgb_to_hex_batch(rgb) -> np.ndarray:
+    rgb = np.clip(as_color_array(rgb).astype(np.int64), 0, RGB_SCALE)
+    # Fill a (N, 7) matrix of single characters and view each row as one 7 character string
+    chars = np.full((rgb.shape[0], 7), '#', dtype='<U1')
+    chars[:, 1::2] = _HEX_DIGITS[rgb >> 4]
+    chars[:, 2::2] = _HEX_DIGITS[rgb & 15]
+    return chars.view('<U7').ravel()
+
+# Only full 6 digit values ('#rrggbb' or 'rrggbb') are accepted, anything else raises a ValueError
+def hex_to_rgb_batch(hex_values) -> np.ndarray:
+    hex_values = np.atleast_1d(np.asarray(hex_values, dtype=str))
+    # Fixed width unicode strings can be viewed as a (N, width) matrix of code points, padded with zeros
+    width = hex_values.dtype.itemsize // 4
+    codes = np.zeros((len(hex_values), 8), dtype=np.uint32)
+    codes[:, :min(width, 8)] = hex_values.view(np.uint32).reshape(-1, width)[:, :8]
+    # 6 digits after the optional '#', followed by the end of the string
+    codes = np.where((codes[:, :1] == ord('#')), codes[:, 1:], codes[:, :7])
+    nibbles = _NIBBLE_LUT[np.minimum(codes[:, :6], len(_NIBBLE_LUT) - 1)]
+    if nibbles.max(initial=0) == _INVALID_NIBBLE or codes[:, 6].any():
+        invalid = (nibbles == _INVALID_NIBBLE).any(axis=1) | (codes[:, 6] != 0)
+        raise ValueError(f'Invalid HEX color: "{hex_values[invalid][0]}", expected 6 HEX digits')
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+def rgb_to_cmyk_batch(rgb, scalar=1.0) -> np.ndarray:
+    rgb = as_color_array(rgb).astype(np.float64)
+
+    # rgb [0,255] -> cmy [0,1]
+    cmy = 1 - rgb / RGB_SCALE
+
+    # extract out k [0, 1]
+    min_cmy = cmy.min(axis=1, keepdims=True)
+    black = (rgb == 0).all(axis=1)
+    denominator = np.where(black[:, None], 1.0, 1 - min_cmy)
+    cmy = (cmy - min_cmy) / denominator
+    k = min_cmy[:, 0]
+
+    # rescale to the range [0,CMYK_SCALE]
+    cmyk = np.empty((rgb.shape[0], 4), dtype=np.float64)
+    cmyk[:, :3] = cmy * CMYK_SCALE
+    cmyk[:, 3] = (k * CMYK_SCALE) * np.asarray(scalar, dtype=np.float64)
+    cmyk = clamp_cmyk_batch(cmyk)
+
+    # black
+    cmyk[black] = (0, 0, 0, CMYK_SCALE)
+    return cmyk
+
+def clamp_cmyk_batch(values: np.ndarray) -> np.ndarray:
+    return np.minimum(np.ceil(values), CMYK_SCALE)
+
+def cmyk_to_rgb_batch(cmyk) -> np.ndarray:
+    cmyk = as_color_array(cmyk, channels=4).astype(np.float64)
+    cmy = cmyk[:, :3]
+    k = cmyk[:, 3:]
+    return np.ceil((RGB_SCALE * (1 - cmy / CMYK_SCALE) * (1 - k / CMYK_SCALE)) + 1).astype(np.int64)
+
+# Scalar can be a single value or one value per color
+def get_shade_batch(rgb, scalar=1.0) -> np.ndarray:
+    return cmyk_to_rgb_batch(rgb_to_cmyk_batch(rgb, scalar))
@@ -9,18 +9,33 @@
 from tkinter import *
 from tkinter import colorchooser, filedialog
 from tkinter import ttk
-from threading import Thread
 import ast
 import pyperclip
 
 from helper_functions import is_hex_color, \
-    is_rgb_color, hex_to_rgb, rgb_to_hex, random_rgb, get_shade, str_to_rgb, rgb_to_color, color, rgb_value
-from image_functions import get_colors, colors_to_image
+    is_rgb_color, hex_to_rgb, rgb_to_hex, random_rgb, get_shade, color, rgb_value, normalize_rgb
+from palette_store import migrate_legacy_file
+from palette_journal import PaletteJournal
+from color_list import ColorList
+from palette import Palette
+from shade_ramps import DEFAULT_RAMP, parse_ramp
+from instrumentation import traced
+import instrumentation
+import startup
+
+# Heavy dependencies (NumPy, PIL, matplotlib, extcolors, pyautogui) are imported on first use, not here:
+# image_functions - when an image is opened or a palette is exported
+# batch_functions - when a palette is generated from an image
+# eyedropper_sampler / screen_capture - when the eyedropper is opened
+# color_names - when a new color gets its name
+# palette_search - on the first similar palette search
+# shade_ramps - its NumPy part, when the shades panel is filled
 
 
 
 # Main GUI window
 class MainWindow:
+    @traced(category="startup")
     def __init__(self):
         # GUI creation
         self.root: Tk = Tk()
@@ -46,7 +61,7 @@ class MainWindow:
         self.hex_user_entry = StringVar(self.root)
         self.previous_hex: str = "#c72231"
         self.rgb_user_entry = StringVar(self.root)
-        self.previous_rgb = hex_to_rgb(self.previous_hex)
+        self.previous_rgb = "(199, 34, 49)"  # hex_to_rgb(self.previous_hex), without loading NumPy on startup
         self.manual_entry: bool = False
 
         # Palettes
@@ -57,18 +72,39 @@ class MainWindow:
         self.selected_palette = StringVar(self.root)
         self.selected_palette.set(self.saved_palettes[0].name)
         self.current_palette = self.saved_palettes[0]
+        # Similarity index of all saved palette colors, built on the first search (see 'get_palette_index')
+        self.palette_index = None
 
         # User Preferences
         self.savefile_dir: str = "../save/palettes.txt"
         self.configfile_dir: str = "../save/config.txt"
         self.eyedropper_copy_key: str = "<e>"
         self.eyedropper_cancel_key: str = "<q>"
+        self.extraction_cache_dir: str = "../save/cache"
+        self.extraction_pixel_budget: str = "250000"
+        self.eyedropper_sample_rate: str = "30"
+        self.eyedropper_capture_backend: str = "auto"
+        self.eyedropper_loupe: str = "True"
+        self.eyedropper_sample_size: str = "1"
+        self.eyedropper_sample_mode: str = "mean"
+        self.instrumentation_trace: str = ""
+        self.shade_ramp: str = DEFAULT_RAMP
+        self.shade_ramp_steps: tuple = parse_ramp(DEFAULT_RAMP)
 
         self.DEFAULT_SETTINGS = {"AutoLoadSaveFile":"True",
                                 "PaletteSaveFileDir":f'{self.savefile_dir}',
                                 "ConfigFileDir":f'{self.configfile_dir}',
                                 "EyedropperColorCopyKey":"e",
-                                "EyedropperCancelKey":"q"}
+                                "EyedropperCancelKey":"q",
+                                "ExtractionCacheDir":f'{self.extraction_cache_dir}',
+                                "ExtractionPixelBudget":f'{self.extraction_pixel_budget}',
+                                "EyedropperSampleRate":f'{self.eyedropper_sample_rate}',
+                                "EyedropperCaptureBackend":f'{self.eyedropper_capture_backend}',
+                                "EyedropperLoupe":f'{self.eyedropper_loupe}',
+                                "EyedropperSampleSize":f'{self.eyedropper_sample_size}',
+                                "EyedropperSampleMode":f'{self.eyedropper_sample_mode}',
+                                "InstrumentationTrace":f'{self.instrumentation_trace}',
+                                "ShadeRamp":f'{self.shade_ramp}'}
         self.user_settings = self.DEFAULT_SETTINGS
 
 
@@ -101,6 +137,7 @@ class MainWindow:
         self.PaletteToolMenu.add_command(label="Save All Palettes", command=self.save_palette)
         self.PaletteToolMenu.add_command(label="Reload Save File", command=self.reload_palettes)
         self.PaletteToolMenu.add_command(label="History to Palette", command=self.history_to_palette)
+        self.PaletteToolMenu.add_command(label="Find Similar Palettes", command=self.show_similar_palettes)
         self.PaletteToolMenu.add_separator()
 
         # Import Menu
@@ -352,7 +389,7 @@ class MainWindow:
         self.PaletteLabel.grid(row=0, column=0, sticky="NW")
 
         # Create 'Palette Master' object, it manages all created and saved color palettes
-        self.PaletteMaster = HistoryMaster(self.root, self, self.PaletteFrame, 210)
+        self.PaletteMaster = HistoryMaster(self.root, self, self.PaletteFrame, 210, b_palette=True)
 
         # Palette Tools Frame
         self.PaletteMenuFrame = Frame(self.PaletteFrame, bg="#212024")
@@ -414,6 +451,7 @@ class MainWindow:
         self.toggle_button_state()
         self.update_context("history")
         self.load_config()
+        self.palette_journal = PaletteJournal(self.savefile_dir)
         self.load_palettes_from_file()
 
         self.toggle = BooleanVar(self.root)
@@ -423,6 +461,8 @@ class MainWindow:
         self.FileMenu.add_separator()
         self.FileMenu.add_command(label="Exit", command=exit)
 
+        startup.mark("main window")
+        self.root.after_idle(startup.finish)
         self.root.mainloop()
 
 
@@ -449,14 +489,9 @@ class MainWindow:
         self.RGBCopyButton.color_value = f_rgb_value
 
         if create_new_button:
-            self.HistoryMaster.add_to_history((rgb_value, hex_value, 'Name')) # Add new color to the history
-            self.ShadeMaster.clear_history()
-            self.add_shade(1.25)
-            self.add_shade(1.50)
-            self.add_shade(1.75)
-            self.add_shade(0.75)
-            self.add_shade(0.50)
-            self.add_shade(0.25)
+            from color_names import color_name
+            self.HistoryMaster.add_to_history((rgb_value, hex_value, color_name(rgb_value))) # Add new color to the history
+            self.show_shades()
 
     # Update the 'remove button' context so in future it will remove color from either color history or current palette >
     # depending on where the color button you've clicked on is located
@@ -467,18 +502,21 @@ class MainWindow:
         else:
             self.DelColorButton.config(text="❌ Remove (⌛)")
 
-    def add_shade(self, scalar: float):
-        rgb = str_to_rgb(self.ColorButton.current_color[0])
-        shade = get_shade(rgb, scalar)
-        new_button = self.ShadeMaster.add_to_palette(rgb_to_color(shade))
-        scalar_str = int(abs(100 - scalar*100))
-        modifier = "+" if scalar < 1 else "-"
-        if new_button:
-            new_button.ColorName.set(f'{modifier}{scalar_str}%')
+    # Fill the shades panel with the "ShadeRamp" of the picked color, ramps of recent colors are cached
+    def show_shades(self):
+        from shade_ramps import get_ramp
+        steps = self.shade_ramp_steps
+        self.ShadeMaster.clear_history()
+        for step, (rgb, hex_value) in zip(steps, get_ramp(normalize_rgb(self.ColorButton.current_color[0]), steps)):
+            new_button = self.ShadeMaster.add_to_palette((rgb, hex_value, ""))
+            if new_button:
+                new_button.ColorName.set(step.label())
 
     # Add picked color to the current palette
     def add_color_to_palette(self):
-        self.PaletteMaster.add_to_palette((self.ColorButton.current_color[0], self.ColorButton.current_color[1], "Name"))
+        from color_names import color_name
+        rgb_value, hex_value = self.ColorButton.current_color[0], self.ColorButton.current_color[1]
+        self.PaletteMaster.add_to_palette((rgb_value, hex_value, color_name(rgb_value)))
         self.update_context("palette")
 
     # Remove color from current palette
@@ -498,6 +536,7 @@ class MainWindow:
         self.on_palette_changed_event()
 
     # Triggers when you switch to another palette using the dropdown box
+    @traced(category="palettes")
     def on_palette_changed_event(self):
         self.current_palette = None
         # Find the currently selected palette
@@ -509,8 +548,7 @@ class MainWindow:
         colors = self.current_palette.colors if self.current_palette else None
         # Add colors of the currently selected palette
         if colors:
-            for color in colors:
-                self.PaletteMaster.add_to_palette(color)
+            self.PaletteMaster.add_colors_to_palette(colors)
         self.toggle_button_state()
 
     # Disable rename button for the Temporary Palette
@@ -532,6 +570,8 @@ class MainWindow:
         new_palette = Palette(name, self.PaletteMaster.colors)
 
         self.palettes.append(new_palette)
+        if self.palette_index is not None:
+            self.palette_index.add_palette(new_palette)
         self.PaletteMenu.config(values=self.get_palettes())
         self.selected_palette.set(self.palettes[-1].name)
         self.current_palette = self.palettes[-1]
@@ -552,32 +592,50 @@ class MainWindow:
             index = self.get_palettes().index(self.selected_palette.get())
             self.selected_palette.set(self.palettes[0].name if self.palettes[index-1] == None else self.palettes[index-1].name)
             self.current_palette = self.palettes[0]if self.palettes[index-1] == None else self.palettes[index-1]
-            self.palettes.pop(index)
+            removed = self.palettes.pop(index)
+            if self.palette_index is not None:
+                self.palette_index.remove_palette(removed)
             self.saved_palettes = self.palettes
             self.PaletteMenu.config(values=self.get_palettes())  # Update palette list in the dropdown menu
             self.on_palette_changed_event()
             self.toggle_button_state()
 
     # Save current palette to a save file
+    # Only changes since the last save are written, see 'palette_journal.py'
     def save_palette(self):
-        if self.does_save_file_exist(self.savefile_dir):
-            self.palette_to_text("w")
-        else:
-            self.palette_to_text("x") # Create a fresh save file if there isn't one in the directory
-
-    # Save palettes into a text file
-    def palette_to_text(self, mode: str):
-        results = ""
-        file = open(self.savefile_dir, mode)
-        if len(self.palettes) > 1:
-            for palette in self.palettes:
-                if palette.name != "Temporary Palette":
-                    results += str(([palette.name, palette.colors])) + "\n"
-                    # Each line represents separate color palette
-                    # Format: [Palette_Name, [color list]]
-                    # Color list element format: (rgb_value, hex_value)
-        file.write(str(results))
-        file.close()
+        self.palette_journal.save(self.get_saved_palettes())
+
+    # Rewrite the whole save file
+    @traced(category="storage")
+    def palette_to_text(self):
+        # Each line represents separate color palette, see 'palette_store.py' for the format
+        self.palette_journal.compact(self.get_saved_palettes())
+        self.palette_journal.mark_saved(self.get_saved_palettes())
+
+    # All palettes except the Temporary Palette
+    def get_saved_palettes(self):
+        return [palette for palette in self.palettes if palette.name != "Temporary Palette"]
+
+    # Loads the colors of every saved palette the first time, after that it's kept up to date by the palette changes
+    def get_palette_index(self):
+        if self.palette_index is None:
+            from palette_search import PaletteIndex
+            self.palette_index = PaletteIndex(self.get_saved_palettes())
+        return self.palette_index
+
+    # Colors were appended to 'palette'
+    def on_palette_colors_added(self, palette, colors: list):
+        if self.palette_index is not None:
+            self.palette_index.add_colors(palette, colors)
+
+    # Colors of 'palette' were removed or changed
+    def on_palette_colors_changed(self, palette):
+        if self.palette_index is not None and palette in self.palette_index:
+            self.palette_index.update_palette(palette)
+
+    # Display saved palettes that have a color close to the picked one
+    def show_similar_palettes(self):
+        Menu = SimilarPalettesMenu(self.root, self, self.ColorButton.current_color)
 
     def does_save_file_exist(self, name: str):
         try:
@@ -589,23 +647,24 @@ class MainWindow:
             return False
 
     # Load saved palettes from a save file on program launch
+    @traced(category="storage")
     def load_palettes_from_file(self):
         if self.user_settings['AutoLoadSaveFile'] in [True, "true", "True"]:
             if self.does_save_file_exist(self.savefile_dir):
-                file = open(self.savefile_dir, "r")
+                if migrate_legacy_file(self.savefile_dir):
+                    print("Converted save file to the new format")
 
-                lines = file.readlines()
-                if len(lines) > 0:
-                    for line in lines: # read lines from text file, each palette is a separate line
-                        palette_info = ast.literal_eval(line) # convert string representation of a list into actual list of colors
-                        self.add_palette()
-                        self.palettes[-1].name = palette_info[0]
-                        self.palettes[-1].colors = palette_info[1]
-                        self.PaletteMenu.config(values=self.get_palettes())
+                # Only names are read here, colors of a palette are parsed once it's selected
+                palettes = self.palette_journal.load_lazy()
+                if len(palettes) > 0:
+                    for name, loader in palettes:
+                        self.palettes.append(Palette(name, None, loader))
+                    self.PaletteMenu.config(values=self.get_palettes())
 
                     self.selected_palette.set(self.palettes[0].name)
                     self.on_palette_changed_event()
                     print(self.get_palettes())
+                self.palette_journal.mark_saved(self.get_saved_palettes())
             else:
                 pass
 
@@ -615,9 +674,11 @@ class MainWindow:
         self.PaletteMaster.clear_history()
         self.palettes = []
         self.palettes.append(Palette("Temporary Palette", []))
+        self.palette_index = None
         self.load_palettes_from_file()
 
     # Load user preferences
+    @traced(category="startup")
     def load_config(self) -> dict[str:str]:
         if self.does_save_file_exist(self.configfile_dir):
             settings = "{"
@@ -640,6 +701,24 @@ class MainWindow:
         self.configfile_dir = self.load_setting_value("ConfigFileDir", [])
         self.eyedropper_copy_key = self.load_setting_value("EyedropperColorCopyKey", [])
         self.eyedropper_cancel_key = self.load_setting_value("EyedropperCancelKey", [])
+        self.extraction_cache_dir = self.load_setting_value("ExtractionCacheDir", [])
+        self.extraction_pixel_budget = self.load_setting_value("ExtractionPixelBudget", [])
+        self.eyedropper_sample_rate = self.load_setting_value("EyedropperSampleRate", [])
+        self.eyedropper_capture_backend = self.load_setting_value("EyedropperCaptureBackend", ["auto", "mss", "pyautogui"])
+        self.eyedropper_loupe = self.load_setting_value("EyedropperLoupe", ["true", "false"])
+        self.eyedropper_sample_size = self.load_setting_value("EyedropperSampleSize", [])
+        self.eyedropper_sample_mode = self.load_setting_value("EyedropperSampleMode", ["mean", "median"])
+        # Path of the trace file, empty = instrumentation off
+        self.instrumentation_trace = self.load_setting_value("InstrumentationTrace", [])
+        if self.instrumentation_trace:
+            instrumentation.enable(self.instrumentation_trace)
+        # Steps of the shades panel, see 'shade_ramps.py'
+        self.shade_ramp = self.load_setting_value("ShadeRamp", [])
+        try:
+            self.shade_ramp_steps = parse_ramp(self.shade_ramp)
+        except ValueError as e:
+            print(f'{e}, using the default shade ramp')
+            self.shade_ramp, self.shade_ramp_steps = DEFAULT_RAMP, parse_ramp(DEFAULT_RAMP)
 
     def does_setting_exist(self, setting_name: str):
         return setting_name in self.DEFAULT_SETTINGS.keys()
@@ -659,7 +738,9 @@ class MainWindow:
             # setting not in dictionary / setting doesnt exist / don't load it
 
     def check_setting_value(self, setting_name: str, valid_values: list[str]) -> tuple[bool, str]:
-        return (self.user_settings.get(setting_name).lower() in valid_values, self.user_settings.get(setting_name))
+        # Settings added in newer versions can be missing from older config files
+        value = self.user_settings.get(setting_name, self.DEFAULT_SETTINGS.get(setting_name))
+        return (value.lower() in valid_values, value)
 
     def create_config_file(self):
         config_file = None
@@ -780,7 +861,10 @@ class MainWindow:
         except EXCEPTION as e:
             print(e)
         else:
-            self.palette_from_image(get_colors(image.name))
+            from image_functions import get_colors, set_cache_dir
+            set_cache_dir(self.extraction_cache_dir)
+            # Large images are downsampled to the pixel budget first, "0" means full resolution
+            self.palette_from_image(get_colors(image.name, int(self.extraction_pixel_budget)))
         finally:
             image.close() if image else ...
 
@@ -788,59 +872,65 @@ class MainWindow:
     def palette_from_image(self, colors):
         self.PaletteMaster.clear_history()
         self.add_palette()
-        for color in colors:
-            self.PaletteMaster.add_to_palette((color[0], rgb_to_hex(color[0]), 'Name'))
+        if colors:
+            from batch_functions import rgb_to_hex_batch
+            from color_names import color_names
+            rgb_values = [color[0] for color in colors]
+            hex_values = rgb_to_hex_batch(rgb_values)
+            self.PaletteMaster.add_colors_to_palette([(rgb, str(hex_value), name) for rgb, hex_value, name
+                                                      in zip(rgb_values, hex_values, color_names(rgb_values))])
 
     def choose_img_save_location(self):
-        image = None
+        path = ""
         if len(self.current_palette.colors) > 0:
             try:
-                image = filedialog.asksaveasfile(defaultextension="*.png",
-                                                 filetypes=(("PNG Image", "*.png"),
-                                                            ("JPEG Image", "*.jpg"),
-                                                            ("BMP Image", "*.bmp"),
-                                                            ("WEBP Image", "*.webp")))
+                # Only the path is needed, the image is written by PIL
+                path = filedialog.asksaveasfilename(defaultextension="*.png",
+                                                    filetypes=(("PNG Image", "*.png"),
+                                                               ("JPEG Image", "*.jpg"),
+                                                               ("BMP Image", "*.bmp"),
+                                                               ("WEBP Image", "*.webp")))
             except EXCEPTION as e:
                 print(e)
             else:
-                self.palette_to_image(image)
-            finally:
-                image.close() if image else ...
+                if path:
+                    self.palette_to_image(path)
 
     def choose_img_save_location_history(self):
-        image = None
+        path = ""
         if len(self.HistoryMaster.colors) > 0:
             try:
-                image = filedialog.asksaveasfile(defaultextension="*.png",
-                                                 filetypes=(("PNG Image", "*.png"),
-                                                            ("JPEG Image", "*.jpg"),
-                                                            ("BMP Image", "*.bmp"),
-                                                            ("WEBP Image", "*.webp")))
+                # Only the path is needed, the image is written by PIL
+                path = filedialog.asksaveasfilename(defaultextension="*.png",
+                                                    filetypes=(("PNG Image", "*.png"),
+                                                               ("JPEG Image", "*.jpg"),
+                                                               ("BMP Image", "*.bmp"),
+                                                               ("WEBP Image", "*.webp")))
             except EXCEPTION as e:
                 print(e)
             else:
-                self.history_to_image(image)
-            finally:
-                image.close() if image else ...
+                if path:
+                    self.history_to_image(path)
 
     # Convert current palette to an image
-    def palette_to_image(self, file_ref: object):
+    def palette_to_image(self, path: str):
+        from image_functions import colors_to_image
         colors = []
         for color in self.current_palette.colors:
             new = colors.append(((int(color[0][0]), int(color[0][1]), int(color[0][2])), 3000))
-        colors_to_image(tuple(colors), file_ref)
+        colors_to_image(tuple(colors), path)
 
     # Convert color history to an image
-    def history_to_image(self, file_ref: object):
+    def history_to_image(self, path: str):
+        from image_functions import colors_to_image
         colors = []
         for color in self.HistoryMaster.colors:
             new = colors.append(((int(color[0][0]), int(color[0][1]), int(color[0][2])), 3000))
-        colors_to_image(tuple(colors), file_ref)
+        colors_to_image(tuple(colors), path)
 
     # Copy all colors from history to a palette
     def history_to_palette(self):
-        for color in self.HistoryMaster.colors:
-            self.PaletteMaster.add_to_palette(color)
+        self.PaletteMaster.add_colors_to_palette(list(self.HistoryMaster.colors))
 
     def eyedropper(self):
         self.eyedropper_ref = Eyedropper(self)
@@ -857,7 +947,7 @@ class MainWindow:
     def eyedropper_event_pick(self, event):
         self.EyedropperButton.config(bg="#212024", fg="white")
         picked_color: rgb_value = self.eyedropper_ref.copy_color()
-        self.ColorButton.update_color((picked_color, rgb_to_hex(picked_color), "Name"), "history")
+        self.ColorButton.update_color((picked_color, rgb_to_hex(picked_color)), "history")
         self.eyedropper_ref.close_window()
 
     def eyedropper_event_cancel(self, event):
@@ -872,14 +962,23 @@ class MainWindow:
 
 # Stores colors
 # Is used both for color history and color palettes
+#
+# Colors are drawn as a virtual grid on the Canvas: only cells in the visible rows exist as widgets,
+# the rest are created when they are scrolled into view. Adding or removing a color only touches the visible cells.
 class HistoryMaster():
-    def __init__(self, root, window_ref, parent_widget, width: int, height=355):
+    def __init__(self, root, window_ref, parent_widget, width: int, height=355, b_palette: bool = False, columns: int = 0):
         self.window_root = root
         self.window_ref = window_ref
         self.parent_widget = parent_widget
+        self.b_palette = b_palette
+        self.columns = columns or (3 if b_palette else 2)
+        self.height = height
 
-        self.colors = []
-        self.color_buttons = []
+        self.colors = ColorList()
+        self.cells = {}     # index -> History_ColorButton, only the visible ones
+        self.focused_index = None
+        self.cell_width = 0
+        self.cell_height = 0
 
         self.MainFrame = Frame(self.parent_widget, bg="#212024", pady=3, bd=0)
         self.MainFrame.grid(row=5, sticky="NS")
@@ -887,165 +986,224 @@ class HistoryMaster():
         self.Canvas = Canvas(self.MainFrame, bg="#212024", width=width, height=height, bd=0, highlightthickness = 0)
         self.Canvas.grid()
 
-        self.Scrollbar = Scrollbar(self.MainFrame, orient=VERTICAL, command=self.Canvas.yview, bd=0)
+        self.Scrollbar = Scrollbar(self.MainFrame, orient=VERTICAL, command=self.scroll, bd=0)
 
         self.Canvas.config(yscrollcommand=self.Scrollbar.set)
-        self.Canvas.bind('<Configure>', lambda e:self.Canvas.configure(scrollregion=self.Canvas.bbox("all")))
-
-        self.Lista = Frame(self.Canvas, bg="#212024", bd=0)
-        self.Canvas.create_window((0,0), window=self.Lista, anchor="nw")
-
-        self.current_column = 0
-        self.current_row = 0
+        self.Canvas.bind('<Configure>', lambda e:self.update_widgets())
 
 
     # --- Functions --- #
 
+    @traced(category="widgets")
     def add_to_history(self, color):
         if not self.is_color_in_history(color[0]):
             if self.is_history_full():
                 self.show_scrollbar()
             self.colors.append(color)
-            new_color = History_ColorButton(self.window_root, self.window_ref, self.Lista, self.window_ref.current_palette, color, len(self.color_buttons), self.current_column, self.current_row, False, "Name", "history")
-            self.color_buttons.append(new_color)
-
-            if self.current_column == 0:
-                self.current_column = 1
-            else:
-                self.current_column = 0
-                self.current_row += 1
-
-            self.update_widgets()
+            self.update_scrollregion()
+            self.focus_cell(len(self.colors) - 1)
 
     def is_color_in_history(self, rgb: rgb_value) -> bool:
-        for color in self.colors:
-            if str(color[0]).replace('(', "").replace(')', "") == str(rgb).replace('(', "").replace(')', ""):
-                return True
-        return False
+        return self.colors.contains_rgb(rgb)
 
+    # Remove color from the list, cells after it move one slot back instead of being rebuilt
+    @traced(category="widgets")
     def remove_color(self, index):
         self.colors.pop(index)
-        self.color_buttons.pop(index)
-        self.update_indexes()
+        self.release_cell(index)
+
+        shifted = {}
+        for cell_index, cell in self.cells.items():
+            if cell_index > index:
+                cell_index -= 1
+                cell.index = cell_index
+                self.Canvas.coords(cell.window_id, *self.get_cell_position(cell_index))
+            shifted[cell_index] = cell
+        self.cells = shifted
+
+        if self.focused_index is not None and self.focused_index >= index:
+            self.focused_index = None if self.focused_index == index else self.focused_index - 1
+        self.update_widgets()
 
     def update_indexes(self):
-        for count, child in enumerate(self.color_buttons):
-            child.index = count
+        for index, cell in self.cells.items():
+            cell.index = index
 
     def show_scrollbar(self):
         self.Scrollbar.grid(row=0, column=1, rowspan=7, sticky="NS")
 
+    def scroll(self, *args):
+        self.Canvas.yview(*args)
+        self.render_visible()
+
+    @traced(category="widgets")
     def update_widgets(self):
-        self.window_root.update_idletasks()
-        self.Canvas.configure(scrollregion = self.Canvas.bbox('all'))
+        self.update_scrollregion()
+        self.render_visible()
+
+    def update_scrollregion(self):
+        rows = -(-len(self.colors) // self.columns)
+        self.Canvas.configure(scrollregion=(0, 0, self.columns * self.cell_width, rows * self.cell_height))
 
     def is_history_full(self, maxlength:int = 8) -> bool:
         return len(self.colors) > maxlength
 
+
+    # --- Virtual Grid --- #
+
+    def get_cell_position(self, index: int) -> (int, int):
+        return (index % self.columns) * self.cell_width, (index // self.columns) * self.cell_height
+
+    # Indexes of the colors in the rows that are currently scrolled into view (+1 row margin)
+    def get_visible_range(self) -> range:
+        if not self.cell_height:
+            return range(0, min(1, len(self.colors)))
+        top = self.Canvas.canvasy(0)
+        view_height = max(self.Canvas.winfo_height(), self.height)
+        first_row = max(0, int(top // self.cell_height) - 1)
+        last_row = int((top + view_height) // self.cell_height) + 1
+        return range(first_row * self.columns, min(len(self.colors), (last_row + 1) * self.columns))
+
+    # Create cells that scrolled into view and destroy the ones that left it
+    @traced(category="widgets")
+    def render_visible(self):
+        visible = self.get_visible_range()
+        for index in [index for index in self.cells if index not in visible]:
+            self.release_cell(index)
+        for index in visible:
+            if index not in self.cells:
+                self.render_cell(index)
+        # The first cell tells how big every cell is, after that the rest of the view can be filled
+        if self.cells and visible != self.get_visible_range():
+            self.render_visible()
+
+    @traced(category="widgets")
+    def render_cell(self, index: int):
+        if index in self.cells:
+            self.release_cell(index)
+        cell = self.create_cell(index, self.colors[index])
+        self.cells[index] = cell
+        if not self.cell_height:
+            cell.MainFrame.update_idletasks()
+            self.cell_width = cell.MainFrame.winfo_reqwidth()
+            self.cell_height = cell.MainFrame.winfo_reqheight()
+            self.update_scrollregion()
+        cell.window_id = self.Canvas.create_window(self.get_cell_position(index), window=cell.MainFrame, anchor="nw")
+        # Cell of the focused color scrolled back into view
+        if index == self.focused_index and self.window_ref.current_highlighted_button is None:
+            cell.set_focus()
+        return cell
+
+    def create_cell(self, index: int, color):
+        cell = History_ColorButton(self.window_root, self.window_ref, self.Canvas, self.window_ref.current_palette,
+                                   (color[0], color[1]), index, index % self.columns, index // self.columns,
+                                   self.b_palette, color[2] or "Name", "palette" if self.b_palette else "history",
+                                   focus=False, embedded=True)
+        cell.master_ref = self
+        return cell
+
+    def release_cell(self, index: int):
+        cell = self.cells.pop(index, None)
+        if cell:
+            if self.window_ref.current_highlighted_button is cell:
+                self.window_ref.current_highlighted_button = None
+            self.Canvas.delete(cell.window_id)
+            cell.remove_self()
+
+    # Highlight the cell of a color, scrolling it into view first if needed
+    def focus_cell(self, index: int):
+        self.focused_index = index
+        if self.cell_height and index not in self.get_visible_range():
+            rows = -(-len(self.colors) // self.columns)
+            self.Canvas.yview_moveto((index // self.columns) / rows)
+        self.render_visible()
+        if index in self.cells:
+            self.cells[index].set_focus()
+
     def reset(self, b_palette):
-        self.update_indexes()
-        self.current_row = 0
-        self.current_column = 0
-        for child in self.Lista.winfo_children():
-            child.destroy()
-        self.color_buttons = []
-        for color in self.colors:
-            new_button = History_ColorButton(self.window_root, self.window_ref, self.Lista, self.window_ref.current_palette, color, len(self.color_buttons), self.current_column, self.current_row, b_palette, "Name", "palette" if b_palette else "history")
-            if b_palette:
-                new_button.context = "palette"
-            self.color_buttons.append(new_button)
-            if self.current_column == 0:
-                self.current_column = 1
-            else:
-                self.current_column = 0
-                self.current_row += 1
+        for index in list(self.cells):
+            self.release_cell(index)
+        self.update_widgets()
 
+    @traced(category="widgets")
     def clear_history(self):
-        self.colors = []
-        for elem in self.color_buttons:
-            elem.remove_self()
-        for child in self.Lista.winfo_children():
-            child.destroy()
-        self.color_buttons = []
-        self.current_column = 0
-        self.current_row = 0
-
+        self.colors = ColorList()
+        for index in list(self.cells):
+            self.release_cell(index)
+        self.focused_index = None
+        self.Canvas.yview_moveto(0)
+        self.update_scrollregion()
+
+    @traced(category="widgets")
     def add_to_palette(self, color: ((int, int, int), str, str)):
         new_color = None
+        palette_colors = self.window_ref.current_palette.colors
+        palette_size = len(palette_colors)   # a new palette shares its color list with this widget
         if self.is_history_full(maxlength=14):
             self.show_scrollbar()
         if color not in self.colors:
             self.colors.append((color[0], color[1], color[2]))
-            new_color = History_ColorButton(self.window_root,
-                                            self.window_ref,
-                                            self.Lista,
-                                            self.window_ref.current_palette,
-                                            (color[0], color[1]),
-                                            len(self.color_buttons),
-                                            self.current_column,
-                                            self.current_row,
-                                            True,
-                                            color[2] or 'Name', "palette")
-            new_color.context = "palette"
+            self.update_scrollregion()
+            self.focus_cell(len(self.colors) - 1)
+            new_color = self.cells.get(len(self.colors) - 1)
             self.window_ref.update_context("palette")
-            self.color_buttons.append(new_color)
-
-            if self.current_column == 0:
-                self.current_column = 1
-            elif self.current_column == 1:
-                self.current_column = 2
-            else:
-                self.current_column = 0
-                self.current_row += 1
 
         self.update_widgets()
 
-        if color not in self.window_ref.current_palette.colors:
-            self.window_ref.current_palette.colors.append((color[0], color[1], "Name"))
+        if color not in palette_colors:
+            palette_colors.append((color[0], color[1], color[2]))
+        self.window_ref.on_palette_colors_added(self.window_ref.current_palette, palette_colors[palette_size:])
+        if len(palette_colors) > palette_size:
             return new_color
 
+    # Add many colors with a single layout pass and one idle tasks flush, e.g. when switching palettes
+    @traced(category="widgets")
+    def add_colors_to_palette(self, colors: list):
+        self.window_ref.remove_current_focus()
+        palette_colors = self.window_ref.current_palette.colors
+        palette_size = len(palette_colors)   # a new palette shares its color list with this widget
+        added = False
+        for color in colors:
+            color = (color[0], color[1], color[2])
+            if color not in self.colors:
+                self.colors.append(color)
+                added = True
+            if color not in palette_colors:
+                palette_colors.append(color)
+        self.window_ref.on_palette_colors_added(self.window_ref.current_palette, palette_colors[palette_size:])
+
+        if added:
+            self.focused_index = len(self.colors) - 1
+            self.window_ref.update_context("palette")
+        if self.is_history_full(maxlength=14):
+            self.show_scrollbar()
+        self.update_widgets()
+        self.window_root.update_idletasks()
+
     def remove_from_palette(self, color: ((int, int, int), str, str)):
-        if color in self.colors:
+        index = self.find_color(color)
+        if index is not None:
             self.window_ref.remove_current_focus()
-            index = self.colors.index(color)
-            self.Lista.winfo_children()[index].destroy()
             self.remove_color(index)
             self.window_ref.current_palette.colors.pop(index)
-            self.update_indexes()
-
-            self.current_row = 0
-            self.current_column = 0
-
-            for child in self.Lista.winfo_children():
-                child.destroy()
-            self.color_buttons = []
-
-            for color in self.colors:
-                new_button = History_ColorButton(self.window_root, self.window_ref, self.Lista, self.window_ref.current_palette,
-                                                 color,
-                                                 len(self.color_buttons), self.current_column, self.current_row,
-                                                 True, "Name", "palette")
-                new_button.context = "palette"
-                self.color_buttons.append(new_button)
-                if self.current_column == 0:
-                    self.current_column = 1
-                elif self.current_column == 1:
-                    self.current_column = 2
-                else:
-                    self.current_column = 0
-                    self.current_row += 1
-
+            self.window_ref.on_palette_colors_changed(self.window_ref.current_palette)
             self.set_default("palette", index)
 
     def remove_from_history(self, color: ((int,int,int), str, str)):
-        if color in self.colors:
+        index = self.find_color(color)
+        if index is not None:
             self.window_ref.remove_current_focus()
-            index = self.colors.index(color)
-            self.Lista.winfo_children()[index].destroy()
             self.remove_color(index)
-            self.reset(False)
             self.set_default("history", index)
 
+    # Index of 'color', a color renamed since it was picked is found by its RGB value, None if it isn't in the list
+    def find_color(self, color: ((int, int, int), str, str)):
+        if color in self.colors:
+            return self.colors.index(color)
+        if self.colors.contains_rgb(color[0]):
+            return self.colors.index_rgb(color[0])
+        return None
+
     def set_default(self, context: str, index: int):
         self.window_ref.remove_current_focus()
         try:
@@ -1060,7 +1218,7 @@ class HistoryMaster():
             self.window_ref.ColorButton.current_color = self.colors[index]
             self.window_ref.previous_hex = str(self.colors[index][1])
             self.manual_entry = False
-            self.color_buttons[index].set_focus()
+            self.focus_cell(index % len(self.colors))
         except:
             self.window_ref.ColorButton.current_color = ((199, 34, 49),"#c72231", "Name")
             self.window_ref.picked_color = ((199, 34, 49),"#c72231", "Name")
@@ -1068,7 +1226,6 @@ class HistoryMaster():
             self.window_ref.ColorButton.current_color = ((199, 34, 49),"#c72231", "Name")
             self.window_ref.previous_hex = "#c72231"
             self.manual_entry = False
-            self.color_buttons[index].set_focus()
             if context != "history":
                 self.window_ref.update_context("history")
 
@@ -1076,42 +1233,34 @@ class HistoryMaster():
 
 # Color Shades
 class ShadesMaster(HistoryMaster):
+    def __init__(self, root, window_ref, parent_widget, width: int, height=355):
+        super().__init__(root, window_ref, parent_widget, width, height, columns=3)
+
+    def create_cell(self, index: int, color):
+        cell = ShadeButton(self.window_root, self.window_ref, self.Canvas, self.window_ref.current_palette,
+                           (color[0], color[1]), index, index % self.columns, index // self.columns,
+                           False, color[2] or 'Name', "shade", not_focusable=True, embedded=True)
+        cell.context = "history"
+        cell.master_ref = self
+        return cell
 
     # Add a shade to the color list
+    @traced(category="widgets")
     def add_to_palette(self, color: ((int, int, int), str, str)):
         if color not in self.colors:
             if self.is_history_full():
                 self.show_scrollbar()
             self.colors.append((color[0], color[1], color[2]))
-            new_color = ShadeButton(self.window_root,
-                                            self.window_ref,
-                                            self.Lista,
-                                            self.window_ref.current_palette,
-                                            (color[0], color[1]),
-                                            len(self.color_buttons),
-                                            self.current_column,
-                                            self.current_row,
-                                            False,
-                                            color[2] or 'Name',
-                                            "shade", not_focusable=True)
-            new_color.context = "history"
+            new_color = self.render_cell(len(self.colors) - 1)
             self.window_ref.update_context("history")
-            self.color_buttons.append(new_color)
-
-            if self.current_column == 0:
-                self.current_column = 1
-            elif self.current_column == 1:
-                self.current_column = 2
-            else:
-                self.current_column = 0
-                self.current_row += 1
-
+            self.update_scrollregion()
             return new_color
 
         self.update_widgets()
 
         if color not in self.window_ref.current_palette.colors:
             self.window_ref.current_palette.colors.append((color[0], color[1], "Name"))
+            self.window_ref.on_palette_colors_added(self.window_ref.current_palette, [(color[0], color[1], "Name")])
 
 
 class ClipboardButton():
@@ -1166,8 +1315,11 @@ class ColorButton():
         else:
             print("No color was picked")
 
+    # color: (rgb, 'HEX') or (rgb, 'HEX', 'ColorName'), colors without a name get the closest named color's name,
+    # the same one they get in the history, so 'Remove' finds them there
     def update_color(self, color, context, create_new_button:bool = True):
-        self.current_color = (color[0], color[1], "Name")
+        from color_names import color_name
+        self.current_color = (color[0], color[1], color[2] if len(color) > 2 and color[2] else color_name(color[0]))
         self.ColorButton.config(bg=color[1])
         self.window_ref.remove_current_focus()
         self.window_ref.update_color_values(hex_value=self.current_color[1],
@@ -1177,14 +1329,6 @@ class ColorButton():
 
 
 
-# Saved palette
-class Palette:
-    def __init__(self, name: str, colors):
-        self.name = name
-        self.colors = colors
-
-
-
 class History_ColorButton():
     def __init__(self,
                  root: Tk,
@@ -1198,7 +1342,9 @@ class History_ColorButton():
                  b_palette: bool,
                  color_name: str,
                  context: str,
-                 not_focusable: bool = False):
+                 not_focusable: bool = False,
+                 focus: bool = True,
+                 embedded: bool = False):
 
         self.window_root = root
         self.window_ref = window_ref
@@ -1210,12 +1356,16 @@ class History_ColorButton():
         self.b_palette = b_palette
         self.context = context
         self.not_focusable = not_focusable
+        # Embedded buttons are placed on the canvas by their HistoryMaster instead of gridding themselves
+        self.master_ref = None
+        self.window_id = None
 
         self.color = color
         self.ColorName = StringVar(self.window_root)
 
         self.MainFrame = Frame(self.parent_widget, bg="#212024", pady=5, padx=2, highlightbackground="white")
-        self.MainFrame.grid(row=row, column=column)
+        if not embedded:
+            self.MainFrame.grid(row=row, column=column)
 
         self.ColorButton = Button(self.MainFrame, height=1, width=8, bg=self.color[1], highlightbackground = "black", highlightthickness = 2, bd=0, command=self.change_main_color)
         self.ColorButton.grid(row=0, column=0)
@@ -1225,7 +1375,7 @@ class History_ColorButton():
         self.HEXEntry.insert(END, self.color[1])
         self.HEXEntry.grid(row=1, column=0)
 
-        if self.not_focusable == False:
+        if self.not_focusable == False and focus:
             self.set_focus()
 
         if b_palette or context == "shade":
@@ -1244,7 +1394,9 @@ class History_ColorButton():
 
     # Functions
     def change_main_color(self):
-        self.window_ref.ColorButton.update_color((self.color[0], self.color[1], self.ColorName.get()),
+        # Name the color has in its grid, history cells don't show one
+        name = self.master_ref.colors[self.index][2] if self.master_ref else self.ColorName.get()
+        self.window_ref.ColorButton.update_color((self.color[0], self.color[1], name),
                                                  "palette" if self.b_palette else "history")
         if self.not_focusable == False:
             self.set_focus()
@@ -1255,12 +1407,18 @@ class History_ColorButton():
 
     def save_color_name(self, *args):
         color_info = self.palette_ref.colors[self.index]
-        self.palette_ref.colors[self.index] = (color_info[0], color_info[1], self.ColorName.get())
+        renamed = (color_info[0], color_info[1], self.ColorName.get())
+        self.palette_ref.colors[self.index] = renamed
+        # Recycled cells are rebuilt from the grid's own color list, it has to keep the new name too
+        if self.master_ref and self.master_ref.colors is not self.palette_ref.colors:
+            self.master_ref.colors[self.index] = renamed
 
     def set_focus(self):
         self.window_ref.remove_current_focus()
         self.MainFrame.config(highlightthickness=1)
         self.window_ref.current_highlighted_button = self
+        if self.master_ref:
+            self.master_ref.focused_index = self.index
 
     def remove_focus(self):
         self.MainFrame.config(highlightthickness=0)
@@ -1269,25 +1427,24 @@ class History_ColorButton():
 class ShadeButton(History_ColorButton):
 
     def __init__(self, root: Tk, window_ref: MainWindow, parent_widget, palette_ref: Palette, color: (str, str),
-                 index: int, column: int, row: int, b_palette: bool, color_name: str, context: str, not_focusable):
+                 index: int, column: int, row: int, b_palette: bool, color_name: str, context: str, not_focusable,
+                 focus: bool = True, embedded: bool = False):
         super().__init__(root, window_ref, parent_widget, palette_ref, color, index, column, row, b_palette, color_name,
-                         context, not_focusable)
+                         context, not_focusable, focus, embedded)
 
     def save_color_name(self, *args):
         #color_info = self.palette_ref.colors[self.index]
         #self.palette_ref.colors[self.index] = (color_info[0], color_info[1], self.ColorName.get())
         try:
-            float(self.ColorName.get())
+            shade = float(self.ColorName.get())
         except ValueError:
-            print("not a float")
-        else:
-            print("is a float")
-            RGB_value = get_shade(self.color[0], float(self.ColorName.get()))
-            HEX_Value = rgb_to_hex(RGB_value)
-            self.color = (RGB_value, HEX_Value, self.ColorName)
-            self.ColorButton.config(bg=self.color[1])
-            self.HEXEntry.delete(0, END)
-            self.HEXEntry.insert(END, HEX_Value)
+            return
+        RGB_value = get_shade(self.color[0], shade)
+        HEX_Value = rgb_to_hex(RGB_value)
+        self.color = (RGB_value, HEX_Value, self.ColorName)
+        self.ColorButton.config(bg=self.color[1])
+        self.HEXEntry.delete(0, END)
+        self.HEXEntry.insert(END, HEX_Value)
 
 
 
@@ -1343,21 +1500,84 @@ class RenameMenu:
 
 
 
+# Similar Palettes Widget
+# Lists saved palettes with a color close to the given one, double click a result to open that palette
+class SimilarPalettesMenu:
+    RESULT_LIMIT = 100
+
+    def __init__(self, root, window_ref, color):
+        from palette_search import MAX_DISTANCE
+        self.window_root = root
+        self.window_ref = window_ref
+        self.color = color
+        self.matches = self.window_ref.get_palette_index().search_palettes(normalize_rgb(color[0]), MAX_DISTANCE,
+                                                                            self.RESULT_LIMIT)
+
+        # Create widgets
+        self.root = Toplevel(self.window_root)
+        self.root.geometry("350x300")
+        self.root.title("Similar Palettes")
+        self.root.config(bg="#212024")
+
+        self.MainFrame = Frame(self.root, padx=15, pady=10, bg="#212024")
+        self.MainFrame.pack(fill=BOTH, expand=1)
+
+        self.ColorLabel = Label(self.MainFrame, text=f'Palettes with colors close to {color[1]}:', pady=7,
+                                font=("Lato", 11), bg="#212024", fg="white")
+        self.ColorLabel.pack(fill=X)
+
+        self.ResultList = Listbox(self.MainFrame, font=("Lato", 10), bg="#212024", fg="#aba7a7", highlightthickness=0,
+                                  selectbackground="#68727d")
+        self.ResultList.pack(fill=BOTH, expand=1)
+        for match in self.matches:
+            self.ResultList.insert(END, f'ΔE {match.distance:4.1f}   {match.palette.name}   {match.color[1]} {match.color[2]}')
+        if not self.matches:
+            self.ColorLabel.config(text=f'No saved palette has a color close to {color[1]}')
+        self.ResultList.bind("<Double-Button-1>", self.open_palette)
+
+
+    # Functions
+
+    def open_palette(self, *args):
+        selection = self.ResultList.curselection()
+        if selection and self.matches[selection[0]].palette in self.window_ref.palettes:
+            self.window_ref.selected_palette.set(self.matches[selection[0]].palette.name)
+            self.window_ref.on_palette_changed_event()
+
+
+
 # Eyedropper Tool
 class Eyedropper:
+    LOUPE_PIXELS = 110  # size of the loupe on screen
+    LOUPE_AREA = 11     # captured pixels per side shown in the loupe
+
     def __init__(self, parent):
-        import cv2 as cv2
-        import numpy as np
-        import pyautogui as pg
+        from eyedropper_sampler import EyedropperSampler, SampleQueue, sample_region, magnify
+        from screen_capture import create_capture_backend
 
         self.parent = parent
-        self.pg = pg
-        self.np = np
-        self.cv2 = cv2
+        self.sample_region = sample_region
+        self.magnify = magnify
+        self.capture = create_capture_backend(self.parent.eyedropper_capture_backend)
+
+        # Color is the mean / median of the 'sample_size' x 'sample_size' pixels around the cursor
+        # With the loupe on the same capture is also shown magnified, there is still only one capture per tick
+        self.loupe = self.parent.eyedropper_loupe.lower() == "true"
+        self.sample_size = max(1, int(self.parent.eyedropper_sample_size))
+        self.sample_mode = self.parent.eyedropper_sample_mode.lower()
+        self.capture_size = max(self.LOUPE_AREA, self.sample_size) if self.loupe else self.sample_size
+        self.zoom = max(1, self.LOUPE_PIXELS // self.capture_size)
 
-        self.size = 10
         self.ColorPreview = None
-        self.T = Thread(target=self.follow)
+        self.LoupeImage = None
+        self.closed = False
+        self.poll_id = None
+        self.poll_interval = 15     # ms
+        # Samples per second, the thread sleeps in between and skips the capture while the cursor rests
+        # The thread only publishes samples, widgets are updated by 'poll_samples' on the Tk main loop
+        self.samples = SampleQueue()
+        self.sampler = EyedropperSampler(self.capture.position, self.capture_sample, self.publish_sample,
+                                         rate=float(self.parent.eyedropper_sample_rate))
 
 
 
@@ -1365,7 +1585,7 @@ class Eyedropper:
         # Window
         self.root = Toplevel()
         self.root.title("Eyedropper")
-        self.root.geometry("275x225")
+        self.root.geometry("400x225" if self.loupe else "275x225")
         self.root.resizable(height=False, width=False)
         self.root.attributes('-topmost', True)
         self.root.protocol("WM_DELETE_WINDOW", self.close_window)
@@ -1376,8 +1596,21 @@ class Eyedropper:
         self.MainFrame = Frame(self.root, bg="#212024", height=200, width=100, pady=15)
         self.MainFrame.pack(expand=True, fill="both")
 
-        self.ColorPreview = Frame(self.MainFrame, bg="#c72231", height="125", width="175", highlightthickness=1, highlightcolor="white")
-        self.ColorPreview.pack(ipadx=15)
+        self.PreviewFrame = Frame(self.MainFrame, bg="#212024")
+        self.PreviewFrame.pack()
+
+        if self.loupe:
+            loupe_size = self.capture_size * self.zoom
+            self.LoupeCanvas = Canvas(self.PreviewFrame, bg="#212024", width=loupe_size, height=loupe_size, bd=0, highlightthickness=0)
+            self.LoupeCanvas.pack(side="left", padx=(0, 10))
+            self.LoupeImageItem = self.LoupeCanvas.create_image(0, 0, anchor="nw")
+            # Outline of the pixels the color is taken from
+            start = (self.capture_size - self.sample_size) // 2 * self.zoom
+            end = start + self.sample_size * self.zoom
+            self.LoupeCanvas.create_rectangle(start, start, end - 1, end - 1, outline="white")
+
+        self.ColorPreview = Frame(self.PreviewFrame, bg="#c72231", height="125", width="175", highlightthickness=1, highlightcolor="white")
+        self.ColorPreview.pack(side="left", ipadx=15)
 
         self.ValuesFrame = Frame(self.MainFrame, bg="#212024")
         self.ValuesFrame.pack(ipadx=5, ipady=10, fill=X)
@@ -1405,36 +1638,73 @@ class Eyedropper:
         self.root.bind('<Escape>', self.close_window)
         self.root.bind(self.parent.eyedropper_cancel_key, self.close_window)
 
-        self.T.start()
+        self.sampler.start()
+        self.poll_samples()
         self.root.mainloop()
 
     def copy_color(self):
-        cursor_pos = self.pg.position()
-        s = self.pg.screenshot(region=(cursor_pos[0] - self.size / 2, cursor_pos[1] - self.size / 2, self.size, self.size))
-        image = self.cv2.cvtColor(self.np.array(s), self.cv2.COLOR_RGB2BGR)
-        image = self.cv2.resize(image, (self.size * 10, self.size * 10), interpolation=self.cv2.INTER_AREA)
-
-        cursor_pos = self.pg.position()
-        screenshot = self.pg.screenshot(region=(cursor_pos[0] - 1, cursor_pos[1] - 1, 1, 1))
-        screenshot = self.np.array(screenshot)
-        color = tuple(screenshot[0, 0])
-        return color
-
-    def follow(self):
-        while True:
-            color = (self.copy_color()[0],self.copy_color()[1],self.copy_color()[2])
-            rgb = '{0}, {1}, {2}'.format(color[0], color[1], color[2])
-            hex = rgb_to_hex(color)
-
-            self.RGBVar = rgb
-            self.HexVar = hex
-
-            self.RGBValue.delete(0.0, END)
-            self.RGBValue.insert(END, self.RGBVar)
-            self.HexValue.delete(0.0, END)
-            self.HexValue.insert(END, self.HexVar)
-            self.ColorPreview.config(bg=rgb_to_hex(color))
+        return self.capture_sample(self.capture.position())[0]
+
+    # One capture of the area around the cursor, returns the picked color and the magnified area for the loupe
+    def capture_sample(self, cursor_pos):
+        region = self.capture.grab_around(cursor_pos[0], cursor_pos[1], self.capture_size)
+        color = self.sample_region(region, self.sample_size, self.sample_mode)
+        return color, self.magnify(region, self.zoom) if self.loupe else None
+
+    # Runs on the sampler thread
+    def publish_sample(self, cursor_pos, sample):
+        self.samples.publish((cursor_pos, sample))
+
+    # Runs on the Tk main loop, shows the newest sample and schedules itself again
+    # Closes the picker if the sampler thread ended because the capture failed
+    def poll_samples(self):
+        self.poll_id = None
+        if self.closed:
+            return
+        if self.sampler.error is not None:
+            print(f'Eyedropper closed, screen capture failed: {self.sampler.error!r}')
+            self.close_window()
+            return
+        sample = self.samples.latest()
+        if sample:
+            self.show_color(*sample)
+        self.poll_id = self.root.after(self.poll_interval, self.poll_samples)
+
+    def show_color(self, cursor_pos, sample):
+        color, loupe = sample
+        if loupe is not None:
+            self.show_loupe(loupe)
+
+        rgb = '{0}, {1}, {2}'.format(color[0], color[1], color[2])
+        hex = rgb_to_hex(color)
+
+        self.RGBVar = rgb
+        self.HexVar = hex
+
+        self.RGBValue.delete(0.0, END)
+        self.RGBValue.insert(END, self.RGBVar)
+        self.HexValue.delete(0.0, END)
+        self.HexValue.insert(END, self.HexVar)
+        self.ColorPreview.config(bg=hex)
+
+    def show_loupe(self, image):
+        from PIL import Image, ImageTk
+        image = Image.fromarray(image)
+        if self.LoupeImage is None:
+            self.LoupeImage = ImageTk.PhotoImage(image)
+            self.LoupeCanvas.itemconfig(self.LoupeImageItem, image=self.LoupeImage)
+        else:
+            self.LoupeImage.paste(image)
 
+    # Stop the sampler thread first, then the polling, then destroy the window
     def close_window(self, *args):
+        if self.closed:
+            return
+        self.closed = True
+        self.sampler.stop()
+        self.capture.close()
+        if self.poll_id:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
         self.root.destroy()
-        self.parent.eyedropper_event_cancel("")
\ No newline at end of file
+        self.parent.eyedropper_event_cancel("")
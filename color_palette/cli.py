@@ -0,0 +1,207 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Headless command line interface, doesn't import tkinter
+#
+# Usage:
+#   python -m color_palette extract <dirs / files / globs...> [--format json|ase|txt] [--output DIR]
+#   python -m color_palette dedup <save file> [--threshold 2.0] [--merge]
+#
+# extract: without --output every palette is streamed to stdout as one JSON line per image,
+#          with --output one file per image is written to DIR, keeping the folder structure of the input and
+#          the image extension (in/a/x.png -> DIR/a/x.png.json), images that would overwrite each other's file fail
+# dedup: prints one JSON line per group of near-duplicate palettes / colors, --merge also removes them from the save file
+
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+from export_functions import PALETTE_FORMATS, palette_to_json
+from batch_functions import rgb_to_hex_batch
+from color_names import color_names
+from image_functions import set_cache_dir, TOLERANCE, LIMIT
+from palette_dedup import THRESHOLD, find_duplicates, merge_duplicates
+from palette import Palette
+from palette_journal import PaletteJournal
+from parallel_extraction import extract_images, extract_images_parallel
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".gif", ".tif", ".tiff")
+
+
+# --- Input --- #
+
+# Expand directories (recursively) and glob patterns into (image path, root it was found in) pairs
+# The root of a glob pattern is the part before the first wildcard, so 'in/**/*.png' keeps the folders below 'in'
+def find_images(sources: list):
+    for source in sources:
+        if os.path.isdir(source):
+            for directory, subdirectories, files in os.walk(source):
+                subdirectories.sort()
+                for file in sorted(files):
+                    if file.lower().endswith(IMAGE_EXTENSIONS):
+                        yield os.path.join(directory, file), source
+        elif os.path.isfile(source):
+            yield source, os.path.dirname(source)
+        else:
+            root = pattern_root(source)
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                    yield path, root
+
+def pattern_root(pattern: str) -> str:
+    while glob.has_magic(pattern):
+        pattern = os.path.dirname(pattern)
+    return pattern or os.curdir
+
+
+# --- Output --- #
+
+def result_to_colors(result) -> list:
+    rgbs = [rgb for rgb, count in result.colors]
+    hexes = rgb_to_hex_batch(rgbs) if rgbs else []
+    return [(rgb, str(hex), name) for rgb, hex, name in zip(rgbs, hexes, color_names(rgbs))]
+
+# The image extension is kept (x.png -> x.png.json), so x.png and x.jpg of one folder don't share an output file
+def get_output_path(path: str, root: str, output_dir: str, file_format: str) -> str:
+    relative = os.path.relpath(path, root) if root else os.path.basename(path)
+    return os.path.join(output_dir, relative + "." + file_format)
+
+# Drops images found more than once and finds different images that would be written to the same output file
+# Returns the images and {output path: [image paths]} of every collision
+def check_output_paths(images, output_dir: str, file_format: str) -> (list, dict):
+    unique, outputs = [], {}
+    for path, root in images:
+        output_path = get_output_path(path, root, output_dir, file_format)
+        sources = outputs.setdefault(os.path.normcase(os.path.abspath(output_path)), [])
+        if os.path.abspath(path) not in (os.path.abspath(source) for source in sources):
+            sources.append(path)
+            unique.append((path, root))
+    collisions = {output_path: sources for output_path, sources in outputs.items() if len(sources) > 1}
+    return unique, collisions
+
+def write_palette(output_path: str, data: bytes):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "wb") as file:
+        file.write(data)
+
+def extract_command(args) -> int:
+    set_cache_dir(args.cache_dir)
+    settings = {"tolerance": args.tolerance,
+                "limit": args.limit,
+                "max_pixels": args.max_pixels,
+                "method": args.method,
+                "backend": args.backend}
+
+    images = find_images(args.sources)
+    if args.output:
+        images, collisions = check_output_paths(images, args.output, args.format)
+        for output_path, sources in collisions.items():
+            print(json.dumps({"output": output_path, "images": sources,
+                              "error": "images would overwrite each other's palette file"}), file=sys.stderr)
+        if collisions:
+            return 1
+    if args.output and args.skip_existing:
+        images = ((path, root) for path, root in images
+                  if not os.path.exists(get_output_path(path, root, args.output, args.format)))
+
+    if args.workers == 1:
+        results = extract_images(images, settings)
+    else:
+        results = extract_images_parallel(images, settings, workers=args.workers, chunk_size=args.chunk_size,
+                                          ordered=args.ordered, cache_dir=args.cache_dir)
+
+    failed = 0
+    for path, root, result, error in results:
+        if error:
+            failed += 1
+            print(json.dumps({"image": path, "error": error}), file=sys.stderr, flush=True)
+            continue
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        colors = result_to_colors(result)
+        if args.output:
+            output_path = get_output_path(path, root, args.output, args.format)
+            write_palette(output_path, PALETTE_FORMATS[args.format](name, colors))
+            print(output_path, flush=True)
+        else:
+            line = palette_to_json(name, colors, image=path, pixel_count=result.pixel_count,
+                                   share_error_estimate=result.share_error_estimate, counts=[count for rgb, count in result.colors])
+            sys.stdout.buffer.write(line + b'\n')
+            sys.stdout.flush()
+
+    return 1 if failed else 0
+
+def dedup_command(args) -> int:
+    if not os.path.isfile(args.savefile):
+        print(json.dumps({"save_file": args.savefile, "error": "file not found"}), file=sys.stderr)
+        return 1
+
+    journal = PaletteJournal(args.savefile)
+    # Without --merge the save file and its journal are only read
+    palettes = journal.load(read_only=not args.merge)
+    report = find_duplicates([colors for name, colors in palettes], args.threshold)
+    for group in report.palette_groups:
+        print(json.dumps({"kept": palettes[group[0]][0], "duplicates": [palettes[index][0] for index in group[1:]]}))
+    for palette, group in report.color_groups:
+        colors = palettes[palette][1]
+        print(json.dumps({"palette": palettes[palette][0], "kept": colors[group[0]][1],
+                          "duplicates": [colors[index][1] for index in group[1:]]}))
+
+    summary = {"palettes": len(palettes), "duplicate_palettes": report.duplicate_palettes(),
+               "duplicate_colors": report.duplicate_colors(), "merged": False}
+    if args.merge and (report.palette_groups or report.color_groups):
+        journal.compact([Palette(name, colors) for name, colors in merge_duplicates(palettes, report)])
+        summary["merged"] = True
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'must be 0 or more, got {value}')
+    return number
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="color_palette", description="Color Palette command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser("extract", help="extract a palette from every image in directories / globs")
+    extract.add_argument("sources", nargs="+", help="image files, directories or glob patterns")
+    extract.add_argument("--format", choices=sorted(PALETTE_FORMATS), default="json")
+    extract.add_argument("--output", help="write one palette file per image into this directory instead of stdout")
+    extract.add_argument("--skip-existing", action="store_true", help="skip images that already have an output file")
+    extract.add_argument("--backend", default="extcolors", help="extcolors, median_cut, octree or kmeans")
+    extract.add_argument("--limit", type=int, default=LIMIT, help="max amount of colors per palette")
+    extract.add_argument("--tolerance", type=int, default=TOLERANCE, help="color tolerance (extcolors only)")
+    extract.add_argument("--max-pixels", type=int, default=250000, help="downsample images to this many pixels, 0 = full resolution")
+    extract.add_argument("--method", choices=["thumbnail", "stride"], default="thumbnail", help="downsampling method")
+    extract.add_argument("--cache-dir", default="", help="keep extraction results on disk in this directory")
+    extract.add_argument("--workers", type=non_negative_int, default=1, help="amount of worker processes, 0 = one per CPU core")
+    extract.add_argument("--chunk-size", type=int, default=1, help="images sent to a worker process at once")
+    extract.add_argument("--ordered", action="store_true", help="output results in input order instead of as they finish")
+    extract.set_defaults(function=extract_command)
+
+    dedup = commands.add_parser("dedup", help="find near-duplicate palettes and colors in a palette save file")
+    dedup.add_argument("savefile", help="palette save file, e.g. save/palettes.txt")
+    dedup.add_argument("--threshold", type=float, default=THRESHOLD, help="max ΔE (OKLab x 100) between duplicate colors")
+    dedup.add_argument("--merge", action="store_true", help="keep only the first palette / color of every group in the save file")
+    dedup.set_defaults(function=dedup_command)
+
+    return parser
+
+def main(argv: list = None) -> int:
+    args = create_parser().parse_args(argv)
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+from bisect import bisect_left, insort
+
+from helper_functions import normalize_rgb
+
+
+# Ordered list of colors ((r, g, b), 'HEX', 'ColorName') with a hash index next to it
+# 'color in colors', 'contains_rgb' and 'count' are O(1), 'index' / 'index_rgb' / 'remove' find the color in O(log k)
+# instead of scanning the whole list. Behaves like a normal list otherwise, so it can be used anywhere a list of colors was used
+#
+# Every item gets a stamp when it's added, stamps grow with the position of the item. The index maps every color
+# and every normalized RGB value to the stamps of its items. Removed stamps aren't renumbered, they're kept in a sorted
+# list instead (k of them): position of an item = its stamp - removed stamps before it. Once there are more removed stamps than items,
+# or after changes that break the stamp order (insert, sort, slices), the index is rebuilt.
+class ColorList(list):
+    def __init__(self, colors=()):
+        super().__init__(colors)
+        self.rebuild_index()
+
+
+    # --- Index --- #
+
+    def rebuild_index(self):
+        self.stamps = list(range(len(self)))    # stamp of every item, same order as the items
+        self.next_stamp = len(self)
+        self.removed = []                       # sorted stamps of removed items
+        self.color_stamps = {}                  # color -> stamps of its items, ascending
+        self.rgb_stamps = {}                    # normalized (r, g, b) -> stamps of its items, ascending
+        for stamp, color in enumerate(super().__iter__()):
+            self.color_stamps.setdefault(color, []).append(stamp)
+            self.rgb_stamps.setdefault(normalize_rgb(color[0]), []).append(stamp)
+
+    def add_to_index(self, color, stamp: int):
+        insort(self.color_stamps.setdefault(color, []), stamp)
+        insort(self.rgb_stamps.setdefault(normalize_rgb(color[0]), []), stamp)
+
+    def remove_from_index(self, color, stamp: int):
+        for index, key in ((self.color_stamps, color), (self.rgb_stamps, normalize_rgb(color[0]))):
+            stamps = index[key]
+            stamps.remove(stamp)
+            if not stamps:
+                del index[key]
+
+    def get_position(self, stamp: int) -> int:
+        return stamp - bisect_left(self.removed, stamp)
+
+    # Same color value, no matter the HEX / name or how the RGB value is written
+    def contains_rgb(self, rgb) -> bool:
+        return normalize_rgb(rgb) in self.rgb_stamps
+
+    # Position of the first color with this RGB value
+    def index_rgb(self, rgb) -> int:
+        stamps = self.rgb_stamps.get(normalize_rgb(rgb))
+        if not stamps:
+            raise ValueError(f'{rgb} is not in list')
+        return self.get_position(stamps[0])
+
+    def __contains__(self, color) -> bool:
+        try:
+            return color in self.color_stamps
+        except TypeError:   # unhashable value can't be in the list
+            return False
+
+    def count(self, color) -> int:
+        try:
+            return len(self.color_stamps.get(color, ()))
+        except TypeError:
+            return 0
+
+    def index(self, color, *args) -> int:
+        if color not in self:
+            raise ValueError(f'{color} is not in list')
+        if args:
+            return super().index(color, *args)
+        return self.get_position(self.color_stamps[color][0])
+
+
+    # --- List changes --- #
+
+    def append(self, color):
+        super().append(color)
+        self.stamps.append(self.next_stamp)
+        self.add_to_index(color, self.next_stamp)
+        self.next_stamp += 1
+
+    def extend(self, colors):
+        for color in list(colors):
+            self.append(color)
+
+    def __iadd__(self, colors):
+        self.extend(colors)
+        return self
+
+    def __imul__(self, times: int):
+        super().__imul__(times)
+        self.rebuild_index()
+        return self
+
+    def insert(self, index: int, color):
+        super().insert(index, color)
+        self.rebuild_index()
+
+    # Removing an item still shifts the items after it down, like any list pop (a single memory move)
+    def pop(self, index: int = -1):
+        color = super().pop(index)
+        stamp = self.stamps.pop(index)
+        self.remove_from_index(color, stamp)
+        if stamp == self.next_stamp - 1:
+            self.next_stamp = stamp     # last item, its stamp can be given out again
+        else:
+            insort(self.removed, stamp)
+            if len(self.removed) > len(self):
+                self.rebuild_index()
+        return color
+
+    def remove(self, color):
+        self.pop(self.index(color))
+
+    def clear(self):
+        super().clear()
+        self.rebuild_index()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.rebuild_index()
+
+    def reverse(self):
+        super().reverse()
+        self.rebuild_index()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super().__setitem__(index, value)
+            self.rebuild_index()
+        else:
+            stamp = self.stamps[index]
+            self.remove_from_index(self[index], stamp)
+            super().__setitem__(index, value)
+            self.add_to_index(value, stamp)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            super().__delitem__(index)
+            self.rebuild_index()
+        else:
+            self.pop(index)
@@ -0,0 +1,102 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Names new colors after the closest named color (see 'named_colors.py'), measured with ΔE76 in CIELAB
+#
+# Lab space is split into a grid of 'cell_size' ΔE cubes. For every cell a query lands in, the names that can possibly
+# be the closest one are collected once and cached: no color of the cell is further than U from its closest name
+# (U = the smallest 'furthest corner' distance of any name), so names further than U from the whole cell are skipped.
+# A lookup is then one Lab conversion and a distance check against a handful of candidates instead of all ~1000 names,
+# bulk lookups group the colors by cell and check every group at once.
+
+
+from functools import lru_cache
+
+import numpy as np
+
+from batch_functions import hex_to_rgb_batch
+from color_spaces import rgb_to_lab, delta_e_76
+from helper_functions import normalize_rgb
+
+
+CELL_SIZE = 10.0
+
+default_index = None
+
+
+class ColorNameIndex:
+    def __init__(self, names: list, rgb, cell_size: float = CELL_SIZE):
+        self.names = list(names)
+        self.cell_size = cell_size
+        self.lab = rgb_to_lab(np.asarray(rgb).reshape(-1, 3))
+        self.candidates = {}    # cell -> indexes of names that can be the closest one to a color in that cell
+
+    # Indexes of the names that have to be checked for colors in 'cell'
+    def get_candidates(self, cell: tuple) -> np.ndarray:
+        candidates = self.candidates.get(cell)
+        if candidates is None:
+            low = np.array(cell) * self.cell_size
+            high = low + self.cell_size
+            # Distance of every name to the closest and to the furthest point of the cell
+            closest = np.sqrt((np.maximum(np.maximum(low - self.lab, self.lab - high), 0) ** 2).sum(axis=1))
+            furthest = np.sqrt((np.maximum(self.lab - low, high - self.lab) ** 2).sum(axis=1))
+            candidates = self.candidates[cell] = np.flatnonzero(closest <= furthest.min())
+        return candidates
+
+
+    # --- Lookup --- #
+
+    # Index of and ΔE76 distance to the closest name for every color of 'rgb' (N, 3)
+    def nearest(self, rgb) -> (np.ndarray, np.ndarray):
+        lab = rgb_to_lab(np.asarray(rgb).reshape(-1, 3))
+        indexes = np.empty(len(lab), dtype=np.int64)
+        distances = np.empty(len(lab))
+        if not len(lab):
+            return indexes, distances
+
+        cells, groups = np.unique(np.floor(lab / self.cell_size).astype(np.int64), axis=0, return_inverse=True)
+        order = np.argsort(groups.reshape(-1), kind="stable")
+        bounds = np.searchsorted(groups.reshape(-1)[order], np.arange(len(cells) + 1))
+        for group, cell in enumerate(cells.tolist()):
+            members = order[bounds[group]:bounds[group + 1]]
+            candidates = self.get_candidates(tuple(cell))
+            block = delta_e_76(lab[members, None, :], self.lab[None, candidates, :])
+            closest = block.argmin(axis=1)
+            indexes[members] = candidates[closest]
+            distances[members] = block[np.arange(len(members)), closest]
+        return indexes, distances
+
+    def name(self, rgb) -> str:
+        lab = rgb_to_lab(rgb)
+        candidates = self.get_candidates(tuple(np.floor(lab / self.cell_size).astype(np.int64).tolist()))
+        return self.names[candidates[delta_e_76(lab, self.lab[candidates]).argmin()]]
+
+    def names_of(self, rgb) -> list:
+        return [self.names[idx] for idx in self.nearest(rgb)[0].tolist()]
+
+
+def get_index() -> ColorNameIndex:
+    global default_index
+    if default_index is None:
+        from named_colors import NAMED_COLORS
+        default_index = ColorNameIndex([name for name, hex_value in NAMED_COLORS],
+                                       hex_to_rgb_batch([hex_value for name, hex_value in NAMED_COLORS]))
+    return default_index
+
+# Name of the closest named color, rgb: (r, g, b) or "r, g, b"
+def color_name(rgb) -> str:
+    return cached_color_name(normalize_rgb(rgb))
+
+@lru_cache(maxsize=4096)
+def cached_color_name(rgb: (int, int, int)) -> str:
+    return get_index().name(rgb)
+
+# Names of many colors at once, e.g. a palette extracted from an image
+def color_names(rgb_colors: list) -> list:
+    if not len(rgb_colors):
+        return []
+    return get_index().names_of(rgb_colors)
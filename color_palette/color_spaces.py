@@ -0,0 +1,205 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Perceptual color spaces and color differences
+#
+# Conversions: sRGB (0 - 255) <-> linear RGB (0 - 1) <-> CIE XYZ (D65) <-> CIELAB, and linear RGB <-> OKLab
+# Every function takes an array of colors of shape (..., 3) and converts all of them in a single NumPy pass
+#
+# Color difference (distance) metrics:
+#   "de76"   - ΔE*76, euclidean distance in CIELAB
+#   "de2000" - ΔE*00 (CIEDE2000), closest to how different two colors look
+#   "oklab"  - euclidean distance in OKLab, scaled by 100 so it's in the same range as ΔE
+# Distance functions take colors already converted with 'to_metric_space', so a library of colors
+# only has to be converted once.
+#
+# Pairwise distances of many colors are computed in chunks of rows, the memory used stays
+# around 'max_pairs' pairs no matter how many colors there are
+
+
+import numpy as np
+
+
+# sRGB primaries, D65 white point
+_RGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+# OKLab, https://bottosson.github.io/posts/oklab/
+_RGB_TO_LMS = np.array([[0.4122214708, 0.5363325363, 0.0514459929],
+                        [0.2119034982, 0.6806995451, 0.1073969566],
+                        [0.0883024619, 0.2817188376, 0.6299787005]])
+_LMS_TO_OKLAB = np.array([[0.2104542553, 0.7936177850, -0.0040720468],
+                          [1.9779984951, -2.4285922050, 0.4505937099],
+                          [0.0259040371, 0.7827717662, -0.8086757660]])
+_OKLAB_TO_LMS = np.array([[1.0, 0.3963377774, 0.2158037573],
+                          [1.0, -0.1055613458, -0.0638541728],
+                          [1.0, -0.0894841775, -1.2914855480]])
+_LMS_TO_RGB = np.array([[4.0767416621, -3.3077115913, 0.2309699292],
+                        [-1.2684380046, 2.6097574011, -0.3413193965],
+                        [-0.0041960863, -0.7034186147, 1.7076147010]])
+
+_LAB_DELTA = 6 / 29
+OKLAB_SCALE = 100
+# Color pairs per chunk of a distance matrix, small chunks keep the temporary arrays of ΔE2000 (~4 MB) in the CPU cache
+CHUNK_PAIRS = 16384
+
+
+def as_float_colors(values) -> np.ndarray:
+    array = np.asarray(values, dtype=np.float64)
+    if array.shape[-1:] != (3,):
+        raise ValueError(f'Expected an array of shape (..., 3), got {array.shape}')
+    return array
+
+
+# --- Conversions --- #
+
+def srgb_to_linear(rgb) -> np.ndarray:
+    rgb = as_float_colors(rgb) / 255
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+# Result is 0.0 - 255.0, use 'to_rgb8' for integer colors
+def linear_to_srgb(linear) -> np.ndarray:
+    linear = np.clip(as_float_colors(linear), 0, 1)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055) * 255
+
+def to_rgb8(rgb) -> np.ndarray:
+    return np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
+
+def linear_to_xyz(linear) -> np.ndarray:
+    return as_float_colors(linear) @ _RGB_TO_XYZ.T
+
+def xyz_to_linear(xyz) -> np.ndarray:
+    return as_float_colors(xyz) @ _XYZ_TO_RGB.T
+
+def xyz_to_lab(xyz) -> np.ndarray:
+    xyz = as_float_colors(xyz) / WHITE_D65
+    f = np.where(xyz > _LAB_DELTA ** 3, np.cbrt(xyz), xyz / (3 * _LAB_DELTA ** 2) + 4 / 29)
+    return np.stack((116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])), axis=-1)
+
+def lab_to_xyz(lab) -> np.ndarray:
+    lab = as_float_colors(lab)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack((fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200), axis=-1)
+    return np.where(f > _LAB_DELTA, f ** 3, 3 * _LAB_DELTA ** 2 * (f - 4 / 29)) * WHITE_D65
+
+def linear_to_oklab(linear) -> np.ndarray:
+    lms = as_float_colors(linear) @ _RGB_TO_LMS.T
+    return np.cbrt(lms) @ _LMS_TO_OKLAB.T
+
+def oklab_to_linear(oklab) -> np.ndarray:
+    lms = (as_float_colors(oklab) @ _OKLAB_TO_LMS.T) ** 3
+    return lms @ _LMS_TO_RGB.T
+
+def rgb_to_lab(rgb) -> np.ndarray:
+    return xyz_to_lab(linear_to_xyz(srgb_to_linear(rgb)))
+
+def lab_to_rgb(lab) -> np.ndarray:
+    return linear_to_srgb(xyz_to_linear(lab_to_xyz(lab)))
+
+def rgb_to_oklab(rgb) -> np.ndarray:
+    return linear_to_oklab(srgb_to_linear(rgb))
+
+def oklab_to_rgb(oklab) -> np.ndarray:
+    return linear_to_srgb(oklab_to_linear(oklab))
+
+
+# --- Color difference --- #
+# Arrays are broadcast against each other, e.g. (N, 1, 3) and (1, M, 3) give an (N, M) matrix
+
+def delta_e_76(lab1, lab2) -> np.ndarray:
+    return np.sqrt(((as_float_colors(lab1) - as_float_colors(lab2)) ** 2).sum(axis=-1))
+
+# CIEDE2000, formulas from Sharma, Wu & Dalal (2005)
+def delta_e_2000(lab1, lab2) -> np.ndarray:
+    lab1, lab2 = as_float_colors(lab1), as_float_colors(lab2)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - np.sqrt(C_mean ** 7 / (C_mean ** 7 + 25.0 ** 7)))
+    a1, a2 = a1 * (1 + G), a2 * (1 + G)
+    C1, C2 = np.hypot(a1, b1), np.hypot(a2, b2)
+    h1 = np.degrees(np.arctan2(b1, a1)) % 360
+    h2 = np.degrees(np.arctan2(b2, a2)) % 360
+
+    chroma_zero = (C1 * C2) == 0
+    dh = h2 - h1
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(chroma_zero, 0, dh)
+    dL = L2 - L1
+    dC = C2 - C1
+    dH = 2 * np.sqrt(C1 * C2) * np.sin(np.radians(dh / 2))
+
+    L_mean = (L1 + L2) / 2
+    C_mean = (C1 + C2) / 2
+    h_sum = h1 + h2
+    h_mean = np.where(np.abs(h1 - h2) <= 180, h_sum / 2, np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    h_mean = np.where(chroma_zero, h_sum, h_mean)
+
+    T = (1 - 0.17 * np.cos(np.radians(h_mean - 30)) + 0.24 * np.cos(np.radians(2 * h_mean))
+         + 0.32 * np.cos(np.radians(3 * h_mean + 6)) - 0.20 * np.cos(np.radians(4 * h_mean - 63)))
+    d_theta = 30 * np.exp(-((h_mean - 275) / 25) ** 2)
+    R_C = 2 * np.sqrt(C_mean ** 7 / (C_mean ** 7 + 25.0 ** 7))
+    S_L = 1 + 0.015 * (L_mean - 50) ** 2 / np.sqrt(20 + (L_mean - 50) ** 2)
+    S_C = 1 + 0.045 * C_mean
+    S_H = 1 + 0.015 * C_mean * T
+    R_T = -np.sin(np.radians(2 * d_theta)) * R_C
+
+    dL, dC, dH = dL / S_L, dC / S_C, dH / S_H
+    return np.sqrt(np.maximum(dL ** 2 + dC ** 2 + dH ** 2 + R_T * dC * dH, 0))
+
+def delta_e_oklab(oklab1, oklab2) -> np.ndarray:
+    return delta_e_76(oklab1, oklab2)
+
+
+METRICS = {"de76": delta_e_76, "de2000": delta_e_2000, "oklab": delta_e_oklab}
+METRIC_SPACES = {"de76": rgb_to_lab, "de2000": rgb_to_lab, "oklab": lambda rgb: rgb_to_oklab(rgb) * OKLAB_SCALE}
+
+def get_metric(metric: str):
+    if metric not in METRICS:
+        raise ValueError(f'Unknown color metric: {metric}, use one of: {", ".join(METRICS)}')
+    return METRICS[metric]
+
+# sRGB colors converted to the space 'metric' measures distances in
+def to_metric_space(rgb, metric: str = "de2000") -> np.ndarray:
+    get_metric(metric)
+    return METRIC_SPACES[metric](rgb)
+
+
+# --- Pairwise distances --- #
+# 'a' and 'b' are (N, 3) / (M, 3) arrays already converted with 'to_metric_space'
+
+# Yields (first row, block) where block holds distances of rows a[first row:first row + len(block)] to every color of b
+def distance_chunks(a, b, metric: str = "de2000", max_pairs: int = CHUNK_PAIRS):
+    distance = get_metric(metric)
+    a, b = as_float_colors(a).reshape(-1, 3), as_float_colors(b).reshape(-1, 3)
+    rows = max(1, max_pairs // max(1, len(b)))
+    for start in range(0, len(a), rows):
+        yield start, distance(a[start:start + rows, None, :], b[None, :, :])
+
+# Full (N, M) matrix, 'b' defaults to 'a'
+def distance_matrix(a, b=None, metric: str = "de2000", max_pairs: int = CHUNK_PAIRS) -> np.ndarray:
+    b = a if b is None else b
+    a, b = as_float_colors(a).reshape(-1, 3), as_float_colors(b).reshape(-1, 3)
+    matrix = np.empty((len(a), len(b)))
+    for start, block in distance_chunks(a, b, metric, max_pairs):
+        matrix[start:start + len(block)] = block
+    return matrix
+
+# Index of and distance to the closest color of 'b' for every color of 'a', without keeping the whole matrix
+def nearest(a, b, metric: str = "de2000", max_pairs: int = CHUNK_PAIRS) -> (np.ndarray, np.ndarray):
+    a = as_float_colors(a).reshape(-1, 3)
+    indexes = np.empty(len(a), dtype=np.int64)
+    distances = np.empty(len(a))
+    for start, block in distance_chunks(a, b, metric, max_pairs):
+        end = start + len(block)
+        indexes[start:end] = block.argmin(axis=1)
+        distances[start:end] = block[np.arange(len(block)), indexes[start:end]]
+    return indexes, distances
@@ -0,0 +1,54 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Palette file formats that don't need the GUI
+# Every function takes a palette name and a list of colors in the same format the app uses:
+# ((r, g, b), 'HEX', 'ColorName')
+
+
+import json
+import struct
+
+
+# Same layout as 'Export -> Palette as Text File'
+def palette_to_txt(name: str, colors: list) -> bytes:
+    file_contents = f'[{name}]' + '\n'
+    # Each line represents a single color
+    # Format: ((rgb: int), 'HEX: str', 'ColorName: str')
+    for color in colors:
+        file_contents += f'{color}' + '\n'
+    return file_contents.encode()
+
+def palette_to_json(name: str, colors: list, **extra) -> bytes:
+    palette = {"name": name,
+               **extra,
+               "colors": [{"rgb": list(color[0]), "hex": color[1], "name": color[2]} for color in colors]}
+    return json.dumps(palette).encode()
+
+# Adobe Swatch Exchange (.ase), can be loaded into Photoshop, Illustrator, Krita etc.
+def palette_to_ase(name: str, colors: list) -> bytes:
+    blocks = [ase_block(0xC001, ase_string(name))]
+    for color in colors:
+        rgb = [channel / 255 for channel in color[0]]
+        # Color model, 3 channels as 0.0 - 1.0 floats, color type (2 = normal)
+        data = ase_string(color[2] or color[1]) + b'RGB ' + struct.pack('>3fH', *rgb, 2)
+        blocks.append(ase_block(0x0001, data))
+    blocks.append(ase_block(0xC002, b''))
+    return b'ASEF' + struct.pack('>HHI', 1, 0, len(blocks)) + b''.join(blocks)
+
+def ase_block(block_type: int, data: bytes) -> bytes:
+    return struct.pack('>HI', block_type, len(data)) + data
+
+# Length in UTF-16 code units (including the null terminator) followed by the UTF-16BE string
+def ase_string(value: str) -> bytes:
+    encoded = (value + '\0').encode('utf-16-be')
+    return struct.pack('>H', len(encoded) // 2) + encoded
+
+
+PALETTE_FORMATS = {"json": palette_to_json,
+                   "ase": palette_to_ase,
+                   "txt": palette_to_txt}
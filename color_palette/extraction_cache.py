@@ -0,0 +1,139 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Cache for colors extracted from images
+# Results are keyed by the hash of the image file contents and the extraction settings,
+# so importing the same reference image twice doesn't run the extraction again
+# Recently used results are kept in memory, optionally every result is also stored on disk
+# The disk tier keeps at most 'max_disk_entries' files, the least recently used ones (oldest modification time,
+# reading an entry refreshes it) are deleted once there are more
+
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+
+# Bumped whenever the extraction itself changes, results stored on disk by older versions are then ignored
+# 2: transparent pixels are skipped by downsampled extraction too
+# 3: "share_error" renamed to "share_error_estimate"
+RESULT_VERSION = 3
+
+MAX_DISK_ENTRIES = 2000     # a result is ~1-2 KB, so a few MB at most
+
+
+class ExtractionCache:
+    def __init__(self, max_entries: int = 64, disk_dir: str = "", max_disk_entries: int = MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.disk_entries = None     # files in 'disk_dir', counted on the first write
+        self.entries = OrderedDict()
+
+
+    # --- Functions --- #
+
+    # Key = file contents hash + every setting that changes the extraction result
+    @staticmethod
+    def make_key(data: bytes, *settings) -> str:
+        digest = hashlib.sha256(data)
+        digest.update(repr((RESULT_VERSION,) + settings).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        value = self.load_from_disk(key)
+        if value is not None:
+            self.put_in_memory(key, value)
+        return value
+
+    def put(self, key: str, value: dict):
+        self.put_in_memory(key, value)
+        self.save_to_disk(key, value)
+
+    def put_in_memory(self, key: str, value: dict):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def set_disk_dir(self, disk_dir: str):
+        self.disk_dir = disk_dir or ""
+        self.disk_entries = None
+
+    def get_disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.json')
+
+    def load_from_disk(self, key: str):
+        if not self.disk_dir:
+            return None
+        path = self.get_disk_path(key)
+        try:
+            with open(path, "r") as file:
+                value = json.load(file)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    # Write to a temporary file first so a crash never leaves a half written cache entry
+    def save_to_disk(self, key: str, value: dict):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self.get_disk_path(key)
+            exists = os.path.exists(path)
+            with open(path + ".tmp", "w") as file:
+                json.dump(value, file)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(e)
+            return
+
+        if self.disk_entries is None:
+            self.disk_entries = len(self.list_disk_entries())
+        elif not exists:
+            self.disk_entries += 1
+        if self.disk_entries > self.max_disk_entries:
+            self.prune_disk()
+
+    def list_disk_entries(self) -> list:
+        try:
+            return [entry for entry in os.scandir(self.disk_dir) if entry.is_file() and entry.name.endswith(".json")]
+        except OSError:
+            return []
+
+    # Delete the least recently used files, down to 90% of the budget so this doesn't run again on the next write
+    # Other processes may share the directory, so the files are counted again instead of trusting 'disk_entries'
+    def prune_disk(self):
+        entries = []
+        for entry in self.list_disk_entries():
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                pass
+        entries.sort()
+        keep = int(self.max_disk_entries * 0.9)
+        removed = 0
+        for mtime, path in entries[:max(0, len(entries) - keep)]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        self.disk_entries = len(entries) - removed
@@ -0,0 +1,150 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Samples the color under the cursor on a background thread
+#
+# The cursor is checked 'rate' times per second and the screen is captured once per tick.
+# If the cursor didn't move the capture is skipped, the pixel is only sampled again every 'refresh_after' seconds
+# so changes of the screen under a resting cursor (e.g. a video) still show up.
+# Between ticks the thread sleeps on an Event, 'stop()' wakes it up and ends it right away.
+# If a capture fails (e.g. the display went away) the thread ends and keeps the exception in 'error',
+# 'on_error' is called with it so the picker can be closed instead of showing a stale color.
+#
+# Tk widgets may only be touched from the thread running the main loop, so the sampler thread never does that itself:
+# samples are published to a SampleQueue and the main loop takes the newest one out with 'after()' polling.
+
+
+from queue import Queue, Empty, Full
+import sys
+import time
+import traceback
+from threading import Thread, Event, current_thread
+
+import numpy as np
+
+
+SAMPLE_MODES = ("mean", "median")
+
+
+# --- Loupe --- #
+
+# Color of the 'size' x 'size' window in the middle of a captured region
+# Averaging a few pixels gives steadier picks from dithered or JPEG-compressed images than a single pixel
+def sample_region(region: np.ndarray, size: int = 1, mode: str = "mean") -> (int, int, int):
+    if mode not in SAMPLE_MODES:
+        raise ValueError(f'Unknown sample mode: {mode}, use one of: {", ".join(SAMPLE_MODES)}')
+    height, width = region.shape[:2]
+    size = max(1, min(size, height, width))
+    top, left = (height - size) // 2, (width - size) // 2
+    window = region[top:top + size, left:left + size].reshape(-1, 3)
+    if size == 1:
+        return tuple(int(value) for value in window[0])
+    if mode == "median":
+        values = np.median(window, axis=0)
+    else:
+        values = window.mean(axis=0)
+    return tuple(int(value) for value in np.rint(values))
+
+# Enlarge every pixel to a 'zoom' x 'zoom' block (nearest neighbour, keeps the pixels sharp)
+def magnify(region: np.ndarray, zoom: int) -> np.ndarray:
+    return region.repeat(zoom, axis=0).repeat(zoom, axis=1)
+
+
+# Bounded queue between the sampler thread (producer) and the Tk main loop (consumer)
+# The producer never blocks, when the queue is full the oldest sample is dropped
+class SampleQueue(Queue):
+    def __init__(self, maxsize: int = 4):
+        super().__init__(maxsize=max(1, maxsize))
+
+    def publish(self, sample):
+        while True:
+            try:
+                self.put_nowait(sample)
+                return
+            except Full:
+                try:
+                    self.get_nowait()
+                except Empty:
+                    pass
+
+    # Empty the queue and return only the newest sample, older ones are out of date anyway
+    def latest(self, default=None):
+        sample = default
+        while True:
+            try:
+                sample = self.get_nowait()
+            except Empty:
+                return sample
+
+
+class EyedropperSampler:
+    def __init__(self, get_position, get_sample, on_sample, rate: float = 30, refresh_after: float = 0.5, on_error=None):
+        self.get_position = get_position    # () -> (x, y)
+        self.get_sample = get_sample        # ((x, y)) -> sample, e.g. the color under the cursor
+        self.on_sample = on_sample          # ((x, y), sample) -> None
+        self.on_error = on_error            # (exception) -> None, called on the sampler thread
+        self.interval = 1 / max(float(rate), 1.0)
+        self.refresh_after = refresh_after
+
+        self.last_position = None
+        self.last_sample_time = 0.0
+        self.stop_event = Event()
+        self.thread = None
+        self.error = None
+
+
+    # --- Thread --- #
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.last_position = None
+            self.error = None
+            self.thread = Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    # Returns False if the thread is still busy with a capture after 'timeout' seconds
+    def stop(self, timeout: float = 1.0) -> bool:
+        self.stop_event.set()
+        thread, self.thread = self.thread, None
+        if thread and thread is not current_thread():
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                self.tick()
+            except Exception as e:
+                self.error = e
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    traceback.print_exc(file=sys.stderr)
+                return
+            self.stop_event.wait(max(0.0, self.interval - (time.perf_counter() - started)))
+
+
+    # --- Sampling --- #
+
+    # One step of the loop, returns the new (position, sample) or None if nothing was captured
+    def tick(self):
+        position = tuple(self.get_position())
+        now = time.monotonic()
+        if position == self.last_position and now - self.last_sample_time < self.refresh_after:
+            return None
+
+        sample = self.get_sample(position)
+        self.last_position = position
+        self.last_sample_time = now
+        self.on_sample(position, sample)
+        return position, sample
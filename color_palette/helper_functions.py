@@ -5,7 +5,6 @@
 # Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
 
 
-from math import ceil
 from random import randint
 from typing import Tuple
 
@@ -14,6 +13,17 @@ cmyk_value = Tuple[float, float, float, float]
 rgb_value = Tuple[int, int, int]
 color = Tuple[rgb_value, str, str]
 
+# The scalar conversions wrap batch_functions, which needs NumPy. It's imported on the first conversion instead of here,
+# so startup stays NumPy-free (see classes.py), and kept in this global so later calls don't run the import again
+batch_functions = None
+
+def get_batch_functions():
+    global batch_functions
+    if batch_functions is None:
+        import batch_functions as module
+        batch_functions = module
+    return batch_functions
+
 
 # check if string parameter is a valid HEX value
 def is_hex_color(color: str) -> bool:
@@ -27,8 +37,7 @@ def is_rgb_color(color: rgb_value) -> bool:
     return all(cases)
 
 def hex_to_rgb(hex_value: str) -> str:
-    hex = hex_value.lstrip('#')
-    return str(tuple(int(hex[i:i + 2], 16) for i in (0, 2, 4)))
+    return str(tuple(int(val) for val in get_batch_functions().hex_to_rgb_batch(hex_value)[0]))
 
 def rgb_to_hex(rgb: rgb_value) -> str:
     # Legacy Code
@@ -36,13 +45,17 @@ def rgb_to_hex(rgb: rgb_value) -> str:
     #hex = bytes(rgb).hex()
     #return f'#{hex}'
 
-    return '#%02x%02x%02x' % (rgb[0], rgb[1], rgb[2])
+    return str(get_batch_functions().rgb_to_hex_batch(rgb[:3])[0])
 
 def cmyk_to_rgb(cmyk: cmyk_value) -> rgb_value:
-    r = ceil((255 * (1 - cmyk[0]/100) * (1 - cmyk[3]/100)) + 1)
-    g = ceil((255 * (1 - cmyk[1]/100) * (1 - cmyk[3]/100))+ 1)
-    b = ceil((255 * (1 - cmyk[2]/100) * (1 - cmyk[3]/100))+ 1)
-    return (r,g,b)
+    r, g, b = get_batch_functions().cmyk_to_rgb_batch(cmyk)[0]
+    return (int(r), int(g), int(b))
+
+# (r, g, b) tuple of ints, no matter if the value is a tuple, NumPy array or a "r, g, b" / "(r, g, b)" string
+def normalize_rgb(rgb) -> rgb_value:
+    if isinstance(rgb, str):
+        rgb = rgb.replace('(', "").replace(')', "").split(',')
+    return (int(rgb[0]), int(rgb[1]), int(rgb[2]))
 
 def str_to_rgb(rgb_str: (str, str, str)) -> rgb_value:
     return (int(rgb_str[0]), int(rgb_str[1]), int(rgb_str[2]))
@@ -54,31 +67,9 @@ def random_rgb() -> rgb_value:
     return (randint(0, 255), randint(0, 255), randint(0, 255))
 
 def get_shade(rgb_color: rgb_value, scalar: float = 1.0):
-    cmyk = rgb_to_cmyk(rgb_color[0], rgb_color[1], rgb_color[2], scalar)
-    return cmyk_to_rgb(cmyk)
+    r, g, b = get_batch_functions().get_shade_batch(rgb_color[:3], scalar)[0]
+    return (int(r), int(g), int(b))
 
 def rgb_to_cmyk(r: int, g: int, b: int, scalar: float) -> cmyk_value:
-    RGB_SCALE = 255
-    CMYK_SCALE = 100
-
-    if (r, g, b) == (0, 0, 0):
-        # black
-        return 0, 0, 0, CMYK_SCALE
-
-    # rgb [0,255] -> cmy [0,1]
-    c = 1 - r / RGB_SCALE
-    m = 1 - g / RGB_SCALE
-    y = 1 - b / RGB_SCALE
-
-    # extract out k [0, 1]
-    min_cmy = min(c, m, y)
-    c = (c - min_cmy) / (1 - min_cmy)
-    m = (m - min_cmy) / (1 - min_cmy)
-    y = (y - min_cmy) / (1 - min_cmy)
-    k = min_cmy
-
-    # rescale to the range [0,CMYK_SCALE]
-    return clamp_cmyk(c * CMYK_SCALE), clamp_cmyk(m * CMYK_SCALE), clamp_cmyk(y * CMYK_SCALE), clamp_cmyk((k * CMYK_SCALE) * scalar)
-
-def clamp_cmyk(value: float):
-    return float(min(ceil(value), 100))
\ No newline at end of file
+    c, m, y, k = get_batch_functions().rgb_to_cmyk_batch((r, g, b), scalar)[0]
+    return float(c), float(m), float(y), float(k)
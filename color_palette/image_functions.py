@@ -4,22 +4,130 @@
 # Edited for this program needs, I do not claim the ownership of this script
 
 
+import io
 import math
+import os
+from typing import NamedTuple
 import PIL
-import extcolors
 import numpy as np
-import matplotlib.pyplot as plt
 from PIL import Image, ImageDraw
-from matplotlib import gridspec
 
+from extraction_cache import ExtractionCache
+from instrumentation import traced
+from quantizers import quantize
 
-def get_colors(img_path):
-    img = PIL.Image.open(img_path)
-    print(extract_colors(img))
-    return extract_colors(img)
 
-def colors_to_image(palette_colors: tuple, file):
-    color_palette = render_color_palette(palette_colors, file)
+TOLERANCE = 32
+LIMIT = 24
+
+# Palette image (swatch sheet) layout
+SWATCH_SIZE = 100
+SWATCH_COLUMNS = 6
+# Image formats without transparency, empty cells of the last row become black
+NO_ALPHA_FORMATS = ("JPEG", "BMP")
+
+# z-score used for the error estimate of downsampled extraction (95% confidence)
+CONFIDENCE_Z = 1.96
+
+extraction_cache = ExtractionCache()
+
+
+# Colors found in an image
+# colors: list of ((r, g, b), pixel count) sorted from the most common color
+# pixel_count: amount of pixels in the full resolution image
+# share_error_estimate: rough size of the error of each color's share of the image (0.0 - 1.0) caused by downsampling,
+#                       0.0 when the image was processed pixel-for-pixel. This is a heuristic, not a bound: it is the
+#                       error of a random sample of the same size, see 'random_sampling_error'
+class ExtractionResult(NamedTuple):
+    colors: list
+    pixel_count: int
+    share_error_estimate: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {"colors": [[list(rgb), count] for rgb, count in self.colors],
+                "pixel_count": self.pixel_count,
+                "share_error_estimate": self.share_error_estimate}
+
+    @staticmethod
+    def from_dict(value: dict):
+        return ExtractionResult([(tuple(rgb), count) for rgb, count in value["colors"]],
+                                value["pixel_count"],
+                                value.get("share_error_estimate", 0.0))
+
+
+@traced(category="extraction")
+def get_colors(img_path, max_pixels: int = 0):
+    return extract_palette(img_path, max_pixels=max_pixels).colors
+
+# Extract colors from an image file, runs the extraction only once per unique file contents
+# max_pixels: reduce the image to about this many pixels first (0 = use full resolution)
+# method: "thumbnail" (area average) or "stride" (every n-th pixel, keeps exact colors)
+# backend: "extcolors" or one of the native quantizers - "median_cut", "octree", "kmeans"
+@traced(category="extraction")
+def extract_palette(img_path, tolerance: int = TOLERANCE, limit: int = LIMIT, max_pixels: int = 0,
+                    method: str = "thumbnail", backend: str = "extcolors", cache: ExtractionCache = None) -> ExtractionResult:
+    cache = cache if cache else extraction_cache
+    with open(img_path, "rb") as file:
+        data = file.read()
+
+    key = cache.make_key(data, tolerance, limit, max_pixels, method, backend)
+    cached = cache.get(key)
+    if cached is not None:
+        return ExtractionResult.from_dict(cached)
+
+    img = PIL.Image.open(io.BytesIO(data))
+    full_pixel_count = img.width * img.height
+    img = reduce_image(img, max_pixels, method)
+    colors, pixel_count = extract_with_backend(img, tolerance, limit, backend)
+
+    share_error_estimate = 0.0
+    if pixel_count < full_pixel_count:
+        # Scale pixel counts back to the full resolution image
+        scale = full_pixel_count / pixel_count
+        colors = [(rgb, round(count * scale)) for rgb, count in colors]
+        share_error_estimate = random_sampling_error(pixel_count)
+
+    result = ExtractionResult(colors, full_pixel_count, share_error_estimate)
+    cache.put(key, result.to_dict())
+    return result
+
+# Shrink the image so it has at most 'max_pixels' pixels
+# Transparency is kept, so fully transparent pixels are still skipped by the extraction backends
+def reduce_image(img, max_pixels: int, method: str = "thumbnail"):
+    width, height = img.size
+    if not max_pixels or width * height <= max_pixels:
+        return img
+
+    mode = "RGBA" if has_alpha(img) else "RGB"
+    if method == "stride":
+        step = math.ceil(math.sqrt(width * height / max_pixels))
+        return Image.fromarray(np.asarray(img.convert(mode))[::step, ::step], mode)
+    elif method == "thumbnail":
+        ratio = math.sqrt(max_pixels / (width * height))
+        size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+        # Lets the JPEG decoder skip most of the work by decoding straight at a lower scale
+        img.draft("RGB", size)
+        img = img.convert(mode)
+        img.thumbnail(size, Image.Resampling.BOX)
+        return img
+    else:
+        raise ValueError(f'Unknown reduce method: {method}')
+
+def has_alpha(img) -> bool:
+    return img.mode in ("RGBA", "LA", "PA", "RGBa", "La") or "transparency" in img.info
+
+# Worst case error (at the given confidence) of a color's share estimated from 'sample_size' randomly picked pixels
+# Neither reduce method picks pixels at random: "thumbnail" averages neighbouring pixels (which also creates new colors)
+# and "stride" takes a regular grid, so the real error can be larger, e.g. for fine patterns lined up with the grid
+def random_sampling_error(sample_size: int) -> float:
+    return CONFIDENCE_Z * math.sqrt(0.25 / sample_size)
+
+def set_cache_dir(disk_dir: str):
+    extraction_cache.set_disk_dir(disk_dir)
+
+# file: path or file object, options: see 'render_color_palette'
+def colors_to_image(palette_colors: tuple, file, **options):
+    return render_color_palette(palette_colors, file, **options)
 
 def study_image(image_path):
     img = PIL.Image.open(image_path)
@@ -27,27 +135,68 @@ def study_image(image_path):
     color_palette = render_color_palette(colors, None)
     overlay_palette(color_palette)
 
-def extract_colors(img):
-  tolerance = 32
-  limit = 24
-  colors, pixel_count = extcolors.extract_from_image(img, tolerance, limit)
+def extract_colors(img, tolerance: int = TOLERANCE, limit: int = LIMIT, backend: str = "extcolors"):
+  colors, pixel_count = extract_with_backend(img, tolerance, limit, backend)
   return colors
 
-def render_color_palette(colors, file):
-  size = 100
-  columns = 6
-  width = int(min(len(colors), columns) * size)
-  height = int((math.floor(len(colors) / columns) + 1) * size)
-  result = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-  canvas = ImageDraw.Draw(result)
-  for idx, color in enumerate(colors):
-      x = int((idx % columns) * size)
-      y = int(math.floor(idx / columns) * size)
-      canvas.rectangle([(x, y), (x + size - 1, y + size - 1)], fill=color[0])
-  result.save(file.name)
+# Native quantizers ignore 'tolerance', they always return up to 'limit' colors
+def extract_with_backend(img, tolerance: int, limit: int, backend: str = "extcolors"):
+  if backend == "extcolors":
+      import extcolors
+      return extcolors.extract_from_image(img, tolerance, limit)
+  # Fully transparent pixels are skipped but still counted, like 'extcolors' does
+  pixels = np.asarray(img.convert("RGBA")).reshape(-1, 4)
+  return quantize(pixels[pixels[:, 3] > 0, :3], backend, limit), len(pixels)
+
+# Swatch sheet of ((r, g, b), count) colors, 'swatch_size' px square per color and 'columns' colors per row
+# file: path or file object (e.g. from a save dialog) to save it to, None = only return the image
+# labels: write the HEX value on every swatch, format: image format, by default it's taken from the file extension
+def render_color_palette(colors, file=None, swatch_size: int = SWATCH_SIZE, columns: int = SWATCH_COLUMNS,
+                         labels: bool = False, format: str = None):
+  result = Image.fromarray(palette_to_array(colors, swatch_size, columns), "RGBA")
+  if labels:
+      draw_labels(result, colors, swatch_size, columns)
+  if file:
+      save_image(result, file, format)
   return result
 
+# RGBA array of the swatch sheet, cells after the last color are transparent
+def palette_to_array(colors, swatch_size: int = SWATCH_SIZE, columns: int = SWATCH_COLUMNS) -> np.ndarray:
+    rgb = np.array([color[0] for color in colors], dtype=np.uint8).reshape(-1, 3)
+    columns = max(1, min(len(rgb), columns))
+    rows = -(-len(rgb) // columns)
+
+    cells = np.zeros((rows * columns, 4), dtype=np.uint8)
+    cells[:len(rgb), :3] = rgb
+    cells[:len(rgb), 3] = 255
+    # Every cell of the (rows, columns) grid stretched to a square, the reshape is the only copy
+    cells = cells.reshape(rows, 1, columns, 1, 4)
+    sheet = np.broadcast_to(cells, (rows, swatch_size, columns, swatch_size, 4))
+    return sheet.reshape(rows * swatch_size, columns * swatch_size, 4)
+
+def draw_labels(image, colors, swatch_size: int, columns: int):
+    from batch_functions import rgb_to_hex_batch
+    rgb = np.array([color[0] for color in colors], dtype=np.float64).reshape(-1, 3)
+    # Dark text on bright colors, white text on dark ones
+    bright = rgb @ np.array([0.299, 0.587, 0.114]) > 140
+    canvas = ImageDraw.Draw(image)
+    for idx, hex_value in enumerate(rgb_to_hex_batch(rgb.astype(np.int64)).tolist()):
+        x = (idx % columns) * swatch_size + 4
+        y = (idx // columns + 1) * swatch_size - 14
+        canvas.text((x, y), hex_value, fill="black" if bright[idx] else "white")
+
+def save_image(image, file, format: str = None):
+    path = file if isinstance(file, str) else file.name
+    if not format:
+        format = Image.registered_extensions().get(os.path.splitext(path)[1].lower(), "PNG")
+    format = format.upper()
+    if format in NO_ALPHA_FORMATS:
+        image = image.convert("RGB")
+    image.save(path, format=format)
+
 def overlay_palette(color_palette):
+  import matplotlib.pyplot as plt
+  from matplotlib import gridspec
   nrow = 2
   ncol = 1
   f = plt.figure(figsize=(8,5), facecolor='None', edgecolor='k', dpi=55, num=None)
@@ -0,0 +1,160 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Timings and call counts of startup and hot paths
+#
+# Off by default. Turned on with the COLOR_PALETTE_TRACE environment variable or the "InstrumentationTrace" setting,
+# both hold the path of the file the results are written to when the program exits:
+#   *.jsonl     - structured log, one JSON object per timed call and a summary line at the end
+#   otherwise   - Chrome trace JSON, open it in chrome://tracing or https://ui.perfetto.dev
+# The environment variable covers the whole startup, the setting only takes effect once the config file is loaded.
+#
+# Functions are marked with '@traced()'. While instrumentation is off the decorator returns the function itself,
+# there is no wrapper and no overhead. 'enable()' swaps every marked function for a timing wrapper,
+# 'disable()' puts the original functions back.
+
+
+import atexit
+from functools import wraps
+import json
+import os
+import sys
+import threading
+import time
+
+
+ENV_VARIABLE = "COLOR_PALETTE_TRACE"
+MAX_EVENTS = 500000     # after that calls are only counted, keeps memory flat in long sessions
+
+recorder = None
+registry = []   # (function, name, category) of every '@traced()' function
+
+
+class Recorder:
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.perf_counter()
+        self.events = []
+        self.summary = {}   # name -> [calls, total seconds, max seconds]
+        self.lock = threading.Lock()
+
+    def record(self, name: str, category: str, start: float, duration: float):
+        with self.lock:
+            stats = self.summary.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            if len(self.events) < MAX_EVENTS:
+                self.events.append((name, category, start - self.started, duration, threading.get_ident()))
+
+    def get_summary(self) -> dict:
+        with self.lock:
+            return {name: {"calls": calls, "total_ms": total * 1000, "max_ms": longest * 1000}
+                    for name, (calls, total, longest) in sorted(self.summary.items(), key=lambda item: -item[1][1])}
+
+
+    # --- Export --- #
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = [{"name": name, "cat": category, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": pid, "tid": tid}
+                  for name, category, start, duration, tid in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"summary": self.get_summary()}}
+
+    def to_log_lines(self) -> list:
+        lines = [json.dumps({"name": name, "category": category, "start_ms": start * 1000,
+                             "duration_ms": duration * 1000, "thread": tid})
+                 for name, category, start, duration, tid in self.events]
+        lines.append(json.dumps({"summary": self.get_summary()}))
+        return lines
+
+    def save(self, path: str = None):
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            if path.endswith(".jsonl"):
+                file.write("\n".join(self.to_log_lines()) + "\n")
+            else:
+                json.dump(self.to_chrome_trace(), file)
+
+
+# --- Decorator --- #
+
+def traced(name: str = None, category: str = "app"):
+    def decorator(function):
+        entry = (function, name or function.__qualname__, category)
+        registry.append(entry)
+        return create_wrapper(*entry) if recorder else function
+    return decorator
+
+def create_wrapper(function, name: str, category: str):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if recorder:    # a wrapper kept somewhere (e.g. a bound method) can outlive 'disable()'
+                recorder.record(name, category, start, time.perf_counter() - start)
+    wrapper.traced_function = function
+    return wrapper
+
+# Module or class the function is defined on, None for nested functions
+def get_owner(function):
+    owner = sys.modules.get(function.__module__)
+    path = function.__qualname__.split(".")
+    if "<locals>" in path:
+        return None
+    for part in path[:-1]:
+        owner = getattr(owner, part, None)
+    return owner
+
+
+# --- Switch --- #
+
+def is_enabled() -> bool:
+    return recorder is not None
+
+# Start recording, results are written to 'path' on exit
+def enable(path: str):
+    global recorder
+    if recorder:
+        return
+    recorder = Recorder(path)
+    atexit.register(save)
+
+    for function, name, category in registry:
+        owner = get_owner(function)
+        attribute = function.__name__
+        if owner is not None and vars(owner).get(attribute) is function:
+            setattr(owner, attribute, create_wrapper(function, name, category))
+
+# Stop recording and restore the original functions, returns the Recorder with the results so far
+# Nothing is written on exit anymore, use 'Recorder.save' for that
+def disable():
+    global recorder
+    if not recorder:
+        return None
+    stopped, recorder = recorder, None
+    atexit.unregister(save)
+
+    for function, name, category in registry:
+        owner = get_owner(function)
+        attribute = function.__name__
+        if owner is not None and getattr(vars(owner).get(attribute), "traced_function", None) is function:
+            setattr(owner, attribute, function)
+    return stopped
+
+def save(path: str = None):
+    if recorder:
+        recorder.save(path)
+
+
+if os.environ.get(ENV_VARIABLE):
+    enable(os.environ[ENV_VARIABLE])
@@ -0,0 +1,34 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Saved palette, kept apart from the GUI so the save file / search code can use it without tkinter
+
+
+from color_list import ColorList
+
+
+class Palette:
+    def __init__(self, name: str, colors, loader=None):
+        self.name = name
+        self._colors = None
+        # Palettes from the save file are loaded lazily, 'loader' returns their colors on first use
+        self.loader = loader
+        if colors is not None:
+            self.colors = colors
+
+    @property
+    def colors(self):
+        if self._colors is None:
+            self._colors = ColorList(self.loader() if self.loader else [])
+        return self._colors
+
+    @colors.setter
+    def colors(self, colors):
+        self._colors = colors if isinstance(colors, ColorList) else ColorList(colors)
+
+    def is_loaded(self) -> bool:
+        return self._colors is not None
@@ -0,0 +1,197 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Near-duplicate colors and palettes of a palette library
+#
+# Two colors are duplicates when their ΔE (OKLab x 100, like 'palette_search.py') is at most 'threshold'.
+# Two palettes are duplicates when every color of each has a duplicate in the other one (Hausdorff distance),
+# duplicates of duplicates end up in the same group.
+#
+# Palettes aren't compared with each other one by one. Every palette gets a descriptor: the lowest and highest value
+# of its colors along a few directions of OKLab. Duplicate palettes can't have descriptors more than 'threshold' apart
+# on any of them, so candidates are found with a grid join of the descriptors and only those are compared color
+# by color. Everything runs on NumPy arrays in chunks of about 'max_pairs' pairs.
+
+
+from itertools import product
+from typing import NamedTuple
+
+import numpy as np
+
+from color_spaces import to_metric_space
+from palette_search import METRIC, rgb_array
+
+
+THRESHOLD = 2.0     # ΔE (OKLab x 100), about the smallest difference that can be seen
+CHUNK_PAIRS = 1 << 20
+# Directions of the palette descriptors: the OKLab axes and the diagonals of the cube, unit length
+DIRECTIONS = np.array([(1, 0, 0), (0, 1, 0), (0, 0, 1),
+                       (1, 1, 1), (1, 1, -1), (1, -1, 1), (-1, 1, 1)]) / np.sqrt([1, 1, 1, 3, 3, 3, 3])[:, None]
+# Descriptor columns used for the grid, more columns = fewer candidates but 3^n neighbouring cells
+GRID_COLUMNS = 5
+
+
+# palette_groups: [[palette index, ...], ...], palettes in each group are duplicates, sorted, the first one is kept
+# color_groups: [(palette index, [color index, ...]), ...], duplicate colors of one palette, the first one is kept
+class DuplicateReport(NamedTuple):
+    palette_groups: list
+    color_groups: list
+
+    def duplicate_palettes(self) -> int:
+        return sum(len(group) - 1 for group in self.palette_groups)
+
+    def duplicate_colors(self) -> int:
+        return sum(len(group) - 1 for palette, group in self.color_groups)
+
+
+# --- Pairs --- #
+
+# Yields (rows, partners) chunks, every row i is paired with partners low[i], low[i] + 1, ..., high[i] - 1
+def expand_ranges(low: np.ndarray, high: np.ndarray, max_pairs: int = CHUNK_PAIRS):
+    counts = np.maximum(high - low, 0)
+    ends = np.cumsum(counts)
+    if not len(ends) or not ends[-1]:
+        return
+    bounds = np.searchsorted(ends, np.arange(max_pairs, ends[-1], max_pairs), "right")
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(counts)]):
+        chunk = counts[start:end]
+        rows = np.repeat(np.arange(start, end), chunk)
+        steps = np.arange(len(rows)) - np.repeat(np.cumsum(chunk) - chunk, chunk)
+        yield rows, np.repeat(low[start:end], chunk) + steps
+
+# Pairs (i, j) of rows of 'points' (N, D) whose values all differ by at most 'threshold' (Chebyshev distance),
+# every pair appears once. Rows are bucketed by up to GRID_COLUMNS of their most spread out columns.
+def close_points(points: np.ndarray, threshold: float, max_pairs: int = CHUNK_PAIRS) -> (np.ndarray, np.ndarray):
+    cells = np.floor(points / max(threshold, 1e-9)).astype(np.int64)
+    cells -= cells.min(axis=0, initial=0) - 1
+    # Cell coordinates packed into one int64 key, with room for the -1 / +1 neighbours on each side
+    columns, weights, key_range = [], [], 1
+    for column in np.argsort(-points.std(axis=0))[:GRID_COLUMNS].tolist():
+        size = int(cells[:, column].max(initial=0)) + 2
+        if key_range * size >= 1 << 62:
+            break
+        columns.append(column)
+        weights = [weight * size for weight in weights] + [1]
+        key_range *= size
+    keys = cells[:, columns] @ np.array(weights, dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    points, keys = points[order], keys[order]
+
+    first, second = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    # Half of the neighbouring cells are enough as every pair is found from its lower cell
+    for offset in product((-1, 0, 1), repeat=len(columns)):
+        if offset < (0,) * len(columns):
+            continue
+        neighbour_keys = keys + int(np.dot(offset, weights))
+        low = np.searchsorted(keys, neighbour_keys, "left")
+        high = np.searchsorted(keys, neighbour_keys, "right")
+        if not any(offset):
+            low = np.maximum(low, np.arange(len(keys)) + 1)    # same cell, only rows after this one
+        for rows, partners in expand_ranges(low, high, max_pairs):
+            close = np.abs(points[rows] - points[partners]).max(axis=1) <= threshold
+            first.append(rows[close])
+            second.append(partners[close])
+    return order[np.concatenate(first)], order[np.concatenate(second)]
+
+# Connected components with 2+ nodes of the graph with the given edges, nodes of a component are sorted
+def group_pairs(first, second) -> list:
+    parents = {}
+
+    def find(node):
+        root = parents.setdefault(node, node)
+        while root != parents[root]:
+            root = parents[root]
+        while node != root:
+            parents[node], node = root, parents[node]
+        return root
+
+    for a, b in zip(np.asarray(first).tolist(), np.asarray(second).tolist()):
+        a, b = find(a), find(b)
+        if a != b:
+            parents[max(a, b)] = min(a, b)
+
+    groups = {}
+    for node in sorted(parents):
+        groups.setdefault(find(node), []).append(node)
+    return sorted(group for group in groups.values() if len(group) > 1)
+
+
+# --- Duplicates --- #
+
+# Colors of palette a[k] that have a color of palette b[k] within 'threshold', counted for every k
+# starts / sizes: where the colors of every palette are in 'lab'
+def count_covered(lab, starts, sizes, a, b, threshold: float, max_pairs: int = CHUNK_PAIRS) -> np.ndarray:
+    covered = np.zeros(len(a), dtype=np.int64)
+    # One entry per color of a[k] x color of b[k], grouped by pair, then by the color of a[k]
+    counts = sizes[a] * sizes[b]
+    ends = np.cumsum(counts)
+    if not len(ends):
+        return covered
+    bounds = np.searchsorted(ends, np.arange(max_pairs, ends[-1], max_pairs), "right")
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(a)]):
+        pairs = np.arange(start, end)
+        pair_of = np.repeat(pairs, counts[start:end])
+        steps = np.arange(len(pair_of)) - np.repeat(np.cumsum(counts[start:end]) - counts[start:end], counts[start:end])
+        width = sizes[b][pair_of]
+        source = starts[a][pair_of] + steps // width
+        target = starts[b][pair_of] + steps % width
+        close = ((lab[source] - lab[target]) ** 2).sum(axis=1) <= threshold ** 2
+
+        # Groups of 'width' entries are one color of a[k], groups of sizes[a[k]] colors are one pair
+        color_starts = np.flatnonzero(steps % width == 0)
+        has_duplicate = np.logical_or.reduceat(close, color_starts)
+        pair_starts = np.flatnonzero(steps[color_starts] == 0)
+        covered[start:end] = np.add.reduceat(has_duplicate.astype(np.int64), pair_starts)
+    return covered
+
+# palettes: list with the colors of every palette, colors: ((r, g, b), 'HEX', 'ColorName') or (r, g, b)
+# RGB values of full colors can also be text, e.g. "(199, 34, 49)"
+def find_duplicates(palettes: list, threshold: float = THRESHOLD, max_pairs: int = CHUNK_PAIRS) -> DuplicateReport:
+    sizes = np.array([len(colors) for colors in palettes], dtype=np.int64)
+    starts = np.cumsum(sizes) - sizes
+    owners = np.repeat(np.arange(len(palettes)), sizes)
+    rgb = [color[0] if isinstance(color[0], (tuple, list, str)) else color for colors in palettes for color in colors]
+    if not rgb:
+        return DuplicateReport([], [])
+    lab = to_metric_space(rgb_array(rgb), METRIC)
+
+    # Colors of one palette: every color against the colors after it in the same palette
+    first, second = [], []
+    for rows, partners in expand_ranges(np.arange(len(lab)) + 1, (starts + sizes)[owners], max_pairs):
+        close = ((lab[rows] - lab[partners]) ** 2).sum(axis=1) <= threshold ** 2
+        first.append(rows[close])
+        second.append(partners[close])
+    color_groups = [(int(owners[group[0]]), (np.array(group) - starts[owners[group[0]]]).tolist())
+                    for group in group_pairs(np.concatenate(first or [[]]), np.concatenate(second or [[]]))]
+
+    # Palettes: candidates by descriptor, then every color of each one has to have a duplicate in the other one
+    filled = np.flatnonzero(sizes)
+    projections = lab @ DIRECTIONS.T
+    descriptors = np.hstack((np.minimum.reduceat(projections, starts[filled]),
+                             np.maximum.reduceat(projections, starts[filled])))
+    a, b = close_points(descriptors, threshold, max_pairs)
+    a, b = filled[a], filled[b]
+    duplicate = ((count_covered(lab, starts, sizes, a, b, threshold, max_pairs) == sizes[a])
+                 & (count_covered(lab, starts, sizes, b, a, threshold, max_pairs) == sizes[b]))
+    palette_groups = group_pairs(a[duplicate], b[duplicate])
+    return DuplicateReport(palette_groups, color_groups)
+
+# palettes: list of (name, colors) pairs, returns them without the duplicates of 'report'
+# The first palette of every group is kept, duplicate colors of a palette are removed except for the first one
+def merge_duplicates(palettes: list, report: DuplicateReport) -> list:
+    removed_palettes = set(index for group in report.palette_groups for index in group[1:])
+    removed_colors = {}
+    for palette, group in report.color_groups:
+        removed_colors.setdefault(palette, set()).update(group[1:])
+
+    merged = []
+    for index, (name, colors) in enumerate(palettes):
+        if index in removed_palettes:
+            continue
+        removed = removed_colors.get(index, ())
+        merged.append((name, [color for idx, color in enumerate(colors) if idx not in removed]))
+    return merged
@@ -0,0 +1,240 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Incremental palette saving
+#
+# Instead of rewriting the whole save file, every save appends only the changes since the last save
+# to '<save file>.journal'. Loading replays the journal on top of the save file.
+# Once the journal grows too big it's compacted: the save file is rewritten and the journal removed.
+#
+# Journal format (JSON Lines):
+#   line 1:  {"format": "color_palette_journal", "generation": <generation of the save file it belongs to>}
+#   line 2+: operations, each save ends with {"op": "commit"}
+#
+# Operations (indexes point into the list of saved palettes at the time the operation is applied):
+#   {"op": "new", "name": str, "colors": [color, ...]}
+#   {"op": "delete", "index": int}
+#   {"op": "rename", "index": int, "name": str}
+#   {"op": "add_colors", "index": int, "colors": [color, ...]}
+#   {"op": "remove_color", "index": int, "color_index": int}
+#   {"op": "set_color", "index": int, "color_index": int, "color": color}
+#   {"op": "set_colors", "index": int, "colors": [color, ...]}
+#
+# Operations after the last 'commit' (e.g. the program crashed mid-save) are ignored and cut off
+
+
+import json
+import os
+
+from instrumentation import traced
+from palette_store import FORMAT_NAME, load_palettes, save_palettes, read_header, dump_line, \
+    color_from_record, color_to_record, index_palettes, read_palette_at, is_legacy_file
+
+
+JOURNAL_FORMAT_NAME = FORMAT_NAME + "_journal"
+COLOR_OPS = ("add_colors", "remove_color", "set_color", "set_colors")
+
+
+# --- Operations --- #
+
+def apply_op(palettes: list, op: dict):
+    kind = op["op"]
+    if kind == "new":
+        palettes.append([op["name"], [color_from_record(color) for color in op["colors"]]])
+    elif kind == "delete":
+        palettes.pop(op["index"])
+    elif kind == "rename":
+        palettes[op["index"]][0] = op["name"]
+    elif kind == "add_colors":
+        palettes[op["index"]][1].extend(color_from_record(color) for color in op["colors"])
+    elif kind == "remove_color":
+        palettes[op["index"]][1].pop(op["color_index"])
+    elif kind == "set_color":
+        palettes[op["index"]][1][op["color_index"]] = color_from_record(op["color"])
+    elif kind == "set_colors":
+        palettes[op["index"]][1] = [color_from_record(color) for color in op["colors"]]
+    else:
+        raise ValueError(f'Unknown journal operation: {kind}')
+
+# Smallest set of operations that turns 'old' colors of a palette into 'new' ones
+def diff_colors(index: int, old: list, new: list) -> list:
+    if old == new:
+        return []
+
+    if len(new) > len(old) and new[:len(old)] == old:
+        return [{"op": "add_colors", "index": index, "colors": [color_to_record(color) for color in new[len(old):]]}]
+
+    if len(new) == len(old) - 1:
+        removed = next((i for i, (a, b) in enumerate(zip(old, new)) if a != b), len(new))
+        if old[removed + 1:] == new[removed:]:
+            return [{"op": "remove_color", "index": index, "color_index": removed}]
+
+    if len(new) == len(old):
+        changed = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+        if len(changed) < len(new):
+            return [{"op": "set_color", "index": index, "color_index": i, "color": color_to_record(new[i])}
+                    for i in changed]
+
+    return [{"op": "set_colors", "index": index, "colors": [color_to_record(color) for color in new]}]
+
+
+class PaletteJournal:
+    def __init__(self, path: str, compact_after: int = 1000):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_after = compact_after
+
+        self.generation = 0
+        self.journal_ops = 0
+        # (palette, name, colors) of every saved palette as it is on disk, None = unknown (nothing loaded yet)
+        self.saved = None
+
+
+    # --- Loading --- #
+
+    # Save file + replayed journal, returns a list of (name, colors) pairs
+    # read_only: don't repair the journal (cut a torn tail / remove an outdated one), e.g. for reports
+    def load(self, read_only: bool = False) -> list:
+        return [(name, loader()) for name, loader in self.load_lazy(read_only)]
+
+    # Like 'load' but colors aren't parsed, returns a list of (name, loader) pairs
+    # 'loader()' returns a fresh list with the colors the palette had when the save file was loaded
+    @traced(category="storage")
+    def load_lazy(self, read_only: bool = False) -> list:
+        if is_legacy_file(self.path):
+            palettes = [[name, colors] for name, colors in load_palettes(self.path)]
+        else:
+            # Colors are either a byte offset into the save file or an already parsed list
+            palettes = [[name, offset] for name, offset in index_palettes(self.path)]
+        self.generation = read_header(self.path).get("generation", 0)
+        self.journal_ops = 0
+
+        for op in self.read_journal(read_only):
+            if op["op"] in COLOR_OPS and isinstance(palettes[op["index"]][1], int):
+                palettes[op["index"]][1] = read_palette_at(self.path, palettes[op["index"]][1])[1]
+            apply_op(palettes, op)
+            self.journal_ops += 1
+        return [(name, self.create_loader(colors)) for name, colors in palettes]
+
+    def create_loader(self, colors):
+        if isinstance(colors, int):
+            return lambda: read_palette_at(self.path, colors)[1]
+        return lambda: list(colors)
+
+    # Committed operations of the journal, a torn tail left by a crash is truncated unless 'read_only' is set
+    def read_journal(self, read_only: bool = False) -> list:
+        if not os.path.exists(self.journal_path):
+            return []
+
+        ops = []
+        with open(self.journal_path, "rb" if read_only else "rb+") as file:
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                header = {}
+            if header.get("generation") != self.generation:
+                # Journal of an older save file, its changes are already in the save file
+                file.close()
+                if not read_only:
+                    os.remove(self.journal_path)
+                return []
+
+            batch = []
+            committed_at = file.tell()
+            for line in iter(file.readline, b''):
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                if op.get("op") == "commit":
+                    ops += batch
+                    batch = []
+                    committed_at = file.tell()
+                else:
+                    batch.append(op)
+
+            file.seek(0, os.SEEK_END)
+            if file.tell() != committed_at and not read_only:
+                file.truncate(committed_at)
+        return ops
+
+
+    # --- Saving --- #
+
+    # Remember the palettes as they are on disk, next save will only write what changed since
+    # Colors of palettes that weren't loaded yet are not touched (stored as None)
+    def mark_saved(self, palettes: list):
+        self.saved = [(palette, palette.name, list(palette.colors) if palette.is_loaded() else None)
+                      for palette in palettes]
+
+    @traced(category="storage")
+    def save(self, palettes: list):
+        ops = self.diff(palettes) if self.saved is not None and os.path.exists(self.path) else None
+        if ops is None or self.needs_compaction(len(ops)):
+            self.compact(palettes)
+        elif ops:
+            self.append(ops)
+        self.mark_saved(palettes)
+
+    # Operations since the last save, None if they can't be expressed as operations (e.g. palettes were reordered)
+    def diff(self, palettes: list):
+        ops = []
+        state = list(self.saved)
+        current = set(id(palette) for palette in palettes)
+
+        # Highest index first so lower indexes stay valid
+        for index in reversed(range(len(state))):
+            if id(state[index][0]) not in current:
+                ops.append({"op": "delete", "index": index})
+                state.pop(index)
+
+        if any(palette is not entry[0] for palette, entry in zip(palettes, state)) or len(palettes) < len(state):
+            return None
+
+        for index, (palette, name, colors) in enumerate(state):
+            if palette.name != name:
+                ops.append({"op": "rename", "index": index, "name": palette.name})
+            if colors is None:
+                if not palette.is_loaded():
+                    continue    # never loaded = never changed
+                colors = palette.loader()   # colors as they were on disk when the palette got loaded
+            ops += diff_colors(index, colors, palette.colors)
+
+        for palette in palettes[len(state):]:
+            ops.append({"op": "new", "name": palette.name, "colors": [color_to_record(color) for color in palette.colors]})
+        return ops
+
+    def needs_compaction(self, new_ops: int) -> bool:
+        if self.journal_ops + new_ops > self.compact_after:
+            return True
+        try:
+            return os.path.getsize(self.journal_path) > os.path.getsize(self.path)
+        except OSError:
+            return False
+
+    def append(self, ops: list):
+        lines = ""
+        if not os.path.exists(self.journal_path):
+            lines += dump_line({"format": JOURNAL_FORMAT_NAME, "generation": self.generation})
+        lines += "".join(dump_line(op) for op in ops) + dump_line({"op": "commit"})
+
+        with open(self.journal_path, "a", encoding="utf-8") as file:
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        self.journal_ops += len(ops)
+
+    # Rewrite the whole save file and drop the journal
+    # The new generation makes a leftover journal (crash before it was removed) ignored on next load
+    @traced(category="storage")
+    def compact(self, palettes: list):
+        if os.path.exists(self.path):
+            self.generation = read_header(self.path).get("generation", 0) + 1
+        save_palettes(self.path, [(palette.name, palette.colors) for palette in palettes], self.generation)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journal_ops = 0
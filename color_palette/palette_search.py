@@ -0,0 +1,198 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Similarity search over every color of the saved palettes
+#
+# All swatches are stored in OKLab (scaled by 100, see 'color_spaces.py') in one growing NumPy array and bucketed
+# into a grid of 'cell_size' cubes. A query only measures the swatches in the cells its search radius overlaps,
+# so with a radius around the cell size it checks a few thousand swatches even when the library holds millions.
+#
+# The index is kept up to date incrementally: 'add_palette', 'add_colors', 'update_palette' and 'remove_palette'
+# only touch the rows of that one palette. Removed rows are only marked dead, once they make up half of the index
+# it's rebuilt without them.
+
+
+from itertools import chain
+
+import numpy as np
+
+from color_spaces import to_metric_space, delta_e_oklab
+from helper_functions import normalize_rgb
+
+
+CELL_SIZE = 5.0
+MAX_DISTANCE = 5.0  # ΔE (OKLab x 100), about what's still seen as "the same color" next to each other
+METRIC = "oklab"
+# Grid coordinates are shifted by CELL_OFFSET and packed into one int64 key, CELL_RANGE cells per axis
+CELL_OFFSET = 1 << 19
+CELL_RANGE = 1 << 20
+
+
+# (N, 3) array of RGB values, values stored as text (e.g. "(199, 34, 49)" from the HEX entry) are parsed first
+def rgb_array(rgb_values) -> np.ndarray:
+    return np.array([normalize_rgb(rgb) if isinstance(rgb, str) else rgb for rgb in rgb_values],
+                    dtype=np.float64).reshape(-1, 3)
+
+
+# A swatch close to the searched color
+# distance: ΔE (OKLab x 100), palette: Palette the swatch belongs to, color: ((r, g, b), 'HEX', 'ColorName')
+class Match:
+    __slots__ = ("distance", "palette", "color")
+
+    def __init__(self, distance: float, palette, color):
+        self.distance = distance
+        self.palette = palette
+        self.color = color
+
+    def __repr__(self):
+        return f'Match({self.distance:.2f}, {self.palette.name!r}, {self.color!r})'
+
+
+class PaletteIndex:
+    def __init__(self, palettes: list = (), cell_size: float = CELL_SIZE):
+        self.cell_size = cell_size
+        self.lab = np.empty((1024, 3))
+        self.alive = np.zeros(1024, dtype=bool)
+        self.owner_ids = np.zeros(1024, dtype=np.int64)
+        self.size = 0           # rows in use, dead ones included
+        self.dead = 0
+        self.owners = []        # palette of every row
+        self.colors = []        # color of every row
+        self.rows = {}          # palette -> its rows
+        self.ids = {}           # palette -> number, stored for every row in 'owner_ids'
+        self.next_id = 0
+        self.buckets = {}       # grid cell -> rows
+        self.add_palettes(palettes)
+
+    def __len__(self) -> int:
+        return self.size - self.dead
+
+    def __contains__(self, palette) -> bool:
+        return palette in self.rows
+
+
+    # --- Changes --- #
+
+    def add_palette(self, palette):
+        self.add_palettes([palette])
+
+    # Indexes many palettes with a single color conversion, e.g. the whole library on first search
+    def add_palettes(self, palettes: list):
+        chunks = []
+        for palette in palettes:
+            if palette not in self.rows:
+                self.rows[palette] = []
+                self.ids[palette] = self.next_id
+                self.next_id += 1
+            chunks.append((palette, list(palette.colors)))
+        self.add_rows(chunks)
+
+    # Colors appended to an indexed palette, palettes that aren't in the index are ignored (e.g. the Temporary Palette)
+    def add_colors(self, palette, colors: list):
+        if palette in self.rows:
+            self.add_rows([(palette, list(colors))])
+
+    # Re-index all colors of a palette after colors were removed or changed
+    def update_palette(self, palette):
+        self.remove_palette(palette)
+        self.add_palette(palette)
+
+    def remove_palette(self, palette):
+        rows = self.rows.pop(palette, None)
+        if rows is None:
+            return
+        self.alive[rows] = False
+        self.dead += len(rows)
+        del self.ids[palette]
+        for row in rows:
+            self.owners[row] = None
+            self.colors[row] = None
+        if self.dead > self.size // 2:
+            self.rebuild()
+
+    # chunks: (palette, colors) pairs
+    def add_rows(self, chunks: list):
+        colors = list(chain.from_iterable(palette_colors for palette, palette_colors in chunks))
+        if not colors:
+            return
+        start, end = self.size, self.size + len(colors)
+        self.reserve(end)
+        self.lab[start:end] = to_metric_space(rgb_array(color[0] for color in colors), METRIC)
+        self.alive[start:end] = True
+        self.size = end
+
+        self.colors.extend(colors)
+        row = start
+        for palette, palette_colors in chunks:
+            self.owners.extend([palette] * len(palette_colors))
+            self.owner_ids[row:row + len(palette_colors)] = self.ids[palette]
+            self.rows[palette].extend(range(row, row + len(palette_colors)))
+            row += len(palette_colors)
+
+        # One bucket update per distinct cell instead of per row
+        keys = self.get_keys(self.lab[start:end])
+        order = np.argsort(keys, kind="stable")
+        splits = np.flatnonzero(np.diff(keys[order])) + 1
+        for key, rows in zip(keys[order][np.r_[0, splits]].tolist(), np.split(order + start, splits)):
+            self.buckets.setdefault(key, []).extend(rows.tolist())
+
+    def reserve(self, size: int):
+        if size > len(self.lab):
+            capacity = max(size, len(self.lab) * 2)
+            self.lab = np.resize(self.lab, (capacity, 3))
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self.size] = self.alive[:self.size]
+            self.alive = alive
+            self.owner_ids = np.resize(self.owner_ids, capacity)
+
+    # Drop dead rows
+    def rebuild(self):
+        palettes = list(self.rows)
+        self.__init__(palettes, self.cell_size)
+
+    def get_cells(self, lab: np.ndarray) -> np.ndarray:
+        return np.floor(lab / self.cell_size).astype(np.int64) + CELL_OFFSET
+
+    # Grid cell as a single integer, bucket key
+    def get_keys(self, lab: np.ndarray) -> np.ndarray:
+        cells = self.get_cells(lab)
+        return (cells[..., 0] * CELL_RANGE + cells[..., 1]) * CELL_RANGE + cells[..., 2]
+
+
+    # --- Queries --- #
+
+    # Rows and distances of the swatches within 'max_distance' of 'rgb', closest first
+    def find_rows(self, rgb, max_distance: float = MAX_DISTANCE) -> (np.ndarray, np.ndarray):
+        lab = to_metric_space(rgb_array([rgb]).reshape(3), METRIC)
+        low, high = self.get_cells(lab - max_distance), self.get_cells(lab + max_distance)
+        buckets = (self.buckets.get((x * CELL_RANGE + y) * CELL_RANGE + z) for x in range(low[0], high[0] + 1)
+                                                                           for y in range(low[1], high[1] + 1)
+                                                                           for z in range(low[2], high[2] + 1))
+        rows = np.fromiter(chain.from_iterable(bucket for bucket in buckets if bucket), dtype=np.int64)
+        rows = rows[self.alive[rows]]
+
+        distances = delta_e_oklab(self.lab[rows], lab)
+        close = distances <= max_distance
+        rows, distances = rows[close], distances[close]
+        order = np.argsort(distances, kind="stable")
+        return rows[order], distances[order]
+
+    # Swatches within 'max_distance' of 'rgb', closest first
+    def search(self, rgb, max_distance: float = MAX_DISTANCE, limit: int = None) -> list:
+        rows, distances = self.find_rows(rgb, max_distance)
+        return self.create_matches(rows[:limit], distances[:limit])
+
+    # Palettes that have a swatch within 'max_distance' of 'rgb', ranked by their closest swatch
+    def search_palettes(self, rgb, max_distance: float = MAX_DISTANCE, limit: int = None) -> list:
+        rows, distances = self.find_rows(rgb, max_distance)
+        ids, first = np.unique(self.owner_ids[rows], return_index=True)
+        first = np.sort(first)[:limit]
+        return self.create_matches(rows[first], distances[first])
+
+    def create_matches(self, rows: np.ndarray, distances: np.ndarray) -> list:
+        return [Match(distance, self.owners[row], self.colors[row])
+                for row, distance in zip(rows.tolist(), distances.tolist())]
@@ -0,0 +1,159 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Palette save file storage
+#
+# Format (JSON Lines, version 1):
+#   line 1:  {"format": "color_palette", "version": 1, "generation": 0}
+#   line 2+: {"name": "Palette Name", "colors": [[[r, g, b], "#hex", "ColorName"], ...]}
+#
+# 'generation' is increased every time the whole file is rewritten, it ties the file to its change journal
+# (see 'palette_journal.py'), files without it are generation 0
+#
+# Older save files stored 'str([name, colors])' per line, they are recognized by the missing header
+# and can be converted with 'migrate_legacy_file' (the original file is kept as '<name>.bak')
+
+
+import ast
+import json
+import os
+
+
+FORMAT_NAME = "color_palette"
+SCHEMA_VERSION = 1
+HEADER = {"format": FORMAT_NAME, "version": SCHEMA_VERSION}
+
+# Every palette line starts with this, lets the name be read without parsing the colors
+NAME_PREFIX = '{"name": '
+_decoder = json.JSONDecoder()
+
+
+# --- Schema --- #
+
+# Convert a stored color back into the tuple format used by the app: ((r, g, b), 'HEX', 'ColorName')
+def color_from_record(record) -> tuple:
+    rgb, hex_value = record[0], record[1]
+    name = record[2] if len(record) > 2 else "Name"
+    return (tuple(rgb) if isinstance(rgb, list) else rgb, hex_value, name)
+
+def palette_from_record(record: dict) -> tuple:
+    if not isinstance(record, dict) or not isinstance(record.get("name"), str) or not isinstance(record.get("colors"), list):
+        raise ValueError(f'Invalid palette record: {record}')
+    return record["name"], [color_from_record(color) for color in record["colors"]]
+
+def color_to_record(color: tuple) -> list:
+    return [color[0], color[1], color[2]]
+
+def palette_to_record(name: str, colors: list) -> dict:
+    return {"name": name, "colors": [color_to_record(color) for color in colors]}
+
+# Colors picked with the eyedropper hold NumPy integers
+def to_json_value(value):
+    return int(value)
+
+def dump_line(record: dict) -> str:
+    return json.dumps(record, default=to_json_value, ensure_ascii=False) + "\n"
+
+
+# --- Reading --- #
+
+def is_header(line: str) -> bool:
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(header, dict) and header.get("format") == FORMAT_NAME
+
+def read_header(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as file:
+        first_line = file.readline()
+    return json.loads(first_line) if is_header(first_line) else {}
+
+def is_legacy_file(path: str) -> bool:
+    with open(path, "r", encoding="utf-8") as file:
+        first_line = file.readline()
+    return bool(first_line.strip()) and not is_header(first_line)
+
+# Returns a list of (name, colors) pairs
+def load_palettes(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as file:
+        first_line = file.readline()
+        if not first_line.strip():
+            return []
+        if not is_header(first_line):
+            return load_legacy_palettes(path)
+
+        check_header(first_line)
+        return [palette_from_record(json.loads(line)) for line in file if line.strip()]
+
+# Names and byte offsets of every palette, colors are only parsed later with 'read_palette_at'
+def index_palettes(path: str) -> list:
+    entries = []
+    with open(path, "rb") as file:
+        first_line = file.readline()
+        if not first_line.strip():
+            return []
+        check_header(first_line.decode("utf-8"))
+
+        offset = len(first_line)
+        for line in file:
+            if line.strip():
+                entries.append((read_name(line.decode("utf-8")), offset))
+            offset += len(line)
+    return entries
+
+def read_name(line: str) -> str:
+    if line.startswith(NAME_PREFIX):
+        return _decoder.raw_decode(line, len(NAME_PREFIX))[0]
+    return palette_from_record(json.loads(line))[0]
+
+def read_palette_at(path: str, offset: int) -> tuple:
+    with open(path, "rb") as file:
+        file.seek(offset)
+        return palette_from_record(json.loads(file.readline()))
+
+def check_header(line: str):
+    if not is_header(line):
+        raise ValueError("Not a palette save file, old save files have to be converted with 'migrate_legacy_file'")
+    version = json.loads(line).get("version")
+    if version != SCHEMA_VERSION:
+        raise ValueError(f'Unsupported save file version: {version}')
+
+def load_legacy_palettes(path: str) -> list:
+    palettes = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:   # each palette is a separate line
+            if line.strip():
+                name, colors = ast.literal_eval(line)
+                palettes.append((name, [color_from_record(color) for color in colors]))
+    return palettes
+
+
+# --- Writing --- #
+
+# Write to a temporary file first, a crash mid-save never leaves a truncated save file
+def save_palettes(path: str, palettes: list, generation: int = 0):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(dump_line({**HEADER, "generation": generation}))
+        for name, colors in palettes:
+            file.write(dump_line(palette_to_record(name, colors)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+# Convert an old 'str([name, colors])' save file to the current format
+def migrate_legacy_file(path: str) -> bool:
+    if not os.path.exists(path) or not is_legacy_file(path):
+        return False
+    palettes = load_legacy_palettes(path)
+    backup_path = path + ".bak"
+    if not os.path.exists(backup_path):
+        with open(path, "rb") as source, open(backup_path, "wb") as backup:
+            backup.write(source.read())
+    save_palettes(path, palettes)
+    return True
@@ -0,0 +1,69 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Runs color extraction of many images, either in this process or spread over a process pool
+# Both runners take (image path, root) pairs and yield (image path, root, ExtractionResult or None, error message or None)
+
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+import os
+
+from image_functions import extract_palette, set_cache_dir
+
+
+# Extract colors of every image one by one, results are yielded as soon as they are ready
+def extract_images(images, settings: dict):
+    for path, root in images:
+        try:
+            yield path, root, extract_palette(path, **settings), None
+        except Exception as e:
+            yield path, root, None, f'{type(e).__name__}: {e}'
+
+# Runs inside a worker process
+def extract_chunk(chunk: list, settings: dict) -> list:
+    return list(extract_images(chunk, settings))
+
+def init_worker(cache_dir: str):
+    set_cache_dir(cache_dir)
+
+# workers: amount of processes, defaults to the amount of CPU cores
+# chunk_size: images sent to a worker at once, bigger chunks = less overhead, worse load balancing
+# max_pending: max chunks submitted but not yet consumed, keeps memory flat for huge inputs (back-pressure)
+# ordered: yield results in the order of the input instead of the order they finish in
+def extract_images_parallel(images, settings: dict, workers: int = None, chunk_size: int = 1,
+                            max_pending: int = None, ordered: bool = False, cache_dir: str = ""):
+    workers = workers or os.cpu_count() or 1
+    max_pending = max(1, max_pending or workers * 2)
+    chunk_size = max(1, chunk_size)
+    images = iter(images)
+
+    def next_chunk() -> list:
+        return list(islice(images, chunk_size))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_dir,)) as executor:
+        pending = deque()
+
+        def fill():
+            while len(pending) < max_pending:
+                chunk = next_chunk()
+                if not chunk:
+                    return
+                pending.append(executor.submit(extract_chunk, chunk, settings))
+
+        fill()
+        while pending:
+            if ordered:
+                done = pending.popleft()
+            else:
+                done = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+                pending.remove(done)
+
+            for item in done.result():
+                yield item
+            fill()
@@ -0,0 +1,167 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Native NumPy color quantizers, an alternative to 'extcolors'
+# Every quantizer takes an (N, 3) array of RGB pixels and the max amount of colors,
+# and returns the same structure as 'extcolors': [((r, g, b), pixel count), ...] sorted from the most common color
+
+
+import numpy as np
+
+
+# --- Helpers --- #
+
+# Collapse pixels into unique colors, quantizers work on these instead of every single pixel
+def unique_colors(pixels) -> (np.ndarray, np.ndarray):
+    pixels = np.asarray(pixels, dtype=np.int64).reshape(-1, 3)
+    packed = (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+    keys, counts = np.unique(packed, return_counts=True)
+    colors = np.stack(((keys >> 16) & 255, (keys >> 8) & 255, keys & 255), axis=1)
+    return colors, counts.astype(np.int64)
+
+# Weighted mean color and total count of every group
+def group_means(colors: np.ndarray, counts: np.ndarray, groups: np.ndarray, group_count: int) -> (np.ndarray, np.ndarray):
+    totals = np.bincount(groups, weights=counts, minlength=group_count)
+    sums = np.stack([np.bincount(groups, weights=colors[:, i] * counts, minlength=group_count) for i in range(3)], axis=1)
+    used = totals > 0
+    return sums[used] / totals[used, None], totals[used]
+
+# Convert quantizer output to the 'extcolors' structure
+def to_palette(centers: np.ndarray, totals: np.ndarray) -> list:
+    order = np.argsort(-totals, kind="stable")
+    centers = np.clip(np.rint(centers[order]), 0, 255).astype(int)
+    return [((int(c[0]), int(c[1]), int(c[2])), int(t)) for c, t in zip(centers, totals[order])]
+
+# Index of the nearest center for every color, computed in chunks to keep memory bounded
+def nearest_center(colors: np.ndarray, centers: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    colors = colors.astype(np.float64)
+    centers = centers.astype(np.float64)
+    center_norms = (centers ** 2).sum(axis=1)
+    result = np.empty(len(colors), dtype=np.int64)
+    for start in range(0, len(colors), chunk_size):
+        chunk = colors[start:start + chunk_size]
+        distances = center_norms[None, :] - 2 * chunk @ centers.T
+        result[start:start + chunk_size] = distances.argmin(axis=1)
+    return result
+
+
+# --- Quantizers --- #
+
+# Median cut: keep splitting the box with the widest channel range at the weighted median of that channel
+def median_cut(pixels, limit: int = 24) -> list:
+    colors, counts = unique_colors(pixels)
+    boxes = [np.arange(len(colors))]
+
+    while len(boxes) < limit:
+        ranges = [np.ptp(colors[box], axis=0) if len(box) > 1 else np.zeros(3, dtype=np.int64) for box in boxes]
+        widest = int(np.argmax([r.max() for r in ranges]))
+        if ranges[widest].max() == 0:
+            break   # every box holds a single color, nothing left to split
+
+        box = boxes.pop(widest)
+        channel = int(np.argmax(ranges[widest]))
+        box = box[np.argsort(colors[box, channel], kind="stable")]
+        cumulative = np.cumsum(counts[box])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), len(box) - 1)
+        boxes += [box[:split], box[split:]]
+
+    groups = np.empty(len(colors), dtype=np.int64)
+    for i, box in enumerate(boxes):
+        groups[box] = i
+    return to_palette(*group_means(colors, counts, groups, len(boxes)))
+
+# Octree: find the first tree level that has more nodes than 'limit', then fold the least used parent nodes
+# into single leaves until exactly 'limit' leaves are left (the last parent only folds the children it has to)
+def octree(pixels, limit: int = 24) -> list:
+    colors, counts = unique_colors(pixels)
+
+    def node_keys(depth: int) -> np.ndarray:
+        shifted = colors >> (8 - depth)
+        return (shifted[:, 0] << 16) | (shifted[:, 1] << 8) | shifted[:, 2]
+
+    depth = next((d for d in range(1, 9) if len(np.unique(node_keys(d))) > limit), None)
+    if depth is None:
+        # The image has fewer unique colors than the limit
+        return to_palette(colors.astype(np.float64), counts)
+
+    child_keys, child_index = np.unique(node_keys(depth), return_inverse=True)
+    parent_keys, parent_index = np.unique(node_keys(depth - 1), return_inverse=True)
+    parent_totals = np.bincount(parent_index, weights=counts)
+    child_totals = np.bincount(child_index, weights=counts)
+    # Parent of every child node -> amount of children of every parent
+    child_parent = np.zeros(len(child_keys), dtype=np.int64)
+    child_parent[child_index] = parent_index
+    children = np.bincount(child_parent, minlength=len(parent_keys))
+
+    # Folding a parent turns its children into one leaf, least used parents go first
+    # The level above has at most 'limit' nodes, so folding every parent is always enough
+    needed = len(child_keys) - limit
+    order = np.argsort(parent_totals, kind="stable")
+    saved = np.cumsum(children[order] - 1)
+    last = int(np.searchsorted(saved, needed))
+    folded = np.zeros(len(parent_keys), dtype=bool)
+    folded[order[:last]] = True
+    # The last parent merges only its 'remaining' + 1 least used children
+    remaining = needed - (int(saved[last - 1]) if last else 0)
+    siblings = np.flatnonzero(child_parent == order[last])
+    merged = np.zeros(len(child_keys), dtype=bool)
+    merged[siblings[np.argsort(child_totals[siblings], kind="stable")[:remaining + 1]]] = True
+
+    # Folded parents get ids after all child ids, the merged children of the last parent one more after those
+    leaves = np.where(folded[parent_index], len(child_keys) + parent_index, child_index)
+    leaves = np.where(merged[child_index], len(child_keys) + len(parent_keys), leaves)
+    leaves = np.unique(leaves, return_inverse=True)[1]
+    return to_palette(*group_means(colors, counts, leaves, int(leaves.max()) + 1))
+
+# Mini-batch k-means, initialized with k-means++ and updated with per-center running means
+def kmeans(pixels, limit: int = 24, iterations: int = 50, batch_size: int = 4096, seed: int = 0) -> list:
+    colors, counts = unique_colors(pixels)
+    if len(colors) <= limit:
+        return to_palette(colors.astype(np.float64), counts)
+
+    rng = np.random.default_rng(seed)
+    values = colors.astype(np.float64)
+    weights = counts / counts.sum()
+
+    # k-means++ seeding
+    centers = np.empty((limit, 3), dtype=np.float64)
+    centers[0] = values[rng.choice(len(values), p=weights)]
+    distances = ((values - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, limit):
+        probabilities = distances * weights
+        if probabilities.sum() == 0:
+            centers = centers[:i]
+            break
+        centers[i] = values[rng.choice(len(values), p=probabilities / probabilities.sum())]
+        distances = np.minimum(distances, ((values - centers[i]) ** 2).sum(axis=1))
+
+    # Per-center running mean over random batches
+    seen = np.zeros(len(centers), dtype=np.float64)
+    for _ in range(iterations):
+        batch = values[rng.choice(len(values), size=batch_size, p=weights)]
+        assigned = nearest_center(batch, centers)
+        batch_counts = np.bincount(assigned, minlength=len(centers))
+        batch_sums = np.stack([np.bincount(assigned, weights=batch[:, i], minlength=len(centers)) for i in range(3)], axis=1)
+        updated = batch_counts > 0
+        centers[updated] = (centers[updated] * seen[updated, None] + batch_sums[updated]) \
+            / (seen[updated] + batch_counts[updated])[:, None]
+        seen += batch_counts
+
+    assigned = nearest_center(values, centers)
+    return to_palette(*group_means(colors, counts, assigned, len(centers)))
+
+
+QUANTIZERS = {"median_cut": median_cut,
+              "octree": octree,
+              "kmeans": kmeans}
+
+
+def quantize(pixels, method: str = "median_cut", limit: int = 24) -> list:
+    if method not in QUANTIZERS:
+        raise ValueError(f'Unknown quantizer: {method}, available: {", ".join(QUANTIZERS)}')
+    return QUANTIZERS[method](pixels, limit)
@@ -0,0 +1,171 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Screen capture backends used by the eyedropper
+#
+# Every backend returns captured regions as (height, width, 3) uint8 NumPy arrays.
+# Parts of a region outside of the screen are filled with the nearest pixel on the screen,
+# so a region at the screen edge still has the requested size.
+#
+# Backends:
+#   "mss"       - grabs directly through the OS (XShm/XGetImage on Linux, GDI on Windows), needs the optional 'mss' package
+#   "pyautogui" - pyautogui.screenshot, slower per call, always available
+#   "auto"      - "mss" if installed, "pyautogui" otherwise
+#
+# ImageCapture captures from an image in memory instead of the screen, e.g. for tests and benchmarks without a display
+
+
+from abc import ABC, abstractmethod
+import threading
+
+import numpy as np
+
+
+class CaptureBackend(ABC):
+    name = ""
+
+    # --- Backend specific --- #
+
+    # (left, top, width, height) of the whole screen
+    @abstractmethod
+    def get_screen_rect(self) -> (int, int, int, int):
+        pass
+
+    # Region that lies fully on the screen
+    @abstractmethod
+    def grab_on_screen(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        pass
+
+    def position(self) -> (int, int):
+        import pyautogui
+        return tuple(pyautogui.position())
+
+    def close(self):
+        pass
+
+
+    # --- Capture --- #
+
+    def grab(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        screen_left, screen_top, screen_width, screen_height = self.get_screen_rect()
+        x0, y0 = max(left, screen_left), max(top, screen_top)
+        x1 = min(left + width, screen_left + screen_width)
+        y1 = min(top + height, screen_top + screen_height)
+        if x1 <= x0 or y1 <= y0:
+            # Region is completely off the screen, use the closest pixel on it
+            x0 = min(max(left, screen_left), screen_left + screen_width - 1)
+            y0 = min(max(top, screen_top), screen_top + screen_height - 1)
+            x1, y1 = x0 + 1, y0 + 1
+
+        region = self.grab_on_screen(x0, y0, x1 - x0, y1 - y0)
+        padding = ((y0 - top, top + height - y1), (x0 - left, left + width - x1), (0, 0))
+        if any(before or after for before, after in padding):
+            region = np.pad(region, [(max(0, before), max(0, after)) for before, after in padding], mode="edge")
+            region = region[:height, :width]
+        return region
+
+    def pixel(self, x: int, y: int) -> (int, int, int):
+        return tuple(int(value) for value in self.grab(x, y, 1, 1)[0, 0])
+
+    # Region of 'size' x 'size' pixels with (x, y) in the middle
+    def grab_around(self, x: int, y: int, size: int) -> np.ndarray:
+        return self.grab(x - size // 2, y - size // 2, size, size)
+
+
+class PyAutoGUICapture(CaptureBackend):
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def get_screen_rect(self) -> (int, int, int, int):
+        width, height = self.pyautogui.size()
+        return 0, 0, width, height
+
+    def grab_on_screen(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        screenshot = self.pyautogui.screenshot(region=(left, top, width, height))
+        return np.asarray(screenshot.convert("RGB"))
+
+    def position(self) -> (int, int):
+        return tuple(self.pyautogui.position())
+
+
+class MSSCapture(CaptureBackend):
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self.mss = mss
+        # mss handles can't be shared between threads, the sampler thread and the Tk thread get their own
+        self.local = threading.local()
+        self.handles = []
+
+    def get_handle(self):
+        handle = getattr(self.local, "handle", None)
+        if handle is None:
+            handle = self.local.handle = self.mss.mss()
+            self.handles.append(handle)
+        return handle
+
+    def get_screen_rect(self) -> (int, int, int, int):
+        monitor = self.get_handle().monitors[0]     # all monitors together
+        return monitor["left"], monitor["top"], monitor["width"], monitor["height"]
+
+    def grab_on_screen(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        shot = self.get_handle().grab({"left": left, "top": top, "width": width, "height": height})
+        return np.asarray(shot)[:, :, 2::-1]     # BGRA -> RGB
+
+    def close(self):
+        for handle in self.handles:
+            handle.close()
+        self.handles = []
+        self.local = threading.local()
+
+
+# Captures from an image (file path, PIL image or array) instead of the screen
+# The "cursor" is moved with 'move_to', e.g. to replay a cursor path in a benchmark
+class ImageCapture(CaptureBackend):
+    name = "image"
+
+    def __init__(self, image, position: (int, int) = (0, 0), left: int = 0, top: int = 0):
+        if isinstance(image, str):
+            from PIL import Image
+            with Image.open(image) as img:
+                image = img.convert("RGB")
+        if hasattr(image, "convert"):
+            image = image.convert("RGB")
+        self.image = np.ascontiguousarray(np.asarray(image, dtype=np.uint8)[:, :, :3])
+        self.left, self.top = left, top
+        self.cursor = tuple(position)
+
+    def get_screen_rect(self) -> (int, int, int, int):
+        return self.left, self.top, self.image.shape[1], self.image.shape[0]
+
+    def grab_on_screen(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        x, y = left - self.left, top - self.top
+        return self.image[y:y + height, x:x + width].copy()
+
+    def position(self) -> (int, int):
+        return self.cursor
+
+    def move_to(self, x: int, y: int):
+        self.cursor = (x, y)
+
+
+CAPTURE_BACKENDS = {"mss": MSSCapture, "pyautogui": PyAutoGUICapture}
+
+def create_capture_backend(name: str = "auto") -> CaptureBackend:
+    name = (name or "auto").lower()
+    if name == "auto":
+        try:
+            return MSSCapture()
+        except ImportError:
+            return PyAutoGUICapture()
+    if name not in CAPTURE_BACKENDS:
+        raise ValueError(f'Unknown capture backend: {name}, use one of: auto, {", ".join(CAPTURE_BACKENDS)}')
+    return CAPTURE_BACKENDS[name]()
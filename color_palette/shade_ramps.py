@@ -0,0 +1,139 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Shade / tint / tone ramps of colors, e.g. the shades panel of the main window
+#
+# A ramp is a tuple of steps, written in the "ShadeRamp" setting as a comma separated list:
+#   cmyk:1.25   - black (K) channel of the CMYK color multiplied by 1.25, like 'get_shade'
+#   shade:25%   - mixed with black,      amount is 0 - 100% or 0.0 - 1.0
+#   tint:25%    - mixed with white
+#   tone:25%    - mixed with middle gray
+#   tint*3      - 3 evenly spaced steps: tint:25%, tint:50%, tint:75%
+#
+# 'ramp_batch' computes every step of any amount of colors in one NumPy pass.
+# 'get_ramps' keeps the most recently used ramps in an LRU cache keyed by (color, ramp), switching back to
+# a recently picked color doesn't compute anything.
+# NumPy is only imported once a ramp is computed, the setting is parsed on startup without it.
+
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+
+RAMP_KINDS = ("cmyk", "shade", "tint", "tone")
+# Mix targets of the kinds mixed with a fixed color
+MIX_TARGETS = {"shade": 0, "tint": 255, "tone": 128}
+DEFAULT_RAMP = "cmyk:1.25,cmyk:1.5,cmyk:1.75,cmyk:0.75,cmyk:0.5,cmyk:0.25"
+CACHE_SIZE = 256
+
+
+class RampStep(NamedTuple):
+    kind: str
+    amount: float
+
+    # Name shown on the shade button: - darker, + lighter, ~ grayer
+    def label(self) -> str:
+        if self.kind == "cmyk":
+            return f'{"+" if self.amount < 1 else "-"}{round(abs(100 - self.amount * 100))}%'
+        modifier = {"shade": "-", "tint": "+", "tone": "~"}[self.kind]
+        return f'{modifier}{round(self.amount * 100)}%'
+
+
+class RampCache:
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+ramp_cache = RampCache()
+
+
+# --- Ramp spec --- #
+
+# "tint:25%, tone*2" -> (RampStep("tint", 0.25), RampStep("tone", 1 / 3), RampStep("tone", 2 / 3))
+@lru_cache(maxsize=16)
+def parse_ramp(spec: str) -> tuple:
+    steps = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        try:
+            if "*" in entry:
+                kind, count = entry.split("*")
+                kind, count = kind.strip().lower(), int(count)
+                if kind == "cmyk" or count < 1:
+                    raise ValueError
+                steps.extend(RampStep(kind, step / (count + 1)) for step in range(1, count + 1))
+            else:
+                kind, amount = entry.split(":")
+                kind, amount = kind.strip().lower(), amount.strip()
+                amount = float(amount[:-1]) / 100 if amount.endswith("%") else float(amount)
+                if amount < 0 or (kind != "cmyk" and amount > 1):
+                    raise ValueError
+                steps.append(RampStep(kind, amount))
+        except ValueError:
+            raise ValueError(f'Invalid shade ramp step: "{entry}"') from None
+        if kind not in RAMP_KINDS:
+            raise ValueError(f'Unknown shade ramp kind: "{kind}", use one of: {", ".join(RAMP_KINDS)}')
+    return tuple(steps)
+
+
+# --- Ramps --- #
+
+# (N, 3) colors -> (N, steps, 3) ramps
+def ramp_batch(rgb, steps: tuple) -> "np.ndarray":
+    import numpy as np
+    from batch_functions import get_shade_batch
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3)
+    kinds = np.array([step.kind for step in steps])
+    amounts = np.array([step.amount for step in steps], dtype=np.float64)
+    ramps = np.empty((len(rgb), len(steps), 3), dtype=np.int64)
+
+    cmyk = kinds == "cmyk"
+    if cmyk.any():
+        # One row per (color, step), each with its own scalar
+        shades = get_shade_batch(np.repeat(rgb, cmyk.sum(), axis=0), np.tile(amounts[cmyk], len(rgb)))
+        ramps[:, cmyk] = shades.reshape(len(rgb), -1, 3)
+    if not cmyk.all():
+        targets = np.array([MIX_TARGETS.get(kind, 0) for kind in kinds], dtype=np.float64)[~cmyk]
+        mix = amounts[~cmyk][None, :, None]
+        ramps[:, ~cmyk] = np.rint(rgb[:, None, :] * (1 - mix) + targets[None, :, None] * mix)
+    return np.clip(ramps, 0, 255)
+
+# Ramps of many colors as tuples of ((r, g, b), 'HEX') pairs, only colors missing in the cache are computed
+def get_ramps(colors: list, steps: tuple, cache: RampCache = None) -> list:
+    from batch_functions import rgb_to_hex_batch
+    cache = cache if cache else ramp_cache
+    keys = [(tuple(int(value) for value in rgb), steps) for rgb in colors]
+    ramps = [cache.get(key) for key in keys]
+
+    missing = [idx for idx, ramp in enumerate(ramps) if ramp is None]
+    if missing:
+        values = ramp_batch([keys[idx][0] for idx in missing], steps)
+        hex_values = rgb_to_hex_batch(values.reshape(-1, 3)).reshape(len(missing), len(steps)).tolist()
+        for idx, ramp_rgb, ramp_hex in zip(missing, values.tolist(), hex_values):
+            ramps[idx] = tuple((tuple(rgb), hex_value) for rgb, hex_value in zip(ramp_rgb, ramp_hex))
+            cache.put(keys[idx], ramps[idx])
+    return ramps
+
+def get_ramp(rgb, steps: tuple, cache: RampCache = None) -> tuple:
+    return get_ramps([rgb], steps, cache)[0]
@@ -0,0 +1,56 @@
+# Color Palette
+# Created by Adrian Urbaniak / A-Rave-Mistake (2022)
+# ----------
+# Repo link: https://github.com/A-Rave-Mistake/Color_Palette
+# Using GNU General Public License v3.0 - More info can be found in the 'LICENSE.md' file
+
+
+# Startup time report
+#
+# Set the COLOR_PALETTE_STARTUP_REPORT environment variable (e.g. to 1) to print how long each startup stage took
+# until the main window was ready, and which heavy modules were imported on the way.
+# Heavy modules (NumPy, PIL, matplotlib, ...) are supposed to load on first use, not during startup.
+#
+# Timings start when this module is imported, '__main__.py' imports it before anything else.
+
+
+import os
+import sys
+import time
+
+
+ENV_VARIABLE = "COLOR_PALETTE_STARTUP_REPORT"
+HEAVY_MODULES = ("numpy", "PIL", "matplotlib", "extcolors", "pyautogui", "mss")
+
+started = time.perf_counter()
+stages = []     # (stage name, seconds since start)
+
+
+def is_enabled() -> bool:
+    return os.environ.get(ENV_VARIABLE, "") not in ("", "0")
+
+def mark(stage: str):
+    stages.append((stage, time.perf_counter() - started))
+
+def get_report() -> dict:
+    report = {"stages": [], "total_seconds": stages[-1][1] if stages else 0.0,
+              "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules]}
+    previous = 0.0
+    for stage, seconds in stages:
+        report["stages"].append({"stage": stage, "seconds": seconds - previous})
+        previous = seconds
+    return report
+
+def print_report():
+    report = get_report()
+    print("Startup time:")
+    for stage in report["stages"]:
+        print(f'  {stage["stage"]:<20}{stage["seconds"] * 1000:>8.1f} ms')
+    print(f'  {"total":<20}{report["total_seconds"] * 1000:>8.1f} ms')
+    print("Heavy modules loaded: " + (", ".join(report["heavy_modules"]) or "none"))
+
+# Called once the main window is shown
+def finish(stage: str = "first window"):
+    mark(stage)
+    if is_enabled():
+        print_report()
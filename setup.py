@@ -27,7 +27,6 @@ setup(
                         "extcolors>=1.0.0,<2.0",
                         "matplotlib>=3.6.2,<4.0",
                         "numpy>=1.23.5,<2.0",
-                        "opencv_python>=4.6.0.66,<5.0",
                         "Pillow>=9.3.0,<10.0",
                         "PyAutoGUI>=0.9.53,<1.0",
                         "pyperclip>=1.8.2,<2.0"
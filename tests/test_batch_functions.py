@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from batch_functions import hex_to_rgb_batch, rgb_to_hex_batch, get_shade_batch
+from helper_functions import hex_to_rgb, rgb_to_hex, get_shade
+
+
+def test_hex_round_trip():
+    rgb = np.random.default_rng(0).integers(0, 256, (1000, 3))
+    assert (hex_to_rgb_batch(rgb_to_hex_batch(rgb)) == rgb).all()
+
+def test_hex_to_rgb_accepts_both_cases_with_and_without_hash():
+    assert hex_to_rgb_batch(["#c72231", "C72231", "#AbCdEf"]).tolist() == [[199, 34, 49], [199, 34, 49], [171, 205, 239]]
+    assert hex_to_rgb("#c72231") == "(199, 34, 49)"
+    assert hex_to_rgb_batch([]).shape == (0, 3)
+
+@pytest.mark.parametrize("value", ["#abc", "#zzzzzz", "#abcdefg", "#abcde", "", "#", "##abcdef", "#ééé123", "#abcdef000000"])
+def test_hex_to_rgb_rejects_malformed_values(value):
+    with pytest.raises(ValueError):
+        hex_to_rgb_batch(value)
+    with pytest.raises(ValueError):
+        hex_to_rgb(value)
+
+def test_one_bad_value_fails_the_batch():
+    with pytest.raises(ValueError, match="#ab"):
+        hex_to_rgb_batch(["#abcdef", "#ab"])
+
+def test_rgb_to_hex_clips_channels():
+    assert rgb_to_hex((199, 34, 49)) == "#c72231"
+    assert rgb_to_hex_batch([(-5, 300, 16)]).tolist() == ["#00ff10"]
+
+def test_shade_matches_scalar_version():
+    rgb = np.random.default_rng(1).integers(0, 256, (200, 3))
+    for scalar in (0.25, 1.0, 1.75):
+        assert get_shade_batch(rgb, scalar).tolist() == [list(get_shade(tuple(color), scalar)) for color in rgb.tolist()]
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+from benchmark_suite import compare
+
+
+def results(*entries) -> dict:
+    return {"results": [{"group": "search", "name": name, "params": {}, **values} for name, values in entries]}
+
+
+def test_compare_flags_regressions():
+    old = results(("a", {"min_s": 1.0}), ("b", {"min_s": 1.0}))
+    assert compare(old, results(("a", {"min_s": 1.1}), ("b", {"min_s": 0.5})), threshold=1.25)
+    assert not compare(old, results(("a", {"min_s": 1.5}), ("b", {"min_s": 1.0})), threshold=1.25)
+
+def test_compare_fails_on_benchmarks_skipped_in_one_run():
+    old = results(("a", {"min_s": 1.0}))
+    assert not compare(old, results(("a", {"skipped": "ImportError: No module named 'tkinter'"})), threshold=1.25)
+    assert not compare(results(("a", {"skipped": "ImportError"})), results(("a", {"min_s": 1.0})), threshold=1.25)
+
+def test_compare_ignores_benchmarks_missing_from_a_run():
+    old = results(("a", {"min_s": 1.0}), ("b", {"skipped": "ImportError"}))
+    assert compare(old, results(("c", {"min_s": 9.0}), ("b", {"skipped": "ImportError"})), threshold=1.25)
+
+def test_persistence_benchmarks_run_without_the_gui():
+    from benchmark_suite import BENCHMARKS, run_benchmark
+    for group, name, params, setup in BENCHMARKS:
+        if group in ("persistence", "search") and params.get("palettes") in (10, 125):
+            assert run_benchmark(setup, params, repeat=1)["min_s"] > 0
@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from cli import main, find_images, get_output_path, check_output_paths, pattern_root
+
+
+def save_image(path, rgb):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(np.full((8, 8, 3), rgb, dtype=np.uint8)).save(path)
+
+
+@pytest.fixture
+def images(tmp_path):
+    # in/a/x.png, in/b/x.png and in/b/x.jpg - same names in different folders / with different extensions
+    paths = {"a_png": tmp_path / "in" / "a" / "x.png",
+             "b_png": tmp_path / "in" / "b" / "x.png",
+             "b_jpg": tmp_path / "in" / "b" / "x.jpg"}
+    for rgb, path in zip(((255, 0, 0), (0, 255, 0), (0, 0, 255)), paths.values()):
+        save_image(str(path), rgb)
+    return {key: str(path) for key, path in paths.items()}
+
+
+def test_pattern_root():
+    assert pattern_root(os.path.join("in", "**", "*.png")) == "in"
+    assert pattern_root(os.path.join("in", "a", "x?.png")) == os.path.join("in", "a")
+    assert pattern_root("*.png") == os.curdir
+
+def test_output_path_keeps_folders_and_extension(tmp_path):
+    root = str(tmp_path / "in")
+    path = os.path.join(root, "a", "x.png")
+    assert get_output_path(path, root, "out", "json") == os.path.join("out", "a", "x.png.json")
+
+def test_glob_keeps_folder_structure(images, tmp_path):
+    found = list(find_images([str(tmp_path / "in" / "**" / "*.png")]))
+    outputs = [get_output_path(path, root, "out", "json") for path, root in found]
+    assert outputs == [os.path.join("out", "a", "x.png.json"), os.path.join("out", "b", "x.png.json")]
+
+def test_collisions_are_detected(images):
+    found = list(find_images([images["a_png"], images["b_png"]]))
+    unique, collisions = check_output_paths(found, "out", "json")
+    assert list(collisions.values()) == [[images["a_png"], images["b_png"]]]
+
+def test_same_image_from_two_sources_is_extracted_once(images, tmp_path):
+    found = list(find_images([str(tmp_path / "in"), str(tmp_path / "in" / "**" / "*.png")]))
+    unique, collisions = check_output_paths(found, "out", "json")
+    assert not collisions
+    assert [path for path, root in unique].count(images["a_png"]) == 1
+
+def test_extract_writes_one_file_per_image(images, tmp_path, capsys):
+    output = tmp_path / "out"
+    assert main(["extract", str(tmp_path / "in" / "**" / "*"), "--output", str(output)]) == 0
+    written = sorted(os.path.relpath(os.path.join(directory, file), output)
+                     for directory, subdirectories, files in os.walk(output) for file in files)
+    assert written == [os.path.join("a", "x.png.json"), os.path.join("b", "x.jpg.json"), os.path.join("b", "x.png.json")]
+    assert json.loads((output / "b" / "x.png.json").read_text())["colors"][0]["hex"] == "#00ff00"
+
+def test_extract_fails_on_collisions(images, tmp_path, capsys):
+    output = tmp_path / "out"
+    assert main(["extract", images["a_png"], images["b_png"], "--output", str(output)]) == 1
+    assert not output.exists()
+    assert "overwrite" in capsys.readouterr().err
+
+def test_extract_streams_json_lines(images, capsys):
+    assert main(["extract", images["a_png"], "--backend", "median_cut"]) == 0
+    line = json.loads(capsys.readouterr().out)
+    assert line["image"] == images["a_png"]
+    assert line["pixel_count"] == 64
+
+@pytest.mark.parametrize("workers", ["-3", "-1", "two"])
+def test_invalid_worker_count_is_rejected(images, workers, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["extract", images["a_png"], "--workers", workers])
+    assert exit_info.value.code == 2
+    assert "--workers" in capsys.readouterr().err
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from color_list import ColorList
+
+
+def make_color(value: int, name: str = "Name"):
+    return ((value, value, value), "#%02x%02x%02x" % (value, value, value), name)
+
+
+def check(colors: ColorList, expected: list):
+    assert list(colors) == expected
+    for color in set(expected):
+        assert color in colors
+        assert colors.index(color) == expected.index(color)
+        assert colors.count(color) == expected.count(color)
+        assert colors.index_rgb(color[0]) == next(index for index, item in enumerate(expected) if item[0] == color[0])
+    assert make_color(999) not in colors
+    assert not colors.contains_rgb((999, 999, 999))
+
+
+def test_behaves_like_a_list_under_random_changes():
+    rng = random.Random(0)
+    colors, expected = ColorList(), []
+    for step in range(5000):
+        action = rng.random()
+        color = make_color(rng.randrange(40))
+        if action < 0.4:
+            colors.append(color)
+            expected.append(color)
+        elif action < 0.55 and expected:
+            index = rng.randrange(-len(expected), len(expected))
+            assert colors.pop(index) == expected.pop(index)
+        elif action < 0.7 and color in expected:
+            colors.remove(color)
+            expected.remove(color)
+        elif action < 0.8 and expected:
+            index = rng.randrange(len(expected))
+            colors[index] = color
+            expected[index] = color
+        elif action < 0.85 and expected:
+            del colors[0]
+            del expected[0]
+        elif action < 0.9:
+            index = rng.randrange(len(expected) + 1)
+            colors.insert(index, color)
+            expected.insert(index, color)
+        elif action < 0.93:
+            colors.extend([color, make_color(1)])
+            expected.extend([color, make_color(1)])
+        elif action < 0.95:
+            del colors[1:3]
+            del expected[1:3]
+        if step % 50 == 0:
+            check(colors, expected)
+    check(colors, expected)
+
+def test_removing_named_colors():
+    colors = ColorList([make_color(1, "red"), make_color(2, "green"), make_color(1, "dark red")])
+    colors.remove(make_color(1, "dark red"))
+    assert colors == [make_color(1, "red"), make_color(2, "green")]
+    with pytest.raises(ValueError):
+        colors.remove(make_color(1, "Name"))
+    assert colors.contains_rgb("1, 1, 1")
+    colors.remove(make_color(1, "red"))
+    assert not colors.contains_rgb((1, 1, 1))
+
+def test_index_rgb_finds_renamed_colors():
+    colors = ColorList([make_color(1), make_color(2, "green"), make_color(2, "dark green"), make_color(3)])
+    assert colors.index_rgb((2, 2, 2)) == 1
+    assert colors.index_rgb("2, 2, 2") == 1
+    colors.pop(0)
+    colors.remove(make_color(2, "green"))
+    assert colors.index_rgb((2, 2, 2)) == 0
+    assert colors.index_rgb((3, 3, 3)) == 1
+    with pytest.raises(ValueError):
+        colors.index_rgb((1, 1, 1))
+
+def test_string_rgb_values():
+    colors = ColorList([("(199, 34, 49)", "#c72231", "Name")])
+    assert colors.contains_rgb((199, 34, 49))
+    assert colors.index(("(199, 34, 49)", "#c72231", "Name")) == 0
+
+def test_unhashable_values_are_never_in_the_list():
+    colors = ColorList([make_color(1)])
+    assert [1, 1, 1] not in colors
+    assert colors.count([1, 1, 1]) == 0
+
+def test_removed_stamps_are_compacted():
+    colors = ColorList(make_color(i) for i in range(100))
+    for i in range(0, 100, 2):
+        colors.remove(make_color(i))
+    assert len(colors.removed) <= len(colors)
+    assert colors.index(make_color(99)) == 49
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from color_list import ColorList
+from color_names import ColorNameIndex, color_name, color_names, get_index
+from named_colors import NAMED_COLORS
+
+
+def test_exact_named_colors_get_their_own_name():
+    assert color_name((255, 0, 0)) == "red"
+    assert color_name("255, 255, 255") == "white"
+
+def test_accepts_every_rgb_format():
+    assert color_name("(199, 34, 49)") == color_name((199, 34, 49)) == color_name([199, 34, 49])
+
+def test_grid_matches_brute_force():
+    index = get_index()
+    rgb = np.random.default_rng(0).integers(0, 256, (3000, 3))
+    lab = index.lab
+    from color_spaces import rgb_to_lab
+    expected = np.sqrt(((rgb_to_lab(rgb)[:, None, :] - lab[None, :, :]) ** 2).sum(axis=2)).min(axis=1)
+    indexes, distances = index.nearest(rgb)
+    assert np.allclose(distances, expected)
+    assert color_names(rgb[:50].tolist()) == [color_name(tuple(color)) for color in rgb[:50].tolist()]
+
+def test_small_index():
+    index = ColorNameIndex(["black", "white"], [(0, 0, 0), (255, 255, 255)])
+    assert index.names_of([(10, 10, 10), (250, 250, 250)]) == ["black", "white"]
+    assert color_names([]) == []
+
+def test_names_are_unique():
+    names = [name for name, hex_value in NAMED_COLORS]
+    assert len(names) == len(set(names))
+
+
+# --- Removing named colors from the history / a palette --- #
+
+def test_named_colors_can_be_removed():
+    classes = pytest.importorskip("classes", exc_type=ImportError)
+    colors = ColorList([((1, 2, 3), "#010203", color_name((1, 2, 3))),
+                        ("(199, 34, 49)", "#c72231", "Name"),
+                        ((9, 9, 9), "#090909", "My dark gray")])
+    master = SimpleNamespace(colors=colors)
+    find_color = classes.HistoryMaster.find_color
+    # What the main color button holds after picking / clicking these colors
+    assert find_color(master, ((1, 2, 3), "#010203", color_name((1, 2, 3)))) == 0
+    assert find_color(master, ("(199, 34, 49)", "#c72231", color_name((199, 34, 49)))) == 1
+    assert find_color(master, ((9, 9, 9), "#090909", "renamed")) == 2
+    assert find_color(master, ((5, 5, 5), "#050505", "Name")) is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from color_spaces import rgb_to_lab, lab_to_rgb, rgb_to_oklab, oklab_to_rgb, delta_e_76, delta_e_2000, \
+    to_metric_space, distance_matrix, nearest, get_metric, OKLAB_SCALE
+
+
+# Test pairs from Sharma, Wu & Dalal (2005), table 1
+CIEDE2000_PAIRS = [((50, 2.6772, -79.7751), (50, 0, -82.7485), 2.0425),
+                   ((50, 0, 0), (50, -1, 2), 2.3669),
+                   ((50, 2.5, 0), (73, 25, -18), 27.1492),
+                   ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+                   ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+                   ((50, 2.5, 0), (50, 0, -2.5), 4.3065)]
+
+
+def test_known_lab_values():
+    assert rgb_to_lab([255, 255, 255]) == pytest.approx([100, 0, 0], abs=1e-3)
+    assert rgb_to_lab([255, 0, 0]) == pytest.approx([53.24, 80.09, 67.20], abs=0.01)
+
+def test_known_oklab_values():
+    assert rgb_to_oklab([255, 255, 255]) == pytest.approx([1, 0, 0], abs=1e-4)
+    assert rgb_to_oklab([255, 0, 0]) == pytest.approx([0.62796, 0.22486, 0.12585], abs=1e-4)
+
+def test_round_trips():
+    rgb = np.random.default_rng(0).integers(0, 256, (1000, 3))
+    assert np.allclose(lab_to_rgb(rgb_to_lab(rgb)), rgb, atol=1e-3)
+    assert np.allclose(oklab_to_rgb(rgb_to_oklab(rgb)), rgb, atol=1e-3)
+
+@pytest.mark.parametrize("lab1, lab2, expected", CIEDE2000_PAIRS)
+def test_delta_e_2000_reference_pairs(lab1, lab2, expected):
+    assert delta_e_2000(lab1, lab2) == pytest.approx(expected, abs=1e-4)
+    assert delta_e_2000(lab2, lab1) == pytest.approx(expected, abs=1e-4)
+
+def test_delta_e_76():
+    assert delta_e_76([50, 0, 0], [53, 4, 0]) == pytest.approx(5)
+
+def test_distance_matrix_and_nearest_agree_at_any_chunk_size():
+    rng = np.random.default_rng(1)
+    a = to_metric_space(rng.integers(0, 256, (50, 3)), "de2000")
+    b = to_metric_space(rng.integers(0, 256, (30, 3)), "de2000")
+    matrix = delta_e_2000(a[:, None, :], b[None, :, :])
+    for max_pairs in (1, 7, 10_000):
+        assert np.allclose(distance_matrix(a, b, "de2000", max_pairs), matrix)
+        indexes, distances = nearest(a, b, "de2000", max_pairs)
+        assert (indexes == matrix.argmin(axis=1)).all()
+        assert np.allclose(distances, matrix.min(axis=1))
+
+def test_oklab_metric_space_is_scaled():
+    assert to_metric_space([255, 255, 255], "oklab") == pytest.approx([OKLAB_SCALE, 0, 0], abs=1e-2)
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        get_metric("cmc")
@@ -0,0 +1,53 @@
+import os
+
+from extraction_cache import ExtractionCache
+
+
+def test_key_depends_on_contents_and_settings():
+    key = ExtractionCache.make_key(b"image", 32, 24)
+    assert key == ExtractionCache.make_key(b"image", 32, 24)
+    assert key != ExtractionCache.make_key(b"image", 32, 12)
+    assert key != ExtractionCache.make_key(b"other image", 32, 24)
+
+def test_least_recently_used_entries_are_dropped():
+    cache = ExtractionCache(max_entries=2)
+    cache.put("a", {"colors": []})
+    cache.put("b", {"colors": []})
+    cache.get("a")
+    cache.put("c", {"colors": []})
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get("b") is None
+
+def test_disk_entries_survive_a_new_cache(tmp_path):
+    ExtractionCache(disk_dir=str(tmp_path)).put("key", {"colors": [[[1, 2, 3], 4]]})
+    cache = ExtractionCache(disk_dir=str(tmp_path))
+    assert cache.get("key") == {"colors": [[[1, 2, 3], 4]]}
+    assert "key" in cache.entries
+
+def test_broken_disk_entries_are_ignored(tmp_path):
+    (tmp_path / "key.json").write_text('{"colors": [')
+    assert ExtractionCache(disk_dir=str(tmp_path)).get("key") is None
+
+def test_disk_entries_are_pruned_oldest_first(tmp_path):
+    cache = ExtractionCache(max_entries=1, disk_dir=str(tmp_path), max_disk_entries=10)
+    for i in range(10):
+        cache.put(f'old{i}', {"colors": []})
+        os.utime(tmp_path / f'old{i}.json', (1000 + i, 1000 + i))
+    cache.put("old0", {"colors": [1]})     # rewriting an entry doesn't add a file
+    os.utime(tmp_path / "old0.json", (1000, 1000))
+    assert len(list(tmp_path.glob("*.json"))) == 10
+
+    cache.get("old1")    # read from disk, becomes the most recently used file
+    cache.put("new", {"colors": []})
+    names = sorted(path.stem for path in tmp_path.glob("*.json"))
+    assert len(names) == 9
+    assert names == ["new", "old1", "old3", "old4", "old5", "old6", "old7", "old8", "old9"]    # old0 and old2 deleted
+    assert cache.disk_entries == 9
+
+def test_existing_disk_entries_count_towards_the_budget(tmp_path):
+    for i in range(5):
+        (tmp_path / f'{i}.json').write_text('{"colors": []}')
+        os.utime(tmp_path / f'{i}.json', (1000 + i, 1000 + i))
+    (tmp_path / "notes.txt").write_text("not a cache entry")
+    ExtractionCache(disk_dir=str(tmp_path), max_disk_entries=5).put("new", {"colors": []})
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["2.json", "3.json", "4.json", "new.json", "notes.txt"]
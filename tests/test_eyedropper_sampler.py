@@ -0,0 +1,216 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from eyedropper_sampler import EyedropperSampler, SampleQueue, sample_region, magnify
+
+
+# Cursor and capture replaced by plain functions, no display needed
+class FakeScreen:
+    def __init__(self, position=(0, 0), error=None):
+        self.position = position
+        self.error = error
+        self.captures = []
+        self.samples = []
+
+    def get_position(self):
+        return self.position
+
+    def get_sample(self, position):
+        if self.error:
+            raise self.error
+        self.captures.append(position)
+        return ("color", position)
+
+    def on_sample(self, position, sample):
+        self.samples.append((position, sample))
+
+    def create_sampler(self, **kwargs) -> EyedropperSampler:
+        return EyedropperSampler(self.get_position, self.get_sample, self.on_sample, **kwargs)
+
+
+def test_capture_error_ends_the_thread():
+    screen = FakeScreen(error=OSError("display closed"))
+    errors = []
+    got_error = threading.Event()
+    sampler = screen.create_sampler(on_error=lambda e: (errors.append(e), got_error.set()))
+    sampler.start()
+    assert got_error.wait(2)
+    sampler.thread.join(2)
+    assert not sampler.is_running()
+    assert isinstance(sampler.error, OSError) and errors == [sampler.error]
+    assert screen.samples == []
+    assert sampler.stop()
+
+def test_capture_error_without_handler_is_printed(capsys):
+    screen = FakeScreen(error=OSError("display closed"))
+    sampler = screen.create_sampler()
+    sampler.run()   # returns instead of looping forever
+    assert isinstance(sampler.error, OSError)
+    assert "display closed" in capsys.readouterr().err
+
+def test_restart_clears_the_error():
+    screen = FakeScreen(error=OSError("display closed"))
+    sampler = screen.create_sampler()
+    sampler.run()
+    screen.error = None
+    sampler.start()
+    assert sampler.error is None
+    assert sampler.stop()
+
+
+# --- tick --- #
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("eyedropper_sampler.time.monotonic", lambda: now[0])
+    return now
+
+def test_tick_skips_capture_while_cursor_rests(clock):
+    screen = FakeScreen(position=(5, 5))
+    sampler = screen.create_sampler(refresh_after=0.5)
+    assert sampler.tick() == ((5, 5), ("color", (5, 5)))
+    clock[0] += 0.1
+    assert sampler.tick() is None
+    assert sampler.tick() is None
+    assert screen.captures == [(5, 5)]
+
+    screen.position = (6, 5)
+    assert sampler.tick() == ((6, 5), ("color", (6, 5)))
+    assert screen.captures == [(5, 5), (6, 5)]
+    assert screen.samples == [((5, 5), ("color", (5, 5))), ((6, 5), ("color", (6, 5)))]
+
+def test_tick_resamples_after_refresh(clock):
+    screen = FakeScreen(position=(5, 5))
+    sampler = screen.create_sampler(refresh_after=0.5)
+    sampler.tick()
+    clock[0] += 0.49
+    assert sampler.tick() is None
+    clock[0] += 0.01
+    assert sampler.tick() == ((5, 5), ("color", (5, 5)))
+    clock[0] += 0.2
+    assert sampler.tick() is None
+    assert len(screen.captures) == 2
+
+
+# --- Thread --- #
+
+def test_stop_wakes_the_sleeping_thread():
+    screen = FakeScreen()
+    sampler = screen.create_sampler(rate=1)     # sleeps ~1 s between ticks
+    first_sample = threading.Event()
+    sampler.on_sample = lambda position, sample: first_sample.set()
+    sampler.start()
+    assert sampler.is_running()
+    assert first_sample.wait(2)
+
+    thread = sampler.thread
+    started = time.perf_counter()
+    assert sampler.stop(timeout=0.5)
+    assert time.perf_counter() - started < 0.5
+    assert not thread.is_alive() and not sampler.is_running()
+
+def test_stop_reports_busy_thread():
+    release = threading.Event()
+    busy = threading.Event()
+    def slow_sample(position):
+        busy.set()
+        release.wait(5)
+        return None
+    sampler = EyedropperSampler(lambda: (0, 0), slow_sample, lambda *args: None)
+    sampler.start()
+    assert busy.wait(2)
+    thread = sampler.thread
+    assert not sampler.stop(timeout=0.05)
+    release.set()
+    thread.join(2)
+    assert not thread.is_alive()
+
+
+# --- SampleQueue --- #
+
+def test_full_queue_drops_the_oldest_sample():
+    samples = SampleQueue(maxsize=3)
+    for sample in range(5):
+        samples.publish(sample)
+    assert samples.qsize() == 3
+    assert [samples.get_nowait() for _ in range(3)] == [2, 3, 4]
+
+def test_latest_returns_only_the_newest_sample():
+    samples = SampleQueue()
+    assert samples.latest() is None
+    assert samples.latest(default="none") == "none"
+    for sample in ("a", "b", "c"):
+        samples.publish(sample)
+    assert samples.latest() == "c"
+    assert samples.empty()
+    assert samples.latest() is None
+
+def test_publish_never_blocks():
+    samples = SampleQueue(maxsize=1)
+    done = threading.Event()
+    def producer():
+        for sample in range(10_000):
+            samples.publish(sample)
+        done.set()
+    # Nothing consumes the samples, a blocking put would hang the producer
+    threading.Thread(target=producer, daemon=True).start()
+    assert done.wait(5)
+    assert samples.latest() == 9_999
+
+def test_minimum_queue_size():
+    samples = SampleQueue(maxsize=0)    # 0 would mean unbounded for a Queue
+    samples.publish(1)
+    samples.publish(2)
+    assert samples.qsize() == 1 and samples.latest() == 2
+
+
+# --- Loupe --- #
+
+def test_single_pixel_is_the_centre():
+    region = np.zeros((5, 5, 3), dtype=np.uint8)
+    region[2, 2] = (10, 20, 30)
+    assert sample_region(region) == (10, 20, 30)
+    assert sample_region(region, 1, "median") == (10, 20, 30)
+
+def test_mean_and_median_3x3():
+    region = np.zeros((5, 5, 3), dtype=np.uint8)
+    region[1:4, 1:4] = (10, 10, 10)
+    region[2, 2] = (255, 100, 0)    # outlier in the middle
+    assert sample_region(region, 3, "mean") == (37, 20, 9)      # (8 * 10 + 255) / 9 = 37.2, 180 / 9, 80 / 9 = 8.9
+    assert sample_region(region, 3, "median") == (10, 10, 10)
+
+def test_mean_and_median_5x5():
+    region = np.full((7, 7, 3), 200, dtype=np.uint8)
+    region[1:6, 1:6] = np.arange(25, dtype=np.uint8).reshape(5, 5, 1) * 2
+    assert sample_region(region, 5, "mean") == (24, 24, 24)
+    assert sample_region(region, 5, "median") == (24, 24, 24)
+    region[1, 1] = 250  # one outlier moves the mean, not the median
+    assert sample_region(region, 5, "mean") == (34, 34, 34)
+    assert sample_region(region, 5, "median") == (26, 26, 26)
+
+def test_size_is_clamped_to_the_region():
+    region = np.arange(2 * 4 * 3, dtype=np.uint8).reshape(2, 4, 3)
+    window = region[0:2, 1:3].reshape(-1, 3)
+    expected = tuple(int(value) for value in np.rint(window.mean(axis=0)))
+    assert sample_region(region, 9, "mean") == expected
+    assert sample_region(region, 2, "mean") == expected
+    assert sample_region(region, 0) == tuple(int(value) for value in region[0, 1])   # upper left of the middle
+
+def test_unknown_sample_mode():
+    region = np.zeros((3, 3, 3), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        sample_region(region, 3, "mode")
+    with pytest.raises(ValueError):
+        sample_region(region, 1, "max")
+
+def test_magnify():
+    region = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    loupe = magnify(region, 4)
+    assert loupe.shape == (8, 12, 3) and loupe.dtype == np.uint8
+    assert (loupe[0:4, 4:8] == region[0, 1]).all()
+    assert (loupe[4:8, 8:12] == region[1, 2]).all()
+    assert (magnify(region, 1) == region).all()
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import helper_functions
+from helper_functions import rgb_to_hex, hex_to_rgb, get_shade, rgb_to_cmyk, cmyk_to_rgb, normalize_rgb
+
+
+def test_scalar_wrappers():
+    assert rgb_to_hex((199, 34, 49)) == "#c72231"
+    assert hex_to_rgb("#c72231") == "(199, 34, 49)"
+    assert rgb_to_cmyk(0, 0, 0, 1.0) == (0.0, 0.0, 0.0, 100.0)
+    assert cmyk_to_rgb((0, 0, 0, 100)) == (1, 1, 1)
+    assert get_shade((10, 200, 30)) == (11, 200, 31)
+    assert normalize_rgb("(1, 2, 3)") == (1, 2, 3)
+
+# Behaviour change from the vectorized rewrite: the old '#%02x%02x%02x' formatting turned channels outside 0 - 255
+# into invalid HEX values ('#100100100' for 256, which get_shade returns for white), rgb_to_hex now clips them
+def test_rgb_to_hex_clips_out_of_range_channels():
+    assert get_shade((255, 255, 255)) == (256, 256, 256)    # same as before the rewrite
+    assert rgb_to_hex(get_shade((255, 255, 255))) == "#ffffff"
+    assert rgb_to_hex((300, -5, 255)) == "#ff00ff"
+
+def test_batch_functions_are_imported_once_on_first_use():
+    code = ("import sys, helper_functions\n"
+            "assert 'numpy' not in sys.modules and helper_functions.batch_functions is None\n"
+            "helper_functions.rgb_to_hex((1, 2, 3))\n"
+            "assert helper_functions.batch_functions is sys.modules['batch_functions']\n")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(helper_functions.__file__))
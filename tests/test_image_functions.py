@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from extraction_cache import ExtractionCache
+from image_functions import extract_palette, reduce_image, palette_to_array, random_sampling_error
+
+
+BACKENDS = ("extcolors", "median_cut", "octree", "kmeans")
+
+
+@pytest.fixture
+def transparent_png(tmp_path):
+    # 1000 x 1000, top 30% red, the rest fully transparent
+    pixels = np.zeros((1000, 1000, 4), dtype=np.uint8)
+    pixels[:300] = (200, 30, 40, 255)
+    path = tmp_path / "transparent.png"
+    Image.fromarray(pixels, "RGBA").save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("method", ("stride", "thumbnail"))
+def test_downsampling_skips_transparent_pixels(transparent_png, backend, method):
+    result = extract_palette(transparent_png, max_pixels=250_000, method=method, backend=backend, cache=ExtractionCache())
+    assert result.colors == [((200, 30, 40), 300_000)]
+    assert result.pixel_count == 1_000_000
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_full_resolution_skips_transparent_pixels(transparent_png, backend):
+    assert extract_palette(transparent_png, backend=backend, cache=ExtractionCache()).colors == [((200, 30, 40), 300_000)]
+
+def test_stride_keeps_exact_colors(tmp_path):
+    path = tmp_path / "noise.jpg"
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (800, 800, 3), dtype=np.uint8)).save(path)
+    full = np.asarray(Image.open(path).convert("RGB"))
+    reduced = np.asarray(reduce_image(Image.open(path), 10_000, "stride"))
+    step = 8
+    assert (reduced == full[::step, ::step]).all()
+
+def test_share_error_estimate(transparent_png):
+    assert extract_palette(transparent_png, backend="median_cut", cache=ExtractionCache()).share_error_estimate == 0.0
+    result = extract_palette(transparent_png, max_pixels=250_000, method="stride", backend="median_cut", cache=ExtractionCache())
+    assert result.share_error_estimate == pytest.approx(random_sampling_error(250_000)) == pytest.approx(0.00196)
+
+# The estimate assumes randomly picked pixels, a pattern lined up with the stride grid is off by far more
+def test_share_error_estimate_is_not_a_bound(tmp_path):
+    pixels = np.zeros((400, 400, 3), dtype=np.uint8)
+    pixels[:, 1::2] = (255, 255, 255)
+    path = tmp_path / "stripes.png"
+    Image.fromarray(pixels).save(path)
+    result = extract_palette(str(path), max_pixels=40_000, method="stride", backend="median_cut", cache=ExtractionCache())
+    assert result.colors == [((0, 0, 0), 160_000)]
+    assert result.share_error_estimate < 0.01     # real error of both colors' share: 0.5
+
+def test_reduce_image_keeps_small_images():
+    image = Image.new("RGB", (10, 10))
+    assert reduce_image(image, 1000) is image
+    with pytest.raises(ValueError):
+        reduce_image(image, 10, "nearest")
+
+def test_results_are_cached(transparent_png):
+    cache = ExtractionCache()
+    first = extract_palette(transparent_png, backend="median_cut", cache=cache)
+    assert len(cache.entries) == 1
+    assert extract_palette(transparent_png, backend="median_cut", cache=cache) == first
+
+def test_palette_to_array_leaves_empty_cells_transparent():
+    sheet = palette_to_array([((255, 0, 0), 1), ((0, 0, 255), 1), ((0, 255, 0), 1)], swatch_size=2, columns=2)
+    assert sheet.shape == (4, 4, 4)
+    assert sheet[0, 0].tolist() == [255, 0, 0, 255]
+    assert sheet[0, 2].tolist() == [0, 0, 255, 255]
+    assert sheet[3, 3].tolist() == [0, 0, 0, 0]
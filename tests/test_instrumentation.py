@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+import instrumentation
+from instrumentation import traced
+
+
+@traced(category="test")
+def add(a, b):
+    return a + b
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    @traced(name="Counter.step", category="test")
+    def step(self, amount: int = 1) -> int:
+        self.value += amount
+        return self.value
+
+ORIGINAL_ADD = add
+ORIGINAL_STEP = vars(Counter)["step"]
+
+
+@pytest.fixture
+def trace(tmp_path):
+    assert not instrumentation.is_enabled()
+    instrumentation.enable(str(tmp_path / "trace.json"))
+    yield instrumentation.recorder
+    instrumentation.disable()
+
+
+def test_functions_are_not_wrapped_while_disabled():
+    assert not instrumentation.is_enabled()
+    assert add is ORIGINAL_ADD and not hasattr(add, "traced_function")
+    assert vars(Counter)["step"] is ORIGINAL_STEP and not hasattr(ORIGINAL_STEP, "traced_function")
+    assert add(1, 2) == 3
+
+def test_enable_wraps_module_functions_and_methods(trace):
+    wrapped_add = globals()["add"]
+    wrapped_step = vars(Counter)["step"]
+    assert wrapped_add.traced_function is ORIGINAL_ADD
+    assert wrapped_step.traced_function is ORIGINAL_STEP
+    assert wrapped_add.__name__ == "add"
+
+    assert wrapped_add(2, 3) == 5
+    counter = Counter()
+    counter.step()
+    assert counter.step(2) == 3
+    summary = trace.get_summary()
+    assert summary["add"]["calls"] == 1
+    assert summary["Counter.step"]["calls"] == 2
+    assert summary["Counter.step"]["total_ms"] >= summary["Counter.step"]["max_ms"] >= 0
+
+def test_disable_restores_the_original_functions(tmp_path):
+    instrumentation.enable(str(tmp_path / "trace.json"))
+    assert globals()["add"] is not ORIGINAL_ADD
+    wrapped_add = globals()["add"]
+    stopped = instrumentation.disable()
+
+    assert not instrumentation.is_enabled()
+    assert globals()["add"] is ORIGINAL_ADD
+    assert vars(Counter)["step"] is ORIGINAL_STEP
+    assert wrapped_add(1, 1) == 2   # a wrapper kept somewhere still works, it just isn't recorded
+    assert "add" not in stopped.get_summary()
+    assert instrumentation.disable() is None
+
+def test_functions_marked_while_enabled_are_wrapped(trace):
+    @traced(name="late")
+    def late():
+        return "late"
+    assert late.traced_function is not None
+    assert late() == "late"
+    assert trace.get_summary()["late"]["calls"] == 1
+
+def test_exceptions_are_recorded(trace):
+    @traced(name="fails")
+    def fails():
+        raise KeyError("x")
+    with pytest.raises(KeyError):
+        fails()
+    assert trace.get_summary()["fails"]["calls"] == 1
+
+def test_chrome_trace_export(trace, tmp_path):
+    globals()["add"](1, 2)
+    Counter().step()
+    path = tmp_path / "trace.json"
+    instrumentation.save()
+    data = json.loads(path.read_text())
+    events = {event["name"]: event for event in data["traceEvents"]}
+    assert set(events) >= {"add", "Counter.step"}
+    assert events["add"]["ph"] == "X" and events["add"]["cat"] == "test"
+    assert events["add"]["dur"] >= 0 and events["add"]["ts"] >= 0
+    assert data["otherData"]["summary"]["add"]["calls"] == 1
+
+def test_json_lines_export(trace, tmp_path):
+    globals()["add"](1, 2)
+    globals()["add"](3, 4)
+    path = tmp_path / "nested" / "trace.jsonl"
+    trace.save(str(path))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = [line for line in lines if "name" in line]
+    assert [span["name"] for span in spans] == ["add", "add"]
+    assert spans[0]["category"] == "test" and spans[0]["duration_ms"] >= 0
+    assert lines[-1]["summary"]["add"]["calls"] == 2
@@ -0,0 +1,76 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from color_spaces import to_metric_space
+from palette_dedup import find_duplicates, merge_duplicates, close_points, expand_ranges, group_pairs
+from palette_search import METRIC
+
+
+def brute_force_groups(palettes: list, threshold: float) -> list:
+    lab = [to_metric_space(np.array(colors, dtype=np.float64).reshape(-1, 3), METRIC) for colors in palettes]
+
+    def covers(a, b):
+        distances = np.sqrt(((lab[a][:, None, :] - lab[b][None, :, :]) ** 2).sum(axis=2))
+        return (distances.min(axis=1) <= threshold).all()
+
+    pairs = [(a, b) for a, b in itertools.combinations(range(len(palettes)), 2)
+             if len(palettes[a]) and len(palettes[b]) and covers(a, b) and covers(b, a)]
+    return group_pairs([a for a, b in pairs], [b for a, b in pairs])
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (60, 4, 3))
+    # Copies with small changes, reordered colors and a few unrelated palettes
+    copies = np.clip(base[:20] + rng.integers(-1, 2, base[:20].shape), 0, 255)[:, ::-1]
+    palettes = [colors.tolist() for colors in np.concatenate((base, copies))] + [[]]
+    for threshold in (1.0, 2.0, 5.0):
+        assert find_duplicates(palettes, threshold).palette_groups == brute_force_groups(palettes, threshold)
+
+def test_colors_stored_as_text():
+    palettes = [[("(199, 34, 49)", "#c72231", "Name"), ((20, 40, 200), "#1428c8", "blue")],
+                [((199, 34, 49), "#c72231", "red"), ("20, 40, 201", "#1428c9", "Name")]]
+    assert find_duplicates(palettes).palette_groups == [[0, 1]]
+
+def test_duplicate_colors_of_one_palette():
+    palette = [((200, 30, 40), "#c81e28", "red"), ((20, 40, 200), "#1428c8", "blue"), ((201, 30, 40), "#c91e28", "red")]
+    report = find_duplicates([palette])
+    assert report.color_groups == [(0, [0, 2])]
+    assert report.duplicate_colors() == 1
+    assert merge_duplicates([("Warm", palette)], report) == [("Warm", palette[:2])]
+
+def test_merge_keeps_the_first_palette_of_every_group():
+    palettes = [("A", [(1, 2, 3)]), ("B", [(200, 0, 0)]), ("A copy", [(1, 2, 4)])]
+    report = find_duplicates([colors for name, colors in palettes])
+    assert report.palette_groups == [[0, 2]]
+    assert merge_duplicates(palettes, report) == palettes[:2]
+
+def test_empty_library():
+    assert find_duplicates([]) == ([], [])
+    assert find_duplicates([[], []]) == ([], [])
+
+@pytest.mark.parametrize("max_pairs", (1, 7, 1 << 20))
+def test_close_points_matches_brute_force(max_pairs):
+    points = np.random.default_rng(2).uniform(0, 20, (300, 4))
+    first, second = close_points(points, 1.5, max_pairs)
+    found = set(map(tuple, np.sort(np.stack((first, second), axis=1), axis=1).tolist()))
+    expected = {(a, b) for a, b in itertools.combinations(range(len(points)), 2)
+                if np.abs(points[a] - points[b]).max() <= 1.5}
+    assert found == expected
+    assert len(found) == len(first)
+
+def test_expand_ranges():
+    chunks = list(expand_ranges(np.array([0, 5, 2]), np.array([2, 5, 4]), max_pairs=3))
+    rows = np.concatenate([rows for rows, partners in chunks]).tolist()
+    partners = np.concatenate([partners for rows, partners in chunks]).tolist()
+    assert list(zip(rows, partners)) == [(0, 0), (0, 1), (2, 2), (2, 3)]
+
+def test_dedup_command_with_colors_stored_as_text(tmp_path, capsys):
+    from cli import main
+    from palette_store import save_palettes
+    path = str(tmp_path / "palettes.txt")
+    save_palettes(path, [("Typed", [("(199, 34, 49)", "#c72231", "Name")]), ("Picked", [((199, 34, 49), "#c72231", "red")])])
+    assert main(["dedup", path]) == 0
+    assert '"duplicates": ["Picked"]' in capsys.readouterr().out
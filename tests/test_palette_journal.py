@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from cli import main
+from palette import Palette
+from palette_journal import PaletteJournal
+from palette_store import save_palettes
+
+
+RED = ((255, 0, 0), "#ff0000", "red")
+GREEN = ((0, 255, 0), "#00ff00", "green")
+BLUE = ((0, 0, 255), "#0000ff", "blue")
+
+
+@pytest.fixture
+def save_file(tmp_path):
+    path = str(tmp_path / "palettes.txt")
+    save_palettes(path, [("Warm", [RED]), ("Cool", [BLUE, GREEN])])
+    return path
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_changes_are_appended_and_replayed(save_file):
+    journal = PaletteJournal(save_file)
+    palettes = [Palette(name, colors) for name, colors in journal.load()]
+    journal.mark_saved(palettes)
+    saved_file = read_bytes(save_file)
+
+    palettes[0].colors.append(GREEN)
+    palettes[1].name = "Cold"
+    palettes.append(Palette("New", [BLUE]))
+    journal.save(palettes)
+
+    assert read_bytes(save_file) == saved_file
+    assert os.path.exists(journal.journal_path)
+    assert PaletteJournal(save_file).load() == [("Warm", [RED, GREEN]), ("Cold", [BLUE, GREEN]), ("New", [BLUE])]
+
+def test_compaction_rewrites_the_save_file(save_file):
+    journal = PaletteJournal(save_file, compact_after=0)
+    palettes = [Palette(name, colors) for name, colors in journal.load()]
+    journal.mark_saved(palettes)
+    palettes.pop(0)
+    journal.save(palettes)
+
+    assert not os.path.exists(journal.journal_path)
+    assert PaletteJournal(save_file).load() == [("Cool", [BLUE, GREEN])]
+
+def test_torn_tail_is_ignored_and_cut_off(save_file):
+    journal = PaletteJournal(save_file)
+    palettes = [Palette(name, colors) for name, colors in journal.load()]
+    journal.mark_saved(palettes)
+    palettes[0].colors.append(GREEN)
+    journal.save(palettes)
+    committed = read_bytes(journal.journal_path)
+    with open(journal.journal_path, "ab") as file:
+        file.write(b'{"op": "delete", "index": 0}\n{"op": "comm')
+
+    assert PaletteJournal(save_file).load(read_only=True) == [("Warm", [RED, GREEN]), ("Cool", [BLUE, GREEN])]
+    assert read_bytes(journal.journal_path) != committed
+    assert PaletteJournal(save_file).load() == [("Warm", [RED, GREEN]), ("Cool", [BLUE, GREEN])]
+    assert read_bytes(journal.journal_path) == committed
+
+def test_dedup_report_doesnt_touch_the_files(save_file, capsys):
+    save_palettes(save_file, [("Warm", [RED]), ("Warm copy", [RED])])
+    journal_path = save_file + ".journal"
+    with open(journal_path, "w") as file:
+        file.write(json.dumps({"format": "color_palette_journal", "generation": 0}) + '\n{"op": "delete", "ind')
+    files = read_bytes(save_file), read_bytes(journal_path)
+
+    assert main(["dedup", save_file]) == 0
+    assert json.loads(capsys.readouterr().out.splitlines()[0]) == {"kept": "Warm", "duplicates": ["Warm copy"]}
+    assert (read_bytes(save_file), read_bytes(journal_path)) == files
+
+def test_dedup_merge_rewrites_the_save_file(save_file, capsys):
+    save_palettes(save_file, [("Warm", [RED, ((254, 1, 0), "#fe0100", "red")]), ("Warm copy", [RED]), ("Cool", [BLUE])])
+    assert main(["dedup", save_file, "--merge"]) == 0
+    assert PaletteJournal(save_file).load() == [("Warm", [RED]), ("Cool", [BLUE])]
+    assert json.loads(capsys.readouterr().err)["merged"] is True
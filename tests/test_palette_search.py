@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from color_spaces import to_metric_space
+from palette import Palette
+from palette_search import PaletteIndex, METRIC
+
+
+RED = ((200, 30, 40), "#c81e28", "red")
+NEAR_RED = ((202, 31, 40), "#ca1f28", "red")
+BLUE = ((20, 40, 200), "#1428c8", "blue")
+TYPED_RED = ("(199, 34, 49)", "#c72231", "Name")     # RGB as text, how the HEX entry stores it
+
+
+def random_library(count: int, seed: int = 0) -> list:
+    rgb = np.random.default_rng(seed).integers(0, 256, (count, 5, 3)).tolist()
+    return [Palette(f'Palette {i}', [(tuple(color), "#000000", "Name") for color in colors]) for i, colors in enumerate(rgb)]
+
+
+def test_search_matches_brute_force():
+    palettes = random_library(400)
+    index = PaletteIndex(palettes)
+    lab = to_metric_space(np.array([color[0] for palette in palettes for color in palette.colors], dtype=np.float64), METRIC)
+    for target in np.random.default_rng(1).integers(0, 256, (20, 3)).tolist():
+        distances = np.sqrt(((lab - to_metric_space(np.array(target, dtype=np.float64), METRIC)) ** 2).sum(axis=1))
+        matches = index.search(target, max_distance=10)
+        assert sorted(match.distance for match in matches) == pytest.approx(np.sort(distances[distances <= 10]).tolist())
+
+def test_colors_stored_as_text():
+    typed = Palette("Typed", [TYPED_RED])
+    index = PaletteIndex([typed, Palette("Blue", [BLUE])])
+    assert [match.palette for match in index.search_palettes("(199, 34, 49)")] == [typed]
+    index.add_colors(typed, [("(20, 40, 200)", "#1428c8", "Name")])
+    assert len(index.search((20, 40, 200), max_distance=0.1)) == 2
+
+def test_palettes_are_ranked_by_their_closest_color():
+    warm, other = Palette("Warm", [RED, NEAR_RED]), Palette("Other", [NEAR_RED, BLUE])
+    index = PaletteIndex([other, warm])
+    assert [match.palette for match in index.search_palettes(RED[0])] == [warm, other]
+
+def test_changes_are_indexed():
+    warm, cool = Palette("Warm", [RED]), Palette("Cool", [BLUE])
+    index = PaletteIndex([warm, cool])
+    cool.colors.append(NEAR_RED)
+    index.add_colors(cool, [NEAR_RED])
+    assert {match.palette for match in index.search_palettes(RED[0])} == {warm, cool}
+
+    index.remove_palette(warm)
+    assert [match.palette for match in index.search_palettes(RED[0])] == [cool]
+    cool.colors.remove(NEAR_RED)
+    index.update_palette(cool)
+    assert index.search_palettes(RED[0]) == []
+    assert len(index) == 1
+
+def test_rebuild_keeps_every_palette():
+    palettes = random_library(50)
+    index = PaletteIndex(palettes)
+    for palette in palettes[:30]:
+        index.remove_palette(palette)
+    assert index.dead < index.size
+    assert len(index) == 20 * 5
+    assert all(palette in index for palette in palettes[30:])
@@ -0,0 +1,55 @@
+import pytest
+
+from palette_store import save_palettes, load_palettes, index_palettes, read_palette_at, read_header, \
+    migrate_legacy_file, is_legacy_file
+
+
+PALETTES = [("Warm", [((255, 0, 0), "#ff0000", "red"), ("(199, 34, 49)", "#c72231", "Name")]),
+            ('Quotes " and ünïcode', [((0, 0, 255), "#0000ff", "blue")]),
+            ("Empty", [])]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "palettes.txt")
+    save_palettes(path, PALETTES, generation=3)
+    assert load_palettes(path) == PALETTES
+    assert read_header(path)["generation"] == 3
+
+def test_palettes_can_be_read_one_by_one(tmp_path):
+    path = str(tmp_path / "palettes.txt")
+    save_palettes(path, PALETTES)
+    entries = index_palettes(path)
+    assert [name for name, offset in entries] == [name for name, colors in PALETTES]
+    assert [read_palette_at(path, offset) for name, offset in entries] == PALETTES
+
+def test_numpy_values_are_saved_as_numbers(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "palettes.txt")
+    save_palettes(path, [("Picked", [((np.int64(1), np.uint8(2), 3), "#010203", "Name")])])
+    assert load_palettes(path) == [("Picked", [((1, 2, 3), "#010203", "Name")])]
+
+def test_legacy_files_are_migrated(tmp_path):
+    path = tmp_path / "palettes.txt"
+    legacy = "".join(str([name, [list(color) for color in colors]]) + "\n" for name, colors in PALETTES)
+    path.write_text(legacy, encoding="utf-8")
+    assert is_legacy_file(str(path))
+    with pytest.raises(ValueError):
+        index_palettes(str(path))
+
+    assert migrate_legacy_file(str(path))
+    assert not is_legacy_file(str(path))
+    assert load_palettes(str(path)) == PALETTES
+    assert (tmp_path / "palettes.txt.bak").read_text(encoding="utf-8") == legacy
+    assert not migrate_legacy_file(str(path))
+
+def test_unsupported_version(tmp_path):
+    path = tmp_path / "palettes.txt"
+    path.write_text('{"format": "color_palette", "version": 99}\n')
+    with pytest.raises(ValueError):
+        load_palettes(str(path))
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "palettes.txt"
+    path.write_text("")
+    assert load_palettes(str(path)) == []
+    assert index_palettes(str(path)) == []
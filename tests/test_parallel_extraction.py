@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from parallel_extraction import extract_images, extract_images_parallel
+
+
+SETTINGS = {"backend": "median_cut", "limit": 4, "max_pixels": 0}
+
+
+@pytest.fixture
+def images(tmp_path):
+    # Single color images of different sizes, so workers finish them in a different order
+    paths = []
+    for i in range(8):
+        size = 8 if i % 2 else 200
+        path = tmp_path / f'{i}.png'
+        Image.fromarray(np.full((size, size, 3), (i * 30, 10, 200), dtype=np.uint8)).save(path)
+        paths.append((str(path), str(tmp_path)))
+    return paths
+
+
+def expected_color(path: str) -> tuple:
+    i = int(os.path.splitext(os.path.basename(path))[0])
+    return i * 30, 10, 200
+
+@pytest.mark.parametrize("chunk_size", [1, 3])
+def test_ordered_results_keep_input_order(images, chunk_size):
+    results = list(extract_images_parallel(images, SETTINGS, workers=2, chunk_size=chunk_size, ordered=True))
+    assert [(path, root) for path, root, result, error in results] == images
+    for path, root, result, error in results:
+        assert error is None
+        assert result.colors[0][0] == expected_color(path)
+
+def test_unordered_results_cover_every_image(images):
+    results = list(extract_images_parallel(images, SETTINGS, workers=2))
+    assert sorted(path for path, root, result, error in results) == sorted(path for path, root in images)
+    assert all(error is None for path, root, result, error in results)
+
+def test_same_results_as_in_process(images):
+    parallel = list(extract_images_parallel(images, SETTINGS, workers=2, ordered=True))
+    assert parallel == list(extract_images(images, SETTINGS))
+
+def test_broken_image_does_not_stop_the_batch(images, tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    images.insert(3, (str(broken), str(tmp_path)))
+    missing = (str(tmp_path / "missing.png"), str(tmp_path))
+    images.append(missing)
+
+    results = list(extract_images_parallel(images, SETTINGS, workers=2, chunk_size=2, ordered=True))
+    assert [(path, root) for path, root, result, error in results] == images
+    errors = {path: error for path, root, result, error in results if error}
+    assert set(errors) == {str(broken), missing[0]}
+    assert errors[str(broken)].startswith("UnidentifiedImageError")
+    assert errors[missing[0]].startswith("FileNotFoundError")
+    assert all(result is None for path, root, result, error in results if error)
+    assert sum(1 for path, root, result, error in results if result) == 8
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize("chunk_size, max_pending", [(1, 1), (1, 2), (2, 3)])
+def test_pending_chunks_are_bounded(images, ordered, chunk_size, max_pending):
+    taken = []
+
+    def source():
+        for image in images:
+            taken.append(image)
+            yield image
+
+    yielded = 0
+    for path, root, result, error in extract_images_parallel(source(), SETTINGS, workers=2, chunk_size=chunk_size,
+                                                             max_pending=max_pending, ordered=ordered):
+        # Images read from the input but not yielded yet: the chunk being yielded + at most 'max_pending' - 1 others
+        assert len(taken) - yielded <= chunk_size * max_pending
+        yielded += 1
+    assert yielded == len(images) == len(taken)
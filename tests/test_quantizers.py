@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from quantizers import QUANTIZERS, quantize, unique_colors
+
+
+@pytest.fixture
+def pixels():
+    return np.random.default_rng(0).integers(0, 256, (20_000, 3))
+
+
+@pytest.mark.parametrize("method", ("median_cut", "octree"))
+@pytest.mark.parametrize("limit", (1, 5, 24, 64))
+def test_returns_exactly_limit_colors(pixels, method, limit):
+    palette = quantize(pixels, method, limit)
+    assert len(palette) == limit
+    assert sum(count for rgb, count in palette) == len(pixels)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_octree_fills_limit_on_clustered_images(seed):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, rng.integers(2, 256), (2000, 3))
+    limit = int(rng.integers(2, 40))
+    assert len(quantize(pixels, "octree", limit)) == min(limit, len(unique_colors(pixels)[0]))
+
+@pytest.mark.parametrize("method", QUANTIZERS)
+def test_few_colors_are_returned_as_they_are(method):
+    pixels = [(255, 0, 0)] * 5 + [(0, 0, 255)] * 3
+    assert quantize(pixels, method, 24) == [((255, 0, 0), 5), ((0, 0, 255), 3)]
+
+@pytest.mark.parametrize("method", QUANTIZERS)
+def test_no_pixels(method):
+    assert quantize(np.empty((0, 3), dtype=np.uint8), method, 24) == []
+
+@pytest.mark.parametrize("method", QUANTIZERS)
+def test_sorted_from_most_common(pixels, method):
+    counts = [count for rgb, count in quantize(pixels, method, 16)]
+    assert counts == sorted(counts, reverse=True)
+
+def test_unknown_quantizer():
+    with pytest.raises(ValueError):
+        quantize([(0, 0, 0)], "popularity")
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from screen_capture import CaptureBackend, ImageCapture, create_capture_backend
+
+
+# 4 x 5 screen, every pixel has a unique color: (x, y, 100 + x + 10 * y)
+def make_screen(width: int = 5, height: int = 4) -> np.ndarray:
+    y, x = np.mgrid[0:height, 0:width]
+    return np.dstack([x, y, 100 + x + 10 * y]).astype(np.uint8)
+
+def pixel_at(x: int, y: int) -> (int, int, int):
+    return x, y, 100 + x + 10 * y
+
+
+def test_capture_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CaptureBackend()
+
+    class NoGrab(CaptureBackend):
+        def get_screen_rect(self):
+            return 0, 0, 1, 1
+    with pytest.raises(TypeError):
+        NoGrab()
+
+def test_pixel_values():
+    capture = ImageCapture(make_screen())
+    assert capture.get_screen_rect() == (0, 0, 5, 4)
+    for x, y in ((0, 0), (4, 0), (2, 1), (4, 3)):
+        assert capture.pixel(x, y) == pixel_at(x, y)
+    region = capture.grab(1, 1, 3, 2)
+    assert region.shape == (2, 3, 3) and region.dtype == np.uint8
+    assert (region == make_screen()[1:3, 1:4]).all()
+
+def test_screen_offset():
+    capture = ImageCapture(make_screen(), left=-5, top=10)
+    assert capture.get_screen_rect() == (-5, 10, 5, 4)
+    assert capture.pixel(-5, 10) == pixel_at(0, 0)
+    assert capture.pixel(-1, 13) == pixel_at(4, 3)
+
+def test_grab_around_is_centred():
+    capture = ImageCapture(make_screen())
+    region = capture.grab_around(2, 1, 3)
+    assert region.shape == (3, 3, 3)
+    assert tuple(region[1, 1]) == pixel_at(2, 1)
+    assert (region == make_screen()[0:3, 1:4]).all()
+
+@pytest.mark.parametrize("x, y", [(0, 0), (4, 0), (0, 3), (4, 3)])
+def test_corner_padding(x, y):
+    capture = ImageCapture(make_screen())
+    region = capture.grab_around(x, y, 5)
+    assert region.shape == (5, 5, 3)
+    assert tuple(region[2, 2]) == pixel_at(x, y)
+    # Every pixel of the region is the nearest pixel on the screen
+    for row in range(5):
+        for column in range(5):
+            nearest = (min(max(x - 2 + column, 0), 4), min(max(y - 2 + row, 0), 3))
+            assert tuple(region[row, column]) == pixel_at(*nearest)
+
+def test_edge_padding():
+    screen = make_screen()
+    capture = ImageCapture(screen)
+    left = capture.grab(-2, 1, 3, 2)
+    assert left.shape == (2, 3, 3)
+    assert (left[:, 0] == screen[1:3, 0]).all() and (left[:, 1] == screen[1:3, 0]).all()
+    assert (left[:, 2] == screen[1:3, 0]).all()
+    bottom = capture.grab(1, 3, 2, 3)
+    assert bottom.shape == (3, 2, 3)
+    assert all((bottom[row] == screen[3, 1:3]).all() for row in range(3))
+
+def test_region_off_the_screen():
+    capture = ImageCapture(make_screen())
+    region = capture.grab(10, -10, 2, 2)
+    assert region.shape == (2, 2, 3)
+    assert (region == np.array(pixel_at(4, 0), dtype=np.uint8)).all()
+    assert capture.pixel(-3, 7) == pixel_at(0, 3)
+
+def test_capture_does_not_share_memory_with_the_image():
+    screen = make_screen()
+    capture = ImageCapture(screen)
+    region = capture.grab(0, 0, 2, 2)
+    region[:] = 0
+    assert capture.pixel(0, 0) == pixel_at(0, 0)
+
+def test_image_sources(tmp_path):
+    from PIL import Image
+    image = Image.fromarray(make_screen()).convert("RGBA")
+    path = str(tmp_path / "screen.png")
+    image.save(path)
+    for source in (image, path):
+        assert ImageCapture(source).pixel(3, 2) == pixel_at(3, 2)
+
+def test_cursor():
+    capture = ImageCapture(make_screen(), position=(1, 2))
+    assert capture.position() == (1, 2)
+    capture.move_to(3, 0)
+    assert capture.position() == (3, 0)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_capture_backend("x11")
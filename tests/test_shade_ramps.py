@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from helper_functions import get_shade, rgb_to_hex
+from shade_ramps import DEFAULT_RAMP, RampCache, RampStep, parse_ramp, ramp_batch, get_ramps, get_ramp
+
+
+def test_parse_ramp():
+    assert parse_ramp("cmyk:1.25, tint:25%, Shade:0.5") == (RampStep("cmyk", 1.25), RampStep("tint", 0.25),
+                                                             RampStep("shade", 0.5))
+    assert parse_ramp("tone*3") == (RampStep("tone", 0.25), RampStep("tone", 0.5), RampStep("tone", 0.75))
+
+@pytest.mark.parametrize("spec", ["", "tint", "tint:150%", "cmyk:-1", "cmyk*2", "tint*0", "glow:10%", "tint:abc"])
+def test_invalid_ramps(spec):
+    with pytest.raises(ValueError):
+        parse_ramp(spec)
+
+def test_default_ramp_matches_get_shade():
+    steps = parse_ramp(DEFAULT_RAMP)
+    for rgb in np.random.default_rng(0).integers(0, 256, (100, 3)).tolist():
+        expected = [tuple(min(255, value) for value in get_shade(rgb, step.amount)) for step in steps]
+        assert [ramp_rgb for ramp_rgb, hex_value in get_ramp(tuple(rgb), steps, RampCache())] == expected
+
+def test_mixed_steps():
+    ramp = ramp_batch([(200, 100, 0)], parse_ramp("shade:50%,tint:50%,tone:100%"))
+    assert ramp.tolist() == [[[100, 50, 0], [228, 178, 128], [128, 128, 128]]]
+
+def test_values_stay_in_range():
+    ramp = ramp_batch(np.random.default_rng(1).integers(0, 256, (500, 3)), parse_ramp("cmyk:0,cmyk:3,tint*4,shade*4"))
+    assert ramp.min() >= 0 and ramp.max() <= 255
+
+def test_hex_values_match_rgb():
+    for rgb, hex_value in get_ramp((12, 200, 99), parse_ramp("tint*5"), RampCache()):
+        assert rgb_to_hex(rgb) == hex_value
+
+def test_only_missing_ramps_are_computed():
+    cache = RampCache(max_entries=2)
+    steps = parse_ramp("tint*2")
+    first = get_ramps([(1, 2, 3), (4, 5, 6)], steps, cache)
+    assert get_ramps([(4, 5, 6)], steps, cache)[0] is first[1]
+    get_ramp((7, 8, 9), steps, cache)
+    assert len(cache.entries) == 2
+    assert cache.get(((1, 2, 3), steps)) is None
+
+def test_labels():
+    assert [step.label() for step in parse_ramp("cmyk:1.25,cmyk:0.75,shade:20%,tint:20%,tone:20%")] == \
+        ["-25%", "+25%", "-20%", "+20%", "~20%"]